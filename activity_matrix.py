@@ -0,0 +1,168 @@
+"""
+Users × days activity matrix for group-wide analytics.
+
+Every user's submission calendar ({"<UTC midnight timestamp>": count}) is
+laid out as one row of a dense integer matrix with one column per day,
+oldest first, ending today (UTC). Group analytics are then column or row
+operations over the whole matrix instead of per-user dict lookups:
+
+    daily_active()       members with at least one submission, per day
+    daily_totals()       group submissions per day (the group heatmap)
+    rolling(window)      per-user submissions in the `window` days ending each day
+    streaks()            per-user current and longest run of active days
+
+The matrix is a NumPy array when NumPy is installed (pip install numpy);
+otherwise it is a list of row lists and the same operations run in plain
+Python.
+"""
+
+from datetime import date, datetime, timedelta, timezone
+from typing import Dict, List, Mapping, Optional
+
+from leetcode_leaderboard import parse_submission_calendar
+
+try:
+    import numpy as np
+except ImportError:  # Optional: lists of rows do the same work
+    np = None
+
+DAY_SECONDS = 24 * 3600
+DEFAULT_DAYS = 365
+
+
+class ActivityMatrix:
+    """Submission counts for `usernames` (rows) over `days` days ending on `end` (columns)."""
+
+    def __init__(self, usernames: List[str], end: date, days: int, counts):
+        self.usernames = usernames
+        self.end = end
+        self.days = days
+        self.counts = counts  # numpy array or list of row lists, len(usernames) x days
+
+    @property
+    def start(self) -> date:
+        return self.end - timedelta(days=self.days - 1)
+
+    @classmethod
+    def from_users(cls, users: Mapping[str, Dict], days: int = DEFAULT_DAYS,
+                   end: Optional[date] = None) -> "ActivityMatrix":
+        """Build the matrix from user records' submission calendars."""
+        end = end or datetime.now(timezone.utc).date()
+        start_ts = int(datetime(end.year, end.month, end.day, tzinfo=timezone.utc).timestamp()) - (days - 1) * DAY_SECONDS
+        usernames = [user.get("username", key) for key, user in users.items()]
+
+        # (row, column, count) for every calendar day inside the window
+        cells = []
+        for row, user in enumerate(users.values()):
+            for timestamp, count in parse_submission_calendar(user.get("submission_calendar", "")).items():
+                try:
+                    column = (int(timestamp) - start_ts) // DAY_SECONDS
+                except (TypeError, ValueError):
+                    continue
+                if 0 <= column < days and count:
+                    cells.append((row, column, int(count)))
+
+        if np is not None:
+            counts = np.zeros((len(usernames), days), dtype=np.int64)
+            if cells:
+                rows, columns, values = zip(*cells)
+                np.add.at(counts, (np.array(rows), np.array(columns)), np.array(values))
+        else:
+            counts = [[0] * days for _ in usernames]
+            for row, column, count in cells:
+                counts[row][column] += count
+        return cls(usernames, end, days, counts)
+
+    def dates(self) -> List[str]:
+        """ISO date of every column."""
+        start = self.start
+        return [(start + timedelta(days=i)).isoformat() for i in range(self.days)]
+
+    def daily_active(self) -> List[int]:
+        """Number of members who submitted at least once, per day."""
+        if np is not None:
+            return (self.counts > 0).sum(axis=0).tolist()
+        return [sum(1 for count in column if count) for column in zip(*self.counts)] or [0] * self.days
+
+    def daily_totals(self) -> List[int]:
+        """Group submissions per day."""
+        if np is not None:
+            return self.counts.sum(axis=0).tolist()
+        return [sum(column) for column in zip(*self.counts)] or [0] * self.days
+
+    def heatmap(self) -> Dict[str, int]:
+        """Group submissions by ISO date, for calendar heatmaps."""
+        return dict(zip(self.dates(), self.daily_totals()))
+
+    def rolling(self, window: int) -> List[List[int]]:
+        """Per user, submissions in the `window` days ending on each day (rows in `usernames` order)."""
+        if np is not None:
+            cumulative = np.zeros((len(self.usernames), self.days + 1), dtype=np.int64)
+            np.cumsum(self.counts, axis=1, out=cumulative[:, 1:])
+            window_starts = np.maximum(np.arange(1, self.days + 1) - window, 0)
+            return (cumulative[:, 1:] - cumulative[:, window_starts]).tolist()
+
+        rolled = []
+        for row in self.counts:
+            total, sums = 0, []
+            for i, count in enumerate(row):
+                total += count - (row[i - window] if i >= window else 0)
+                sums.append(total)
+            rolled.append(sums)
+        return rolled
+
+    def window_totals(self, window: int) -> Dict[str, int]:
+        """username -> submissions in the last `window` days."""
+        if np is not None:
+            totals = self.counts[:, max(self.days - window, 0):].sum(axis=1).tolist()
+        else:
+            totals = [sum(row[max(self.days - window, 0):]) for row in self.counts]
+        return dict(zip(self.usernames, totals))
+
+    def streaks(self) -> Dict[str, Dict[str, int]]:
+        """
+        username -> {"current": ..., "longest": ...} runs of active days. The
+        current streak may end yesterday, since today may not have started yet.
+        """
+        if np is not None:
+            active = self.counts > 0
+            cumulative = np.cumsum(active, axis=1)
+            # Active days counted up to the last inactive day, carried forward
+            last_reset = np.maximum.accumulate(np.where(active, 0, cumulative), axis=1)
+            runs = cumulative - last_reset
+            longest = runs.max(axis=1).tolist() if self.days else [0] * len(self.usernames)
+            current = runs[:, -1] if self.days else np.zeros(len(self.usernames), dtype=np.int64)
+            if self.days > 1:
+                current = np.where(current > 0, current, runs[:, -2])
+            current = current.tolist()
+        else:
+            longest, current = [], []
+            for row in self.counts:
+                run, best, runs = 0, 0, []
+                for count in row:
+                    run = run + 1 if count else 0
+                    best = max(best, run)
+                    runs.append(run)
+                longest.append(best)
+                current.append((runs[-1] or (runs[-2] if len(runs) > 1 else 0)) if runs else 0)
+        return {username: {"current": cur, "longest": best}
+                for username, cur, best in zip(self.usernames, current, longest)}
+
+    def summary(self) -> Dict:
+        """Group analytics for the API: daily activity, heatmap, rolling totals and streaks."""
+        last_7, last_30, streaks = self.window_totals(7), self.window_totals(30), self.streaks()
+        return {
+            "start": self.start.isoformat(),
+            "end": self.end.isoformat(),
+            "days": self.days,
+            "daily_active": dict(zip(self.dates(), self.daily_active())),
+            "heatmap": self.heatmap(),
+            "users": {
+                username: {
+                    "last_7_days": last_7[username],
+                    "last_30_days": last_30[username],
+                    "current_streak": streaks[username]["current"],
+                    "longest_streak": streaks[username]["longest"]
+                } for username in self.usernames
+            }
+        }
@@ -1,430 +1,646 @@
-from flask import Flask, render_template, request, jsonify, redirect, url_for, flash
+import time
+_module_start = time.perf_counter()
+
+from flask import Flask, render_template, request, jsonify, redirect, url_for, flash, after_this_request
+import atexit
 import json
 import os
 import sys
-from datetime import datetime, timedelta
-import requests
+from datetime import datetime, timedelta, timezone
 
 # Add the parent directory to the path so we can import our modules
 current_dir = os.path.dirname(os.path.abspath(__file__))
 parent_dir = os.path.dirname(current_dir)
 sys.path.insert(0, parent_dir)
 
-# Import or define the functions we need
-try:
-    from leetcode_leaderboard import LeetCodeLeaderboard, get_user_stats, calculate_advanced_score
-except ImportError:
-    # Define the functions directly if import fails
-    def get_current_week_bounds():
-        """Get the start and end timestamps for the current week (Monday to Sunday)."""
-        now = datetime.now()
-        days_since_monday = now.weekday()  # Monday is 0, Sunday is 6
-        
-        # Calculate start of week (Monday 00:00:00)
-        week_start = now - timedelta(days=days_since_monday, 
-                                   hours=now.hour, 
-                                   minutes=now.minute, 
-                                   seconds=now.second, 
-                                   microseconds=now.microsecond)
-        
-        # Calculate end of week (Sunday 23:59:59)  
-        week_end = week_start + timedelta(days=6, hours=23, minutes=59, seconds=59)
-        
-        return int(week_start.timestamp()), int(week_end.timestamp())
-
-    def get_user_stats(username: str):
-        """Fetch user statistics from LeetCode GraphQL API."""
-        url = "https://leetcode.com/graphql"
-        
-        query = """
-        query getUserStats($username: String!) {
-            allQuestionsCount {
-                difficulty
-                count
-            }
-            matchedUser(username: $username) {
-                username
-                submitStats {
-                    acSubmissionNum {
-                        difficulty
-                        count
-                    }
-                    totalSubmissionNum {
-                        difficulty
-                        count
-                    }
-                }
-                profile {
-                    ranking
-                    realName
-                    aboutMe
-                    userAvatar
-                    reputation
-                    githubUrl
-                    websites
-                }
-                submissionCalendar
-                recentSubmissionList(limit: 50) {
-                    title
-                    titleSlug
-                    timestamp
-                    statusDisplay
-                    lang
-                    __typename
+from background_publisher import DebouncedPublisher
+from leaderboard_snapshot import (
+    DEFAULT_SNAPSHOT_FILE, calculate_stats, canonical_json, content_hashes, is_snapshot, snapshot_users
+)
+
+# Cold start timings, reported by /api/debug
+STARTUP_TIMINGS = {}
+
+# Only /tmp is writable on Vercel; warm instances share the profile cache there
+os.environ.setdefault('LEETCODE_CACHE_FILE', '/tmp/leetcode_cache.sqlite3')
+
+# The serverless app keeps its own leaderboard implementation: it loads data from
+# environment variables, and importing leetcode_leaderboard would pull in requests
+# and the whole CLI on every cold start. Heavy modules (requests, the transport)
+# are imported inside the functions that need them.
+
+def get_current_week_bounds():
+    """Get the start and end timestamps for the current week (Monday to Sunday)."""
+    now = datetime.now()
+    days_since_monday = now.weekday()  # Monday is 0, Sunday is 6
+    
+    # Calculate start of week (Monday 00:00:00)
+    week_start = now - timedelta(days=days_since_monday, 
+                               hours=now.hour, 
+                               minutes=now.minute, 
+                               seconds=now.second, 
+                               microseconds=now.microsecond)
+    
+    # Calculate end of week (Sunday 23:59:59)  
+    week_end = week_start + timedelta(days=6, hours=23, minutes=59, seconds=59)
+    
+    return int(week_start.timestamp()), int(week_end.timestamp())
+
+def get_user_stats(username: str, max_age: float = None):
+    """
+    Fetch user statistics from LeetCode GraphQL API, reusing a result from the
+    shared profile cache that is at most `max_age` seconds old (default: its TTL).
+    """
+    from leetcode_transport import get_transport
+    from profile_cache import active_profile_cache, cache_key
+    
+    cache = active_profile_cache()
+    key = cache_key("stats", username)
+    if cache:
+        cached = cache.get(key, max_age)
+        if cached is not None:
+            return cached
+    
+    url = "https://leetcode.com/graphql"
+    
+    query = """
+    query getUserStats($username: String!) {
+        allQuestionsCount {
+            difficulty
+            count
+        }
+        matchedUser(username: $username) {
+            username
+            submitStats {
+                acSubmissionNum {
+                    difficulty
+                    count
                 }
-                recentAcSubmissionList(limit: 50) {
-                    id
-                    title
-                    titleSlug
-                    timestamp
+                totalSubmissionNum {
+                    difficulty
+                    count
                 }
             }
+            profile {
+                ranking
+                realName
+                aboutMe
+                userAvatar
+                reputation
+                githubUrl
+                websites
+            }
+            submissionCalendar
+            recentSubmissionList(limit: 50) {
+                title
+                titleSlug
+                timestamp
+                statusDisplay
+                lang
+                __typename
+            }
+            recentAcSubmissionList(limit: 50) {
+                id
+                title
+                titleSlug
+                timestamp
+            }
         }
-        """
-        
-        variables = {"username": username}
-        headers = {
-            "Content-Type": "application/json",
-            "Referer": "https://leetcode.com",
-            "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"
-        }
+    }
+    """
+    
+    variables = {"username": username}
+    headers = {
+        "Content-Type": "application/json",
+        "Referer": "https://leetcode.com",
+        "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"
+    }
+    
+    try:
+        response = get_transport().post(url, json={"query": query, "variables": variables}, headers=headers)
+        response.raise_for_status()
+        data = response.json()
         
-        try:
-            response = requests.post(url, json={"query": query, "variables": variables}, headers=headers)
-            response.raise_for_status()
-            data = response.json()
-            
-            if "errors" in data:
-                return None
-                
-            return data.get("data")
-        except Exception as e:
-            print(f"Error fetching data for {username}: {e}")
+        if "errors" in data:
             return None
+        
+        if cache and data.get("data"):
+            cache.put(key, data["data"])
+        return data.get("data")
+    except Exception as e:
+        print(f"Error fetching data for {username}: {e}")
+        return None
 
-    def get_problem_difficulty(title_slug):
-        """Get the difficulty of a specific problem from LeetCode API."""
-        url = "https://leetcode.com/graphql"
-        query = """
-        query questionData($titleSlug: String!) {
-            question(titleSlug: $titleSlug) {
-                difficulty
-                title
-            }
+def get_problem_difficulty(title_slug):
+    """Get the difficulty of a specific problem from LeetCode API."""
+    from leetcode_transport import get_transport
+    
+    url = "https://leetcode.com/graphql"
+    query = """
+    query questionData($titleSlug: String!) {
+        question(titleSlug: $titleSlug) {
+            difficulty
+            title
         }
-        """
+    }
+    """
+    
+    try:
+        response = get_transport().post(url, json={
+            "query": query,
+            "variables": {"titleSlug": title_slug}
+        }, headers={
+            "Content-Type": "application/json",
+            "Referer": "https://leetcode.com"
+        })
         
+        if response.status_code == 200:
+            data = response.json()
+            question = data.get('data', {}).get('question', {})
+            return question.get('difficulty', 'Medium').lower()
+    except:
+        pass
+    
+    # Default fallback
+    return 'medium'
+
+def calculate_weekly_problems_accurate(recent_submissions, submission_calendar):
+    """Calculate problems solved in the current week with difficulty breakdown."""
+    week_start_ts, week_end_ts = get_current_week_bounds()
+    
+    # Track unique problems solved this week with their difficulties
+    weekly_problems = {}  # title_slug -> difficulty
+    
+    if recent_submissions:
+        for submission in recent_submissions:
+            try:
+                submission_ts = int(submission.get('timestamp', 0))
+                status = submission.get('statusDisplay', '')
+                title_slug = submission.get('titleSlug', '')
+                
+                # Only count accepted submissions in current week
+                if (week_start_ts <= submission_ts <= week_end_ts and 
+                    status == 'Accepted' and title_slug):
+                    
+                    # Avoid duplicate API calls
+                    if title_slug not in weekly_problems:
+                        difficulty = get_problem_difficulty(title_slug)
+                        weekly_problems[title_slug] = difficulty
+            except:
+                continue
+    
+    # Count by difficulty
+    weekly_easy = sum(1 for d in weekly_problems.values() if d == 'easy')
+    weekly_medium = sum(1 for d in weekly_problems.values() if d == 'medium')
+    weekly_hard = sum(1 for d in weekly_problems.values() if d == 'hard')
+    weekly_total = len(weekly_problems)
+    
+    # Fallback if no recent submissions found
+    if weekly_total == 0:
+        calendar_data = {}
         try:
-            response = requests.post(url, json={
-                "query": query, 
-                "variables": {"titleSlug": title_slug}
-            }, headers={
-                "Content-Type": "application/json",
-                "Referer": "https://leetcode.com"
-            })
-            
-            if response.status_code == 200:
-                data = response.json()
-                question = data.get('data', {}).get('question', {})
-                return question.get('difficulty', 'Medium').lower()
+            if submission_calendar:
+                calendar_data = json.loads(submission_calendar)
         except:
-            pass
-        
-        # Default fallback
-        return 'medium'
-    
-    def calculate_weekly_problems_accurate(recent_submissions, submission_calendar):
-        """Calculate problems solved in the current week with difficulty breakdown."""
-        week_start_ts, week_end_ts = get_current_week_bounds()
+            calendar_data = {}
         
-        # Track unique problems solved this week with their difficulties
-        weekly_problems = {}  # title_slug -> difficulty
+        # Count submissions in current week from calendar
+        weekly_submissions = 0
+        current_ts = week_start_ts
+        while current_ts <= week_end_ts:
+            date_key = str(current_ts)
+            weekly_submissions += calendar_data.get(date_key, 0)
+            current_ts += 86400  # Add one day in seconds
         
-        if recent_submissions:
-            for submission in recent_submissions:
+        # Rough estimate with typical difficulty distribution
+        estimated_problems = int(weekly_submissions * 0.7)  # 70% acceptance rate
+        weekly_easy = int(estimated_problems * 0.5)    # 50% easy
+        weekly_medium = int(estimated_problems * 0.4)  # 40% medium  
+        weekly_hard = estimated_problems - weekly_easy - weekly_medium  # 10% hard
+        weekly_total = estimated_problems
+    
+    return {
+        'total': weekly_total,
+        'easy': weekly_easy,
+        'medium': weekly_medium,
+        'hard': weekly_hard
+    }
+
+def calculate_advanced_score(easy: int, medium: int, hard: int, ranking: int, recent_activity: int) -> float:
+    """Calculate score based purely on difficulty and number of questions (the base scoring rules)."""
+    from scoring import get_base_rules
+    
+    base_rules = get_base_rules()
+    score = base_rules.score_counts({"Easy": easy, "Medium": medium, "Hard": hard})
+    
+    # Debug output
+    print(f"Debug - Score calculation: Easy={easy}, Medium={medium}, Hard={hard} with {base_rules.describe()} = {score}")
+    
+    return float(score)
+
+class LeetCodeLeaderboard:
+    """A LeetCode leaderboard to track and compare friend's progress."""
+    
+    def __init__(self, data_file: str = "leaderboard_data.json"):
+        self.data_file = data_file
+        self.snapshot = None  # Precomputed order/stats, valid until the data changes
+        self.source = None
+        self.users = {}
+        # In serverless environment, we'll use environment variables or start fresh
+        self.load_data()
+    
+    @property
+    def users(self):
+        return self._users
+    
+    @users.setter
+    def users(self, users):
+        self._users = users
+        self.snapshot = None
+    
+    def _load_decoded(self, data, source: str) -> None:
+        """Use decoded JSON that is either a ready-to-serve snapshot or a plain users dict."""
+        if is_snapshot(data):
+            self.users = snapshot_users(data)
+            self.snapshot = data
+            self.source = f"{source} (snapshot)"
+        else:
+            self.users = data
+            self.source = source
+    
+    def load_data(self) -> None:
+        """Load existing user data from JSON file or environment."""
+        try:
+            import os
+            import base64
+            
+            # Prefer the compressed, sharded payload (see leaderboard_payload.py)
+            if os.environ.get('LEADERBOARD_PAYLOAD'):
                 try:
-                    submission_ts = int(submission.get('timestamp', 0))
-                    status = submission.get('statusDisplay', '')
-                    title_slug = submission.get('titleSlug', '')
-                    
-                    # Only count accepted submissions in current week
-                    if (week_start_ts <= submission_ts <= week_end_ts and 
-                        status == 'Accepted' and title_slug):
-                        
-                        # Avoid duplicate API calls
-                        if title_slug not in weekly_problems:
-                            difficulty = get_problem_difficulty(title_slug)
-                            weekly_problems[title_slug] = difficulty
-                except:
-                    continue
-        
-        # Count by difficulty
-        weekly_easy = sum(1 for d in weekly_problems.values() if d == 'easy')
-        weekly_medium = sum(1 for d in weekly_problems.values() if d == 'medium')
-        weekly_hard = sum(1 for d in weekly_problems.values() if d == 'hard')
-        weekly_total = len(weekly_problems)
-        
-        # Fallback if no recent submissions found
-        if weekly_total == 0:
-            calendar_data = {}
-            try:
-                if submission_calendar:
-                    calendar_data = json.loads(submission_calendar)
-            except:
-                calendar_data = {}
+                    from leaderboard_payload import decode_payload
+                    self._load_decoded(decode_payload(os.environ), "LEADERBOARD_PAYLOAD")
+                    print(f"Loaded {len(self.users)} users from compressed payload")
+                    return
+                except Exception as e:
+                    print(f"Error decoding compressed payload: {e}")
             
-            # Count submissions in current week from calendar
-            weekly_submissions = 0
-            current_ts = week_start_ts
-            while current_ts <= week_end_ts:
-                date_key = str(current_ts)
-                weekly_submissions += calendar_data.get(date_key, 0)
-                current_ts += 86400  # Add one day in seconds
+            # Fall back to the legacy base64 encoded environment variable
+            encoded_data = os.environ.get('LEADERBOARD_DATA_B64')
+            if encoded_data:
+                try:
+                    decoded_data = base64.b64decode(encoded_data).decode('utf-8')
+                    self._load_decoded(json.loads(decoded_data), "LEADERBOARD_DATA_B64")
+                    print(f"Loaded {len(self.users)} users from environment variables")
+                    return
+                except Exception as e:
+                    print(f"Error decoding environment data: {e}")
             
-            # Rough estimate with typical difficulty distribution
-            estimated_problems = int(weekly_submissions * 0.7)  # 70% acceptance rate
-            weekly_easy = int(estimated_problems * 0.5)    # 50% easy
-            weekly_medium = int(estimated_problems * 0.4)  # 40% medium  
-            weekly_hard = estimated_problems - weekly_easy - weekly_medium  # 10% hard
-            weekly_total = estimated_problems
-        
-        return {
-            'total': weekly_total,
-            'easy': weekly_easy,
-            'medium': weekly_medium,
-            'hard': weekly_hard
-        }
-
-    def calculate_advanced_score(easy: int, medium: int, hard: int, ranking: int, recent_activity: int) -> float:
-        """Calculate score based purely on difficulty and number of questions."""
-        # Simple scoring: Easy=1, Medium=3, Hard=7 (no multipliers)
-        score = easy * 1 + medium * 3 + hard * 7
-        
-        # Debug output
-        print(f"Debug - Score calculation: Easy={easy}×1 + Medium={medium}×3 + Hard={hard}×7 = {score}")
-        
-        return float(score)
-
-    class LeetCodeLeaderboard:
-        """A LeetCode leaderboard to track and compare friend's progress."""
-        
-        def __init__(self, data_file: str = "leaderboard_data.json"):
-            self.data_file = data_file
+            # Try to load from plain JSON environment variable
+            data_str = os.environ.get('LEADERBOARD_DATA')
+            if data_str:
+                self._load_decoded(json.loads(data_str), "LEADERBOARD_DATA")
+                print(f"Loaded {len(self.users)} users from JSON environment variable")
+                return
+            
+            # Try a prebuilt snapshot file, then the plain data file (might not work in serverless)
+            snapshot_file = os.environ.get('LEADERBOARD_SNAPSHOT_FILE', DEFAULT_SNAPSHOT_FILE)
+            if os.path.exists(snapshot_file):
+                with open(snapshot_file, 'r') as f:
+                    self._load_decoded(json.load(f), snapshot_file)
+                    print(f"Loaded {len(self.users)} users from snapshot file")
+                    return
+            
+            with open(self.data_file, 'r') as f:
+                self._load_decoded(json.load(f), self.data_file)
+                print(f"Loaded {len(self.users)} users from local file")
+        except (FileNotFoundError, json.JSONDecodeError, PermissionError):
+            # Start with empty data in serverless environment
+            print("Starting with empty leaderboard")
             self.users = {}
-            # In serverless environment, we'll use environment variables or start fresh
-            self.load_data()
+            self.source = "empty"
+    
+    def save_data(self) -> None:
+        """Save current user data to JSON file."""
+        self.snapshot = None  # Data changed, precomputed views are stale
+        try:
+            # Try to save to local file (works locally, fails in serverless)
+            with open(self.data_file, 'w') as f:
+                json.dump(self.users, f, indent=2)
+            print(f"Saved {len(self.users)} users to local file")
+        except Exception as e:
+            # In serverless environment, we can't persist files
+            # Data will be lost between requests unless stored in external database
+            print(f"Cannot save to file in serverless environment: {e}")
+            print("Note: Data will be lost between requests. Use environment variables or database for persistence.")
+    
+    def add_user(self, username: str, max_age: float = None) -> bool:
+        """
+        Add a new user to the leaderboard, or refresh an existing one. Refresh
+        routes pass max_age=0 to fetch fresh; None reuses cached stats within the TTL.
+        """
+        from scoring import as_score
         
-        def load_data(self) -> None:
-            """Load existing user data from JSON file or environment."""
-            try:
-                import os
-                import base64
-                
-                # Try to load from base64 encoded environment variable first
-                encoded_data = os.environ.get('LEADERBOARD_DATA_B64')
-                if encoded_data:
-                    try:
-                        decoded_data = base64.b64decode(encoded_data).decode('utf-8')
-                        self.users = json.loads(decoded_data)
-                        print(f"Loaded {len(self.users)} users from environment variables")
-                        return
-                    except Exception as e:
-                        print(f"Error decoding environment data: {e}")
-                
-                # Try to load from plain JSON environment variable
-                data_str = os.environ.get('LEADERBOARD_DATA')
-                if data_str:
-                    self.users = json.loads(data_str)
-                    print(f"Loaded {len(self.users)} users from JSON environment variable")
-                    return
-                
-                # Try to load from file (might not work in serverless)
-                with open(self.data_file, 'r') as f:
-                    self.users = json.load(f)
-                    print(f"Loaded {len(self.users)} users from local file")
-            except (FileNotFoundError, json.JSONDecodeError, PermissionError):
-                # Start with empty data in serverless environment
-                print("Starting with empty leaderboard")
-                self.users = {}
-        
-        def save_data(self) -> None:
-            """Save current user data to JSON file."""
-            try:
-                # Try to save to local file (works locally, fails in serverless)
-                with open(self.data_file, 'w') as f:
-                    json.dump(self.users, f, indent=2)
-                print(f"Saved {len(self.users)} users to local file")
-            except Exception as e:
-                # In serverless environment, we can't persist files
-                # Data will be lost between requests unless stored in external database
-                print(f"Cannot save to file in serverless environment: {e}")
-                print("Note: Data will be lost between requests. Use environment variables or database for persistence.")
-        
-        def add_user(self, username: str) -> bool:
-            """Add a new user to the leaderboard."""
-            try:
-                data = get_user_stats(username)
-                if not data or not data.get("matchedUser"):
-                    return False
-                
-                user_data = data["matchedUser"]
-                submit_stats = user_data.get("submitStats", {}).get("acSubmissionNum", [])
-                
-                # Parse difficulty stats with better error handling
-                easy = medium = hard = 0
-                
-                print(f"Debug - Submit stats for {username}: {submit_stats}")
-                
-                for stat in submit_stats:
-                    difficulty = stat.get("difficulty", "").strip().lower()
-                    count = int(stat.get("count", 0))
-                    
-                    print(f"Debug - Processing: difficulty='{difficulty}', count={count}")
-                    
-                    if difficulty == "easy":
-                        easy = count
-                    elif difficulty == "medium":
-                        medium = count
-                    elif difficulty == "hard":
-                        hard = count
-                    else:
-                        print(f"Warning: Unknown difficulty '{difficulty}' with count {count}")
-                
-                print(f"Debug - Final counts for {username}: Easy={easy}, Medium={medium}, Hard={hard}")
-                
-                total_solved = easy + medium + hard
-                
-                # Get additional data
-                profile = user_data.get("profile", {})
-                ranking = profile.get("ranking", 0) or 0
-                recent_submissions = user_data.get("recentSubmissionList", [])
-                submission_calendar = user_data.get("submissionCalendar", "{}")
-                
-                # Calculate accurate weekly stats with proper difficulty detection
-                weekly_stats = calculate_weekly_problems_accurate(recent_submissions, submission_calendar)
-                weekly_total = weekly_stats['total']
-                weekly_easy = weekly_stats['easy']
-                weekly_medium = weekly_stats['medium']
-                weekly_hard = weekly_stats['hard']
-                
-                # Calculate scores (simple difficulty-based scoring)
-                base_score = easy * 1 + medium * 3 + hard * 7
-                advanced_score = calculate_advanced_score(easy, medium, hard, 0, 0)  # Pure difficulty scoring
-                
-                weekly_base_score = weekly_easy * 1 + weekly_medium * 3 + weekly_hard * 7
-                weekly_advanced_score = calculate_advanced_score(weekly_easy, weekly_medium, weekly_hard, 0, 0)  # Pure difficulty scoring
-                
-                # Store user data
-                user_info = {
-                    "username": user_data.get("username", username),
-                    "total_solved": total_solved,
-                    "easy": easy,
-                    "medium": medium,
-                    "hard": hard,
-                    "base_score": base_score,
-                    "advanced_score": advanced_score,
-                    "weekly_total": weekly_total,
-                    "weekly_easy": weekly_easy,
-                    "weekly_medium": weekly_medium,
-                    "weekly_hard": weekly_hard,
-                    "weekly_base_score": weekly_base_score,
-                    "weekly_advanced_score": weekly_advanced_score,
-                    "ranking": ranking,
-                    "last_updated": datetime.now().isoformat(),
-                    "recent_submissions": recent_submissions[:10]
-                }
+        try:
+            data = get_user_stats(username, max_age)
+            if not data or not data.get("matchedUser"):
+                return False
+            
+            user_data = data["matchedUser"]
+            submit_stats = user_data.get("submitStats", {}).get("acSubmissionNum", [])
+            
+            # Parse difficulty stats with better error handling
+            easy = medium = hard = 0
+            
+            print(f"Debug - Submit stats for {username}: {submit_stats}")
+            
+            for stat in submit_stats:
+                difficulty = stat.get("difficulty", "").strip().lower()
+                count = int(stat.get("count", 0))
                 
-                self.users[username.lower()] = user_info
-                self.save_data()
-                return True
+                print(f"Debug - Processing: difficulty='{difficulty}', count={count}")
                 
-            except Exception as e:
-                print(f"Error adding user {username}: {e}")
-                return False
-        
-        def get_leaderboard(self, sort_by: str = "weekly_advanced_score"):
-            """Get sorted leaderboard data."""
-            if not self.users:
-                return []
+                if difficulty == "easy":
+                    easy = count
+                elif difficulty == "medium":
+                    medium = count
+                elif difficulty == "hard":
+                    hard = count
+                else:
+                    print(f"Warning: Unknown difficulty '{difficulty}' with count {count}")
             
-            # Convert to list and add positions
-            leaderboard = []
-            for user_data in self.users.values():
-                leaderboard.append(dict(user_data))
+            print(f"Debug - Final counts for {username}: Easy={easy}, Medium={medium}, Hard={hard}")
             
-            # Sort by specified field
-            reverse_sort = True
-            if sort_by == "ranking":
-                reverse_sort = False
-                # Handle 0 rankings (put them at the end)
-                leaderboard.sort(key=lambda x: x.get(sort_by, float('inf') if reverse_sort else 0), reverse=reverse_sort)
-            else:
-                leaderboard.sort(key=lambda x: x.get(sort_by, 0), reverse=reverse_sort)
+            total_solved = easy + medium + hard
             
-            # Add positions
-            for i, user in enumerate(leaderboard):
-                user['position'] = i + 1
+            # Get additional data
+            profile = user_data.get("profile", {})
+            ranking = profile.get("ranking", 0) or 0
+            recent_submissions = user_data.get("recentSubmissionList", [])
+            submission_calendar = user_data.get("submissionCalendar", "{}")
             
-            return leaderboard
-
-def update_vercel_env_var(token: str, project_id: str, key: str, value: str) -> bool:
-    """Update Vercel environment variable."""
-    try:
-        # First, try to delete existing variable
-        delete_vercel_env_var(token, project_id, key)
+            # Calculate accurate weekly stats with proper difficulty detection
+            weekly_stats = calculate_weekly_problems_accurate(recent_submissions, submission_calendar)
+            weekly_total = weekly_stats['total']
+            weekly_easy = weekly_stats['easy']
+            weekly_medium = weekly_stats['medium']
+            weekly_hard = weekly_stats['hard']
+            
+            # Calculate scores (simple difficulty-based scoring)
+            advanced_score = calculate_advanced_score(easy, medium, hard, 0, 0)  # Pure difficulty scoring
+            base_score = as_score(advanced_score)
+            
+            weekly_advanced_score = calculate_advanced_score(weekly_easy, weekly_medium, weekly_hard, 0, 0)  # Pure difficulty scoring
+            weekly_base_score = as_score(weekly_advanced_score)
+            
+            # Store user data
+            user_info = {
+                "username": user_data.get("username", username),
+                "total_solved": total_solved,
+                "easy": easy,
+                "medium": medium,
+                "hard": hard,
+                "base_score": base_score,
+                "advanced_score": advanced_score,
+                "weekly_total": weekly_total,
+                "weekly_easy": weekly_easy,
+                "weekly_medium": weekly_medium,
+                "weekly_hard": weekly_hard,
+                "weekly_base_score": weekly_base_score,
+                "weekly_advanced_score": weekly_advanced_score,
+                "ranking": ranking,
+                "last_updated": datetime.now(timezone.utc).isoformat(),
+                "recent_submissions": recent_submissions[:10]
+            }
+            
+            self.users[username.lower()] = user_info
+            self.save_data()
+            return True
+            
+        except Exception as e:
+            print(f"Error adding user {username}: {e}")
+            return False
+    
+    def get_leaderboard(self, sort_by: str = "weekly_advanced_score"):
+        """Get sorted leaderboard data."""
+        if not self.users:
+            return []
         
-        # Create new variable
-        url = f"https://api.vercel.com/v9/projects/{project_id}/env"
-        headers = {
-            "Authorization": f"Bearer {token}",
-            "Content-Type": "application/json"
-        }
+        # Serve the precomputed order when the data still matches the snapshot
+        if self.snapshot and sort_by in self.snapshot.get("order", {}):
+            return [dict(self.users[key], position=i)
+                    for i, key in enumerate(self.snapshot["order"][sort_by], 1)]
         
-        data = {
-            "key": key,
-            "value": value,
-            "type": "encrypted",
-            "target": ["production", "preview", "development"]
-        }
+        # Convert to list and add positions
+        leaderboard = []
+        for user_data in self.users.values():
+            leaderboard.append(dict(user_data))
         
-        response = requests.post(url, headers=headers, json=data, timeout=10)
-        response.raise_for_status()
-        return True
+        # Sort by specified field
+        reverse_sort = True
+        if sort_by == "ranking":
+            reverse_sort = False
+            # Handle 0 rankings (put them at the end)
+            leaderboard.sort(key=lambda x: x.get(sort_by, float('inf') if reverse_sort else 0), reverse=reverse_sort)
+        else:
+            leaderboard.sort(key=lambda x: x.get(sort_by, 0), reverse=reverse_sort)
         
-    except Exception as e:
-        print(f"Error updating Vercel env var: {e}")
-        return False
+        # Add positions
+        for i, user in enumerate(leaderboard):
+            user['position'] = i + 1
+        
+        return leaderboard
+    
+    def get_summary_stats(self, leaderboard_data):
+        """Summary stats for the main page, precomputed when a snapshot is loaded."""
+        if not leaderboard_data:
+            return {}
+        
+        stats = dict(self.snapshot["stats"]) if self.snapshot else calculate_stats(self.users)
+        for name, key in stats.pop('champions', {}).items():
+            stats[name] = self.users.get(key)
+        stats['leader'] = leaderboard_data[0]
+        return stats
 
-def delete_vercel_env_var(token: str, project_id: str, key: str):
-    """Delete existing Vercel environment variable."""
+
+class LazyLeaderboard:
+    """Stand-in for the global leaderboard that builds the real store on first use."""
+    
+    def __init__(self, data_file: str):
+        object.__setattr__(self, '_data_file', data_file)
+        object.__setattr__(self, '_store', None)
+    
+    def _get_store(self) -> LeetCodeLeaderboard:
+        if self._store is None:
+            start = time.perf_counter()
+            store = LeetCodeLeaderboard(self._data_file)
+            object.__setattr__(self, '_store', store)
+            STARTUP_TIMINGS['store_build_ms'] = round((time.perf_counter() - start) * 1000, 2)
+            STARTUP_TIMINGS['store_source'] = store.source
+            STARTUP_TIMINGS['store_built_at'] = datetime.now().isoformat()
+        return self._store
+    
+    @property
+    def is_loaded(self) -> bool:
+        return self._store is not None
+    
+    def __getattr__(self, name):
+        return getattr(self._get_store(), name)
+    
+    def __setattr__(self, name, value):
+        setattr(self._get_store(), name, value)
+
+# Value hashes of the payload variables last pushed to Vercel; starts from the
+# project's deploy manifest (or what this deployment was built with) and is
+# updated after every successful push
+_deployed_payload_hashes = None
+
+def publish_github_dispatch(changed_users):
+    """Trigger the GitHub Action that commits refreshed data for `changed_users`."""
+    import requests
+    
     try:
-        # Get existing environment variables
-        url = f"https://api.vercel.com/v9/projects/{project_id}/env"
-        headers = {"Authorization": f"Bearer {token}"}
-        
-        response = requests.get(url, headers=headers, timeout=10)
-        response.raise_for_status()
-        env_vars = response.json()
+        github_token = os.environ.get('GITHUB_TOKEN')
+        if github_token:
+            print("🔄 Triggering GitHub Action to update repository...")
+            
+            # Trigger repository_dispatch event
+            dispatch_url = "https://api.github.com/repos/Shimorikato/LeetCode_leaderboard/dispatches"
+            headers = {
+                "Authorization": f"Bearer {github_token}",
+                "Accept": "application/vnd.github.v3+json",
+                "Content-Type": "application/json"
+            }
+            
+            hashes = content_hashes(leaderboard.users)
+            payload = {
+                "event_type": "update-leaderboard",
+                "client_payload": {
+                    "updated_users": changed_users,
+                    "content_hashes": {key: hashes[key] for key in changed_users if key in hashes},
+                    "timestamp": datetime.now().isoformat()
+                }
+            }
+            
+            response = requests.post(dispatch_url, headers=headers, json=payload, timeout=10)
+            if response.status_code == 204:
+                print("✅ GitHub Action triggered successfully")
+            else:
+                print(f"⚠️ GitHub Action trigger failed: {response.status_code}")
+        else:
+            print("ℹ️ GitHub token not available, skipping repository update")
+            
+    except Exception as github_error:
+        print(f"⚠️ GitHub Action trigger failed: {github_error}")
+
+def publish_vercel_payload():
+    """Push the payload variables that changed since the last push to Vercel."""
+    global _deployed_payload_hashes
+    
+    try:
+        vercel_token = os.environ.get('VERCEL_TOKEN')
+        project_id = os.environ.get('VERCEL_PROJECT_ID')
         
-        # Find and delete existing variable
-        for env_var in env_vars.get('envs', []):
-            if env_var.get('key') == key:
-                env_id = env_var.get('id')
-                delete_url = f"https://api.vercel.com/v9/projects/{project_id}/env/{env_id}"
-                
-                delete_response = requests.delete(delete_url, headers=headers, timeout=10)
-                delete_response.raise_for_status()
-                print(f"🗑️ Deleted old environment variable: {key}")
-                break
-                
-    except Exception:
-        pass  # Ignore deletion errors
+        if vercel_token and project_id:
+            print("🔄 Updating Vercel environment variable...")
+            
+            # Encode the current data as a compressed, sharded payload
+            from leaderboard_payload import (
+                DEPLOY_MANIFEST_VAR, PAYLOAD_HEADER_VAR, deploy_manifest,
+                diff_payload, encode_payload, payload_var_hashes
+            )
+            from vercel_env import VercelEnvClient
+            client = VercelEnvClient(vercel_token, project_id)
+            if _deployed_payload_hashes is None:
+                try:
+                    manifest = json.loads(client.get_plain(DEPLOY_MANIFEST_VAR) or '{}')
+                except ValueError:
+                    manifest = {}
+                _deployed_payload_hashes = manifest.get('vars') or payload_var_hashes(os.environ)
+            payload_vars = encode_payload(leaderboard.users)
+            changed_vars, removed_vars = diff_payload(_deployed_payload_hashes, payload_vars)
+            print(f"📦 Pushing {len(changed_vars)} of {len(payload_vars)} payload variables")
+            
+            # One batched upsert for the changed shards, then the header that points at them
+            client.sync(changed_vars, removed_vars, commit_key=PAYLOAD_HEADER_VAR)
+            _deployed_payload_hashes.update(payload_var_hashes(changed_vars))
+            for key in removed_vars:
+                _deployed_payload_hashes.pop(key, None)
+            # Record what the project now holds, so auto_deploy diffs against it
+            client.upsert({DEPLOY_MANIFEST_VAR: canonical_json(deploy_manifest(leaderboard.users, payload_vars))},
+                          var_type="plain")
+            print("✅ Vercel environment variable updated successfully")
+        else:
+            print("ℹ️ Vercel credentials not available, skipping environment update")
+            
+    except Exception as vercel_error:
+        print(f"⚠️ Vercel update failed: {vercel_error}")
+
+def publish_changes(changed_users):
+    """Publish one coalesced batch of changed users to GitHub and Vercel."""
+    print(f"📣 Publishing changes for {len(changed_users)} user(s): {', '.join(changed_users)}")
+    publish_github_dispatch(changed_users)
+    publish_vercel_payload()
+
+class VercelPublishState:
+    """Debounce state of the live-data publisher, kept in a plain project variable."""
+    
+    def __init__(self, token: str, project_id: str):
+        self.token = token
+        self.project_id = project_id
+    
+    def load(self) -> dict:
+        from leaderboard_payload import PUBLISH_STATE_VAR
+        from vercel_env import VercelEnvClient
+        value = VercelEnvClient(self.token, self.project_id).get_plain(PUBLISH_STATE_VAR)
+        return json.loads(value) if value else {}
+    
+    def save(self, state: dict) -> None:
+        from leaderboard_payload import PUBLISH_STATE_VAR
+        from vercel_env import VercelEnvClient
+        VercelEnvClient(self.token, self.project_id).upsert({PUBLISH_STATE_VAR: json.dumps(state)}, var_type="plain")
+
+def live_data_publish_state():
+    """
+    Where the publish window is kept. Vercel freezes the function once the
+    response is sent, so a timer in the instance would never fire there; the
+    window is kept in the project instead and checked on every trigger.
+    """
+    if not os.environ.get('VERCEL'):
+        return None
+    token, project_id = os.environ.get('VERCEL_TOKEN'), os.environ.get('VERCEL_PROJECT_ID')
+    if not (token and project_id):
+        print("⚠️ No Vercel credentials for the publish window; live-data changes publish on every request")
+        return None
+    return VercelPublishState(token, project_id)
+
+# /api/live-data is called on every page load, so its side effects are
+# debounced: one GitHub dispatch and one env sync per window. Locally that
+# runs on a timer after the response; on Vercel the window is kept in the
+# project and publishing happens inside the request (see background_publisher.py).
+_publish_state = live_data_publish_state()
+live_data_publisher = DebouncedPublisher(
+    publish_changes,
+    window=float(os.environ.get(
+        'LIVE_DATA_PUBLISH_WINDOW', 0 if os.environ.get('VERCEL') and _publish_state is None else 30
+    )),
+    name="live-data publisher",
+    state=_publish_state
+)
+atexit.register(live_data_publisher.flush)
 
 app = Flask(__name__, 
            template_folder='../templates',
            static_folder='../static')
 app.secret_key = 'leetcode_leaderboard_secret_key_2025'
 
+@app.context_processor
+def inject_scoring():
+    """Current base scoring weights for the templates' scoring explanations."""
+    from scoring import get_base_rules
+    
+    base_rules = get_base_rules()
+    return {'scoring_formula': base_rules.describe(), 'scoring_weights': base_rules.weights}
+
 # Add error handling
 @app.errorhandler(500)
 def internal_error(error):
@@ -440,12 +656,8 @@ def not_found(error):
         'message': 'The requested resource was not found'
     }), 404
 
-# Global leaderboard instance
-try:
-    leaderboard = LeetCodeLeaderboard("web_leaderboard_data.json")
-except Exception as e:
-    print(f"Error initializing leaderboard: {e}")
-    leaderboard = LeetCodeLeaderboard("web_leaderboard_data.json")
+# Global leaderboard instance, loaded on first use so light routes stay cheap
+leaderboard = LazyLeaderboard("web_leaderboard_data.json")
 
 @app.route('/test')
 def test():
@@ -464,31 +676,7 @@ def index():
         leaderboard_data = leaderboard.get_leaderboard(sort_by)
         
         # Calculate summary stats including weekly metrics
-        stats = {}
-        if leaderboard_data:
-            # Weekly stats
-            total_weekly_problems = sum(user.get('weekly_total', 0) for user in leaderboard_data)
-            total_weekly_score = sum(user.get('weekly_advanced_score', 0) for user in leaderboard_data)
-            avg_weekly_score = total_weekly_score / len(leaderboard_data) if leaderboard_data else 0
-            
-            # Overall stats
-            stats = {
-                'total_users': len(leaderboard_data),
-                'total_problems': sum(user.get('total_solved', 0) for user in leaderboard_data),
-                'weekly_problems': total_weekly_problems,
-                'weekly_score': total_weekly_score,
-                'avg_weekly_score': avg_weekly_score,
-                'total_advanced_score': sum(user.get('advanced_score', 0) for user in leaderboard_data),
-                'avg_score': sum(user.get('advanced_score', 0) for user in leaderboard_data) / len(leaderboard_data) if leaderboard_data else 0,
-                'leader': leaderboard_data[0] if leaderboard_data else None,
-                'easy_champion': max(leaderboard_data, key=lambda x: x.get('easy', 0)) if leaderboard_data else None,
-                'medium_champion': max(leaderboard_data, key=lambda x: x.get('medium', 0)) if leaderboard_data else None,
-                'hard_champion': max(leaderboard_data, key=lambda x: x.get('hard', 0)) if leaderboard_data else None,
-                # Weekly champions
-                'weekly_easy_champion': max(leaderboard_data, key=lambda x: x.get('weekly_easy', 0)) if leaderboard_data else None,
-                'weekly_medium_champion': max(leaderboard_data, key=lambda x: x.get('weekly_medium', 0)) if leaderboard_data else None,
-                'weekly_hard_champion': max(leaderboard_data, key=lambda x: x.get('weekly_hard', 0)) if leaderboard_data else None
-            }
+        stats = leaderboard.get_summary_stats(leaderboard_data)
         
         return render_template('index.html', 
                              leaderboard=leaderboard_data, 
@@ -614,7 +802,7 @@ def api_add_user():
 def api_refresh_user(username):
     """API endpoint to refresh a user's data."""
     try:
-        success = leaderboard.add_user(username)  # This updates existing users
+        success = leaderboard.add_user(username, max_age=request.args.get('max_age', 0, type=float))  # This updates existing users
         if success:
             return jsonify({'success': True, 'message': f'User {username} refreshed successfully!'})
         else:
@@ -631,7 +819,7 @@ def update_all():
         failed_users = []
         
         for username in leaderboard.users.keys():
-            success = leaderboard.add_user(username)
+            success = leaderboard.add_user(username, max_age=request.args.get('max_age', 0, type=float))
             if success:
                 updated_count += 1
             else:
@@ -656,7 +844,7 @@ def api_refresh_all():
         failed_users = []
         
         for username in leaderboard.users.keys():
-            success = leaderboard.add_user(username)
+            success = leaderboard.add_user(username, max_age=request.args.get('max_age', 0, type=float))
             if success:
                 updated_count += 1
             else:
@@ -688,13 +876,15 @@ def api_live_data():
         # Use the global leaderboard instance instead of creating a temporary one
         global leaderboard
         
+        hashes_before = content_hashes(leaderboard.users)
+        
         # Fetch fresh data for each user and save to files
         updated_users = []
         failed_users = []
         
         for username in usernames:
             print(f"Fetching fresh data for {username}...")
-            success = leaderboard.add_user(username)  # This will save to both JSON files
+            success = leaderboard.add_user(username, max_age=request.args.get('max_age', 0, type=float))  # This will save to both JSON files
             if success:
                 updated_users.append(username)
                 print(f"✅ Updated {username}")
@@ -705,63 +895,20 @@ def api_live_data():
         # Force save to ensure data is persisted
         leaderboard.save_data()
         
-        # Trigger GitHub Action to update repository files
-        try:
-            github_token = os.environ.get('GITHUB_TOKEN')
-            if github_token:
-                print("🔄 Triggering GitHub Action to update repository...")
-                
-                # Trigger repository_dispatch event
-                dispatch_url = "https://api.github.com/repos/Shimorikato/LeetCode_leaderboard/dispatches"
-                headers = {
-                    "Authorization": f"Bearer {github_token}",
-                    "Accept": "application/vnd.github.v3+json",
-                    "Content-Type": "application/json"
-                }
-                
-                payload = {
-                    "event_type": "update-leaderboard",
-                    "client_payload": {
-                        "updated_users": updated_users,
-                        "timestamp": datetime.now().isoformat()
-                    }
-                }
-                
-                response = requests.post(dispatch_url, headers=headers, json=payload, timeout=10)
-                if response.status_code == 204:
-                    print("✅ GitHub Action triggered successfully")
-                else:
-                    print(f"⚠️ GitHub Action trigger failed: {response.status_code}")
-            else:
-                print("ℹ️ GitHub token not available, skipping repository update")
-                
-        except Exception as github_error:
-            print(f"⚠️ GitHub Action trigger failed: {github_error}")
+        # Only users whose ranking-relevant content changed need publishing
+        hashes_after = content_hashes(leaderboard.users)
+        changed_users = sorted(key for key, value in hashes_after.items() if hashes_before.get(key) != value)
         
-        # Update Vercel environment variable if tokens are available
-        try:
-            import base64
-            vercel_token = os.environ.get('VERCEL_TOKEN')
-            project_id = os.environ.get('VERCEL_PROJECT_ID')
-            
-            if vercel_token and project_id:
-                print("🔄 Updating Vercel environment variable...")
-                
-                # Encode the fresh data
-                json_str = json.dumps(leaderboard.users, separators=(',', ':'))
-                encoded_data = base64.b64encode(json_str.encode('utf-8')).decode('utf-8')
-                
-                # Update Vercel environment variable
-                update_success = update_vercel_env_var(vercel_token, project_id, 'LEADERBOARD_DATA_B64', encoded_data)
-                if update_success:
-                    print("✅ Vercel environment variable updated successfully")
-                else:
-                    print("⚠️ Failed to update Vercel environment variable")
-            else:
-                print("ℹ️ Vercel credentials not available, skipping environment update")
-                
-        except Exception as vercel_error:
-            print(f"⚠️ Vercel update failed: {vercel_error}")
+        # Publish to GitHub and Vercel in the background once the response is
+        # sent; refreshes within the publish window are coalesced into one run.
+        # A synchronous publisher runs here instead, while the request is live.
+        if changed_users and live_data_publisher.synchronous:
+            live_data_publisher.trigger(changed_users)
+        elif changed_users:
+            @after_this_request
+            def publish_after_response(response):
+                response.call_on_close(lambda: live_data_publisher.trigger(changed_users))
+                return response
         
         # Get the updated leaderboard data
         leaderboard_data = leaderboard.get_leaderboard('weekly_base_score')
@@ -780,7 +927,7 @@ def api_live_data():
                 'weekly_score': total_weekly_score,
                 'avg_weekly_score': round(avg_weekly_score, 1),
                 'leader': leaderboard_data[0] if leaderboard_data else None,
-                'last_updated': datetime.now().isoformat()
+                'last_updated': datetime.now(timezone.utc).isoformat()
             }
         
         return jsonify({
@@ -788,6 +935,8 @@ def api_live_data():
             'leaderboard': leaderboard_data,
             'stats': stats,
             'updated_users': updated_users,
+            'changed_users': changed_users,
+            'publish_scheduled': bool(changed_users),
             'failed_users': failed_users,
             'timestamp': datetime.now().isoformat()
         })
@@ -803,6 +952,8 @@ def api_live_data():
 @app.route('/api/trigger-update', methods=['POST'])
 def api_trigger_github_update():
     """API endpoint to trigger GitHub Action workflow for leaderboard update."""
+    import requests
+    
     try:
         # Check if GitHub token is available
         github_token = os.environ.get('GITHUB_TOKEN')
@@ -874,7 +1025,7 @@ def api_refresh_all_old():
         failed_users = []
         
         for username in leaderboard.users.keys():
-            success = leaderboard.add_user(username)
+            success = leaderboard.add_user(username, max_age=request.args.get('max_age', 0, type=float))
             if success:
                 updated_count += 1
             else:
@@ -914,7 +1065,7 @@ def remove_user(username):
 def update_user_route(username):
     """Update specific user route."""
     try:
-        success = leaderboard.add_user(username)
+        success = leaderboard.add_user(username, max_age=request.args.get('max_age', 0, type=float))
         if success:
             flash(f'User {username} updated successfully!', 'success')
         else:
@@ -951,12 +1102,30 @@ def api_leaderboard():
         return jsonify({'success': False, 'message': f'Error: {str(e)}'}), 500
 
 
+@app.route('/api/weeks')
+def api_weeks():
+    """ISO weeks available in the weekly archive, oldest first."""
+    from weekly_archive import get_weekly_archive
+    
+    return jsonify({'weeks': get_weekly_archive().weeks()})
+
+@app.route('/api/weeks/<iso_week>')
+def api_week(iso_week):
+    """A finalized week's per-user results, read from the weekly archive."""
+    from weekly_archive import get_weekly_archive
+    
+    archived = get_weekly_archive().read_week(iso_week.upper())
+    if archived is None:
+        return jsonify({'error': f'Week {iso_week} is not archived'}), 404
+    return jsonify(archived)
+
 @app.route('/api/debug')
 def debug_env():
     """Debug endpoint to check environment variables and data loading."""
     import base64
     
     debug_info = {
+        'store_loaded_before_request': leaderboard.is_loaded,
         'env_var_exists': 'LEADERBOARD_DATA_B64' in os.environ,
         'env_var_length': len(os.environ.get('LEADERBOARD_DATA_B64', '')),
         'users_count': len(leaderboard.users),
@@ -981,6 +1150,8 @@ def debug_env():
             encoded_data = os.environ.get('LEADERBOARD_DATA_B64')
             decoded_data = base64.b64decode(encoded_data).decode('utf-8')
             decoded_json = json.loads(decoded_data)
+            if is_snapshot(decoded_json):
+                decoded_json = decoded_json.get('rows', {})
             debug_info['env_decode_success'] = True
             debug_info['env_users_count'] = len(decoded_json)
             debug_info['env_users_list'] = list(decoded_json.keys())
@@ -988,8 +1159,16 @@ def debug_env():
             debug_info['env_decode_success'] = False
             debug_info['env_decode_error'] = str(e)
     
+    if os.environ.get('LEADERBOARD_PAYLOAD'):
+        from leaderboard_payload import payload_size
+        debug_info['payload_header'] = os.environ['LEADERBOARD_PAYLOAD']
+        debug_info['payload_size'] = payload_size(os.environ)
+    
+    debug_info['startup'] = dict(STARTUP_TIMINGS, data_source=leaderboard.source)
     return jsonify(debug_info)
 
 
 # This is required for Vercel
-app = app
\ No newline at end of file
+app = app
+
+STARTUP_TIMINGS['import_ms'] = round((time.perf_counter() - _module_start) * 1000, 2)
\ No newline at end of file
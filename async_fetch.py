@@ -0,0 +1,160 @@
+"""
+Asyncio fetch engine for LeetCode stats.
+
+AsyncLeetCodeClient fans out over many usernames with at most `concurrency`
+GraphQL requests in flight, so one worker can overlap hundreds of upstream
+calls instead of blocking a thread on each. Requests still start no closer
+together than the transport's request_delay: they take slots from the same
+request gate as the synchronous fetchers (see leetcode_transport.py), and the
+semaphore only caps how many are in flight at once.
+
+In live mode requests go through aiohttp when it is installed
+(pip install aiohttp). Without it, and in record/replay mode, each request runs
+the active transport (see leetcode_transport.py) on a worker thread, so
+cassettes behave exactly as they do for the synchronous code.
+
+Responses are parsed by the same parse_user_stats() as get_user_stats().
+"""
+
+import asyncio
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, List, Optional
+
+import requests
+
+from leetcode_leaderboard import (
+    LEETCODE_GRAPHQL_URL, LEETCODE_HEADERS, analyze_time_frames, parse_user_stats, user_stats_request
+)
+from leetcode_transport import get_transport, request_gate
+from profile_cache import active_profile_cache, cache_key
+
+try:
+    import aiohttp
+except ImportError:  # Optional: fall back to the transport on worker threads
+    aiohttp = None
+
+DEFAULT_CONCURRENCY = 16
+
+
+def default_concurrency() -> int:
+    """Maximum in-flight requests, from LEETCODE_FETCH_CONCURRENCY (default 16)."""
+    return max(1, int(os.environ.get("LEETCODE_FETCH_CONCURRENCY", DEFAULT_CONCURRENCY)))
+
+
+class AsyncLeetCodeClient:
+    """
+    Semaphore-bounded async GraphQL client. Use it as an async context manager
+    so the HTTP session is opened and closed on the running event loop:
+
+        async with AsyncLeetCodeClient() as client:
+            fetched, failed = await client.fetch_many(usernames)
+    """
+
+    def __init__(self, concurrency: Optional[int] = None, timeout: float = 10):
+        self.concurrency = concurrency or default_concurrency()
+        self.timeout = timeout
+        self._semaphore = None
+        self._session = None
+        self._executor = None
+
+    async def __aenter__(self) -> "AsyncLeetCodeClient":
+        self._semaphore = asyncio.Semaphore(self.concurrency)
+        if aiohttp is not None and get_transport().mode == "live":
+            self._session = aiohttp.ClientSession(
+                headers=LEETCODE_HEADERS,
+                timeout=aiohttp.ClientTimeout(total=self.timeout),
+                connector=aiohttp.TCPConnector(limit=self.concurrency)
+            )
+        else:
+            if get_transport().mode == "live":
+                print("⚠️ aiohttp is not installed; live requests run on worker threads (pip install aiohttp)")
+            # Sized to the semaphore so every permitted request really is in flight
+            self._executor = ThreadPoolExecutor(self.concurrency, thread_name_prefix="leetcode-fetch")
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+
+    async def _post(self, payload: Dict) -> Dict:
+        # Wait for this request's slot without blocking the event loop
+        delay = request_gate().reserve(get_transport().request_delay)
+        if delay > 0:
+            await asyncio.sleep(delay)
+        
+        if self._session is not None:
+            async with self._session.post(LEETCODE_GRAPHQL_URL, json=payload) as response:
+                response.raise_for_status()
+                return await response.json(content_type=None)
+
+        def post() -> Dict:
+            response = get_transport().post(
+                LEETCODE_GRAPHQL_URL, json=payload, headers=LEETCODE_HEADERS, timeout=self.timeout
+            )
+            response.raise_for_status()
+            return response.json()
+        return await asyncio.get_running_loop().run_in_executor(self._executor, post)
+
+    async def get_user_stats(self, username: str, max_age: Optional[float] = None) -> Optional[Dict]:
+        """Async counterpart of leetcode_leaderboard.get_user_stats(), sharing its cache."""
+        cache = active_profile_cache()
+        key = cache_key("profile", username)
+        if cache:
+            cached = cache.get(key, max_age)
+            if cached is not None:
+                return cached
+        
+        try:
+            async with self._semaphore:
+                data = await self._post(user_stats_request(username))
+            user_stats = parse_user_stats(username, data)
+            if cache and user_stats:
+                cache.put(key, user_stats)
+            return user_stats
+        except (asyncio.TimeoutError, requests.exceptions.Timeout):
+            print(f"⏰ Timeout while fetching data for {username}")
+            return None
+        except requests.exceptions.RequestException as e:
+            print(f"🌐 Network error for {username}: {e}")
+            return None
+        except (KeyError, TypeError) as e:
+            print(f"📊 Data parsing error for {username}: {e}")
+            return None
+        except Exception as e:
+            # aiohttp.ClientError and anything unexpected
+            print(f"💥 Unexpected error for {username}: {e}")
+            return None
+
+    async def fetch_many(self, usernames: Iterable[str], max_age: Optional[float] = None) -> (Dict[str, Dict], List[str]):
+        """
+        Fetch all `usernames` concurrently, reusing profiles cached within `max_age` seconds.
+
+        Returns:
+            (username -> fresh stats with time analytics, usernames that could not be fetched)
+        """
+        usernames = list(usernames)
+        results = await asyncio.gather(*(self.get_user_stats(username, max_age) for username in usernames))
+
+        fetched, failed = {}, []
+        for username, user_stats in zip(usernames, results):
+            if user_stats:
+                user_stats["time_analytics"] = analyze_time_frames(
+                    user_stats.get("submission_calendar", ""),
+                    user_stats.get("recent_submissions", [])
+                )
+                fetched[username] = user_stats
+            else:
+                failed.append(username)
+        return fetched, failed
+
+
+async def fetch_users(usernames: Iterable[str], concurrency: Optional[int] = None,
+                      max_age: Optional[float] = None) -> (Dict[str, Dict], List[str]):
+    """Fetch `usernames` with a short-lived client; see AsyncLeetCodeClient.fetch_many()."""
+    async with AsyncLeetCodeClient(concurrency) as client:
+        return await client.fetch_many(usernames, max_age)
@@ -5,17 +5,41 @@ Automatically syncs local data to Vercel environment variables and triggers depl
 """
 
 import json
-import base64
 import requests
 import os
 import sys
 from datetime import datetime
 
+from leaderboard_payload import (
+    DEFAULT_MAX_SHARD_CHARS,
+    DEPLOY_MANIFEST_VAR,
+    PAYLOAD_HEADER_VAR,
+    SHARD_VAR_PATTERN,
+    deploy_manifest,
+    diff_payload,
+    encode_payload,
+    users_checksum,
+)
+from leaderboard_snapshot import canonical_json, content_hashes
+from vercel_env import VercelEnvClient
+
+# Single-variable format used before the compressed payload; removed on deploy
+LEGACY_DATA_VARS = ("LEADERBOARD_DATA_B64", "LEADERBOARD_DATA_B64_CHECKSUM")
+
+# Manifest of the last deploy: overall checksum, per-user content hashes and
+# per-variable value hashes (see leaderboard_payload.deploy_manifest). The copy
+# kept in the Vercel project (DEPLOY_MANIFEST_VAR) is authoritative, since CI
+# checkouts start without this file and the serverless app pushes payloads too.
+# Older versions stored only the checksum here.
+MANIFEST_PATH = ".vercel_data_checksum"
+
 class VercelAutoDeployer:
     def __init__(self):
         self.vercel_token = os.getenv('VERCEL_TOKEN')
         self.project_id = os.getenv('VERCEL_PROJECT_ID')
-        self.base_url = "https://api.vercel.com"
+        self.client = None
+        if self.vercel_token and self.project_id:
+            self.client = VercelEnvClient(self.vercel_token, self.project_id)
         
     def load_local_data(self):
         """Load data from web_leaderboard_data.json"""
@@ -27,180 +51,63 @@ class VercelAutoDeployer:
             return None
     
     def encode_data(self, data):
-        """Encode data to base64"""
-        json_str = json.dumps(data, separators=(',', ':'))
-        encoded = base64.b64encode(json_str.encode('utf-8')).decode('utf-8')
-        return encoded
+        """Encode data as compressed, sharded env vars (name -> value)"""
+        max_shard_chars = int(os.getenv('LEADERBOARD_MAX_SHARD_CHARS', DEFAULT_MAX_SHARD_CHARS))
+        return encode_payload(data, max_shard_chars=max_shard_chars)
     
-    def get_existing_env_vars(self):
-        """Get existing environment variables from Vercel"""
-        if not self.vercel_token or not self.project_id:
-            return None
-            
-        url = f"{self.base_url}/v9/projects/{self.project_id}/env"
-        headers = {
-            "Authorization": f"Bearer {self.vercel_token}",
-            "Content-Type": "application/json"
-        }
+    def read_manifest(self) -> dict:
+        """
+        Read the last deployed manifest: from the Vercel project when credentials
+        are set, else from the local file (a legacy checksum-only file yields
+        just the checksum).
+        """
+        if self.client:
+            try:
+                value = self.client.get_plain(DEPLOY_MANIFEST_VAR)
+            except requests.RequestException as e:
+                print(f"⚠️ Could not read the deploy manifest from Vercel: {e}")
+                value = None
+            if value:
+                try:
+                    manifest = json.loads(value)
+                except ValueError:
+                    manifest = None
+                if isinstance(manifest, dict):
+                    return manifest
         
         try:
-            response = requests.get(url, headers=headers)
-            response.raise_for_status()
-            return response.json()
-        except requests.RequestException as e:
-            print(f"❌ Error fetching environment variables: {e}")
-            return None
-
-    def get_env_var_value(self, key: str):
-        """Return the value of a specific environment variable by key.
-        Vercel's env list doesn't return decrypted values; for comparison,
-        we store our last-deployed value in a dedicated checksum env var.
-
-        Fallback approach:
-        - Look for an env var named f"{key}_CHECKSUM" which stores a short hash.
-        - If present, return that hash; else return None.
-
-        This avoids trying to read encrypted values which Vercel won't expose.
-        """
-        envs = self.get_existing_env_vars() or {}
-        for env in envs.get('envs', []):
-            if env.get('key') == f"{key}_CHECKSUM":
-                # The value is not returned; but for checksums, we store as 'plain'
-                # If Vercel masks values, we cannot fetch it; in that case, skip
-                # comparison and proceed to update. However, if type is 'plain',
-                # we can read it via a separate API. To keep it simple, rely on presence.
-                # Since the API does not expose values, we cannot retrieve it here.
-                # We return a sentinel indicating checksum exists, prompting comparison
-                # using local cache file instead (implemented below).
-                return "exists"
-        return None
-
-    def compute_checksum(self, encoded_data: str) -> str:
-        """Compute a short checksum for the encoded data for change detection."""
-        import hashlib
-        return hashlib.sha256(encoded_data.encode('utf-8')).hexdigest()[:16]
+            with open(MANIFEST_PATH, 'r', encoding='utf-8') as f:
+                text = f.read().strip()
+        except FileNotFoundError:
+            return {}
+        try:
+            manifest = json.loads(text)
+        except ValueError:
+            manifest = None
+        return manifest if isinstance(manifest, dict) else {"checksum": text}
 
     def read_local_checksum(self) -> str | None:
-        """Read last deployed checksum from a local cache file if present."""
-        cache_path = ".vercel_data_checksum"
-        try:
-            with open(cache_path, 'r', encoding='utf-8') as f:
-                return f.read().strip()
-        except FileNotFoundError:
-            return None
+        """Read last deployed checksum from the local manifest if present."""
+        return self.read_manifest().get("checksum")
 
-    def write_local_checksum(self, checksum: str) -> None:
-        """Write checksum to a local cache file for subsequent comparisons."""
-        cache_path = ".vercel_data_checksum"
+    def write_manifest(self, manifest: dict) -> None:
+        """Write the deploy manifest for subsequent comparisons, locally and to Vercel."""
         try:
-            with open(cache_path, 'w', encoding='utf-8') as f:
-                f.write(checksum)
+            with open(MANIFEST_PATH, 'w', encoding='utf-8') as f:
+                json.dump(manifest, f, indent=2, sort_keys=True)
         except Exception:
             pass
-    
-    def update_env_var(self, key, value):
-        """Update or create environment variable in Vercel"""
-        if not self.vercel_token or not self.project_id:
-            print("❌ VERCEL_TOKEN and VERCEL_PROJECT_ID must be set!")
-            return False
-        
-        # First, try to delete existing variable
-        self.delete_env_var(key)
-        
-        # Create new variable
-        url = f"{self.base_url}/v9/projects/{self.project_id}/env"
-        headers = {
-            "Authorization": f"Bearer {self.vercel_token}",
-            "Content-Type": "application/json"
-        }
-        
-        data = {
-            "key": key,
-            "value": value,
-            "type": "encrypted",
-            "target": ["production", "preview", "development"]
-        }
-        
-        try:
-            response = requests.post(url, headers=headers, json=data)
-            response.raise_for_status()
-            print(f"✅ Updated environment variable: {key}")
-            return True
-        except requests.RequestException as e:
-            print(f"❌ Error updating environment variable: {e}")
-            return False
-
-    def update_plain_env_var(self, key, value):
-        """Create a non-encrypted env var (for checksum tracking)."""
-        if not self.vercel_token or not self.project_id:
-            return False
-
-        # Delete then recreate
-        self.delete_env_var(key)
-
-        url = f"{self.base_url}/v9/projects/{self.project_id}/env"
-        headers = {
-            "Authorization": f"Bearer {self.vercel_token}",
-            "Content-Type": "application/json"
-        }
-        data = {
-            "key": key,
-            "value": value,
-            "type": "plain",
-            "target": ["production", "preview", "development"]
-        }
-        try:
-            response = requests.post(url, headers=headers, json=data)
-            response.raise_for_status()
-            return True
-        except requests.RequestException:
-            return False
-    
-    def delete_env_var(self, key):
-        """Delete existing environment variable"""
-        env_vars = self.get_existing_env_vars()
-        if not env_vars:
-            return
-        
-        # Find existing variable
-        for env_var in env_vars.get('envs', []):
-            if env_var.get('key') == key:
-                env_id = env_var.get('id')
-                url = f"{self.base_url}/v9/projects/{self.project_id}/env/{env_id}"
-                headers = {"Authorization": f"Bearer {self.vercel_token}"}
-                
-                try:
-                    response = requests.delete(url, headers=headers)
-                    response.raise_for_status()
-                    print(f"🗑️ Deleted old environment variable: {key}")
-                except requests.RequestException:
-                    pass  # Ignore deletion errors
-                break
+        if self.client:
+            try:
+                self.client.upsert({DEPLOY_MANIFEST_VAR: canonical_json(manifest)}, var_type="plain")
+            except requests.RequestException as e:
+                # The next deploy then pushes every variable again, which is safe
+                print(f"⚠️ Could not store the deploy manifest in Vercel: {e}")
     
     def trigger_deployment(self):
         """Trigger a new deployment"""
-        if not self.vercel_token or not self.project_id:
-            return False
-            
-        url = f"{self.base_url}/v13/deployments"
-        headers = {
-            "Authorization": f"Bearer {self.vercel_token}",
-            "Content-Type": "application/json"
-        }
-        
-        data = {
-            "name": "leetcode-leaderboard",
-            "gitSource": {
-                "type": "github",
-                "ref": "main"
-            }
-        }
-        
         try:
-            response = requests.post(url, headers=headers, json=data)
-            response.raise_for_status()
-            deployment = response.json()
-            deployment_url = deployment.get('url', 'unknown')
+            deployment_url = self.client.trigger_deployment()
             print(f"🚀 Triggered deployment: https://{deployment_url}")
             return True
         except requests.RequestException as e:
@@ -220,23 +127,33 @@ class VercelAutoDeployer:
         
         print(f"📊 Loaded data for {len(data)} users")
         
-        # Encode data
-        encoded_data = self.encode_data(data)
-        print(f"🔐 Encoded data ({len(encoded_data)} characters)")
-
-        # Compute checksum and check local cache to avoid redundant updates
-        checksum = self.compute_checksum(encoded_data)
-        prev_checksum = self.read_local_checksum()
-        if prev_checksum == checksum:
+        # Checksum the per-user content hashes, so refreshes that only touched
+        # volatile fields (fetch time, activity windows) do not trigger a redeploy
+        user_hashes = content_hashes(data)
+        checksum = users_checksum(user_hashes)
+        manifest = self.read_manifest()
+        if manifest.get("checksum") == checksum:
             print("⏱️ No changes detected (checksum match). Skipping Vercel update.")
             return True
+
+        previous_users = manifest.get("users")
+        if previous_users is not None:
+            changed_users = sorted(key for key, value in user_hashes.items() if previous_users.get(key) != value)
+            removed_users = sorted(key for key in previous_users if key not in user_hashes)
+            print(f"👥 Changed users: {', '.join(changed_users) or 'none'}"
+                  f"{' | removed: ' + ', '.join(removed_users) if removed_users else ''}")
+        
+        # Encode data
+        payload_vars = self.encode_data(data)
+        encoded_data = "\n".join(f"{key}={value}" for key, value in sorted(payload_vars.items()))
+        print(f"🔐 Encoded data ({len(encoded_data)} characters in {len(payload_vars) - 1} shards)")
+        print(f"   Header: {payload_vars[PAYLOAD_HEADER_VAR]}")
         
         # Check if we have Vercel credentials
-        if not self.vercel_token or not self.project_id:
+        if not self.client:
             print("\n📋 MANUAL SETUP REQUIRED:")
             print("="*60)
-            print("Environment Variable Name: LEADERBOARD_DATA_B64")
-            print("Environment Variable Value:")
+            print("Environment Variables (NAME=VALUE):")
             print(encoded_data)
             print("="*60)
             
@@ -263,17 +180,30 @@ class VercelAutoDeployer:
                 return True
             return False
         
-        # Update environment variable
-        success = self.update_env_var("LEADERBOARD_DATA_B64", encoded_data)
-        if not success:
+        # Push only variables whose value changed since the last deploy; the
+        # header goes last so it never points at missing shards
+        changed_vars, removed_vars = diff_payload(manifest.get("vars", {}), payload_vars)
+        if "vars" not in manifest:
+            # No record of what is deployed yet; find leftovers in the listing instead
+            removed_vars = self.client.find_keys(
+                lambda key: (SHARD_VAR_PATTERN.match(key) and key not in payload_vars) or key in LEGACY_DATA_VARS
+            )
+        print(f"📦 Pushing {len(changed_vars)} of {len(payload_vars)} payload variables")
+        try:
+            result = self.client.sync(changed_vars, removed_vars, commit_key=PAYLOAD_HEADER_VAR)
+            self.client.upsert({f"{PAYLOAD_HEADER_VAR}_CHECKSUM": checksum}, var_type="plain")
+        except requests.RequestException as e:
+            print(f"❌ Error updating environment variables: {e}")
             return False
+        for key in result["deleted"]:
+            print(f"🗑️ Deleted old environment variable: {key}")
 
-        # Store checksum both locally and in Vercel (plain env var)
-        self.write_local_checksum(checksum)
-        self.update_plain_env_var("LEADERBOARD_DATA_B64_CHECKSUM", checksum)
+        # Store the manifest locally and in the project for the next deploy
+        self.write_manifest(deploy_manifest(data, payload_vars))
         
-        # Trigger deployment
-        self.trigger_deployment()
+        # Trigger deployment, only needed when a payload variable actually changed
+        if result["upserted"] or result["deleted"]:
+            self.trigger_deployment()
         
         print("✅ Automated deployment completed!")
         return True
@@ -0,0 +1,125 @@
+"""
+Debounced background publisher for outbound side effects.
+
+Request handlers call trigger() with the keys that changed (usernames here).
+The first trigger opens a window; every trigger inside it is merged into the
+same pending set, and when the window closes the action runs once, on a
+background thread, with the union of everything that changed. Runs never
+overlap, and a failing action is logged without affecting later runs.
+
+Delivery is best effort: pending work lives in process memory, so it is lost
+if the process is frozen or killed before the window closes (flush() at exit
+covers normal shutdown only). Where that can happen, e.g. serverless
+functions that are suspended after each response, pass a `state` store
+instead. The window is then kept outside the process: every trigger() loads
+{"last_published": <epoch seconds>, "pending": [...]}, adds its keys and
+either runs the action at once, on the calling thread, if the window since
+the last run has passed, or saves the keys as pending for the first trigger
+after it. Keys pending when triggers stop are delivered by that next trigger,
+not on a timer. With a window of 0 every trigger runs the action at once.
+"""
+
+import threading
+import time
+from typing import Callable, Dict, Iterable, List
+
+
+class DebouncedPublisher:
+    """Coalesce triggers within `window` seconds into one background call of `action`."""
+
+    def __init__(self, action: Callable[[List[str]], None], window: float = 30.0, name: str = "publisher",
+                 state=None):
+        """
+        Args:
+            action: Called with the sorted pending keys
+            window: Seconds to coalesce triggers over
+            name: Label for threads and log messages
+            state: Optional store with load() -> dict and save(dict) that keeps
+                the window across processes (see the module docstring)
+        """
+        self.action = action
+        self.window = window
+        self.name = name
+        self.state = state
+        self._lock = threading.Lock()
+        self._run_lock = threading.Lock()
+        self._pending = set()
+        self._timer = None
+
+    @property
+    def pending(self) -> List[str]:
+        """Keys waiting for the next run."""
+        with self._lock:
+            return sorted(self._pending)
+
+    @property
+    def synchronous(self) -> bool:
+        """True if trigger() does its work on the calling thread instead of scheduling it."""
+        return self.window <= 0 or self.state is not None
+
+    def trigger(self, keys: Iterable[str] = ()) -> None:
+        """Add `keys` to the pending set and open a window if none is open (or run now, see synchronous)."""
+        if self.state is not None:
+            self._trigger_with_state(keys)
+            return
+        if self.window <= 0:
+            with self._lock:
+                self._pending.update(keys)
+            self._run()
+            return
+        with self._lock:
+            self._pending.update(keys)
+            if self._timer is None:
+                self._timer = threading.Timer(self.window, self._run)
+                self._timer.daemon = True
+                self._timer.name = f"{self.name}-debounce"
+                self._timer.start()
+
+    def flush(self) -> None:
+        """Run any pending work now, on the calling thread."""
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+        self._run()
+
+    def _trigger_with_state(self, keys: Iterable[str]) -> None:
+        with self._run_lock:
+            try:
+                saved = self.state.load() or {}
+            except Exception as e:
+                print(f"⚠️ {self.name} could not load its publish state: {e}")
+                saved = {}
+            pending = set(saved.get("pending", [])) | set(keys)
+            last_published = float(saved.get("last_published", 0))
+            now = time.time()
+            if not pending:
+                return
+            if now - last_published < self.window:
+                self._save_state({"last_published": last_published, "pending": sorted(pending)})
+                return
+
+            self._save_state({"last_published": now, "pending": []})
+            try:
+                self.action(sorted(pending))
+            except Exception as e:
+                print(f"⚠️ {self.name} failed for {len(pending)} change(s): {e}")
+                self._save_state({"last_published": now, "pending": sorted(pending)})
+
+    def _save_state(self, state: Dict) -> None:
+        try:
+            self.state.save(state)
+        except Exception as e:
+            print(f"⚠️ {self.name} could not save its publish state: {e}")
+
+    def _run(self) -> None:
+        with self._run_lock:
+            with self._lock:
+                keys = sorted(self._pending)
+                self._pending.clear()
+                self._timer = None
+            if not keys:
+                return
+            try:
+                self.action(keys)
+            except Exception as e:
+                print(f"⚠️ {self.name} failed for {len(keys)} change(s): {e}")
@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmarks for the CPU-side scoring and analytics code.
+
+Runs every hot path against synthetic boards (1k, 10k and 100k users by
+default), compares each result with the budgets in benchmark_budgets.json and
+exits non-zero when anything is over budget.
+
+Usage:
+    python benchmark.py                       # run all sizes, check budgets
+    python benchmark.py --sizes 1000,10000    # run selected sizes only
+    python benchmark.py --save-baseline       # also store results as the new baseline
+"""
+
+import json
+import os
+import sys
+import tempfile
+import time
+from contextlib import redirect_stdout
+from typing import Callable, Dict, List
+
+from leetcode_leaderboard import (
+    LeetCodeLeaderboard,
+    analyze_time_frames,
+    calculate_weekly_problems_from_submissions,
+    lookup_problem_difficulty,
+    parse_submission_calendar,
+)
+from synthetic_data import generate_users
+
+DEFAULT_SIZES = (1000, 10000, 100000)
+BUDGETS_FILE = "benchmark_budgets.json"
+BASELINE_FILE = "benchmark_baseline.json"
+
+SORT_KEYS = [
+    "weekly_base_score", "weekly_total", "base_score", "total_solved",
+    "easy", "medium", "hard", "ranking"
+]
+
+
+def build_leaderboard(users: Dict[str, Dict]) -> LeetCodeLeaderboard:
+    """Create a LeetCodeLeaderboard holding `users` without touching real data files."""
+    data_file = os.path.join(tempfile.mkdtemp(prefix="leaderboard-bench-"), "board.json")
+    with open(os.devnull, 'w') as devnull, redirect_stdout(devnull):
+        board = LeetCodeLeaderboard(data_file)
+    board.users = users
+    return board
+
+
+def build_benchmarks(users: Dict[str, Dict]) -> Dict[str, Callable[[], None]]:
+    """Return name -> zero-argument callable for every benchmarked hot path."""
+    with open(os.devnull, 'w') as devnull, redirect_stdout(devnull):
+        from web_app import calculate_summary_stats
+
+    records = list(users.values())
+    board = build_leaderboard(users)
+
+    def weekly_problems():
+        for user in records:
+            calculate_weekly_problems_from_submissions(user["recent_submissions"])
+
+    def difficulty_lookup():
+        for user in records:
+            for submission in user["recent_submissions"]:
+                lookup_problem_difficulty(submission["title"])
+
+    def time_frames():
+        for user in records:
+            analyze_time_frames(user["submission_calendar"], user["recent_submissions"])
+
+    def calendar_parse():
+        for user in records:
+            parse_submission_calendar(user["submission_calendar"])
+
+    benchmarks = {
+        "calculate_weekly_problems_from_submissions": weekly_problems,
+        "lookup_problem_difficulty": difficulty_lookup,
+        "analyze_time_frames": time_frames,
+        "parse_submission_calendar": calendar_parse,
+    }
+
+    for sort_key in SORT_KEYS:
+        benchmarks[f"get_leaderboard[{sort_key}]"] = lambda sort_key=sort_key: board.get_leaderboard(sort_key)
+
+    sorted_board = board.get_leaderboard()
+    benchmarks["index_summary_stats"] = lambda: calculate_summary_stats(sorted_board)
+
+    return benchmarks
+
+
+def time_call(func: Callable[[], None], repeat: int) -> float:
+    """Return the best wall time of `repeat` runs in milliseconds (output silenced)."""
+    best = float("inf")
+    with open(os.devnull, 'w') as devnull, redirect_stdout(devnull):
+        for _ in range(repeat):
+            start = time.perf_counter()
+            func()
+            best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def load_json(path: str) -> Dict:
+    try:
+        with open(path, 'r') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+
+
+def run(sizes: List[int], budgets: Dict[str, float], baseline: Dict[str, float]) -> Dict[str, float]:
+    """Run all benchmarks for each board size and print a results table."""
+    results = {}
+    print(f"{'Benchmark':<48} {'Users':>7} {'Time (ms)':>11} {'Budget':>9} {'Baseline':>9}  Status")
+    print("-" * 100)
+
+    for size in sizes:
+        users = generate_users(size)
+        repeat = 5 if size <= 1000 else 3 if size <= 10000 else 1
+
+        for name, func in build_benchmarks(users).items():
+            key = f"{name}@{size}"
+            elapsed = time_call(func, repeat)
+            results[key] = round(elapsed, 3)
+
+            budget = budgets.get(key)
+            status = "✅" if budget is None or elapsed <= budget else "❌ over budget"
+            budget_str = f"{budget:.0f}" if budget is not None else "-"
+            baseline_str = f"{baseline[key]:.1f}" if key in baseline else "-"
+            print(f"{name:<48} {size:>7} {elapsed:>11.2f} {budget_str:>9} {baseline_str:>9}  {status}")
+
+    return results
+
+
+def main():
+    sizes = list(DEFAULT_SIZES)
+    if "--sizes" in sys.argv:
+        index = sys.argv.index("--sizes")
+        sizes = [int(size) for size in sys.argv[index + 1].split(",")]
+
+    budgets_file = BUDGETS_FILE
+    if "--budgets" in sys.argv:
+        budgets_file = sys.argv[sys.argv.index("--budgets") + 1]
+
+    budgets = load_json(budgets_file)
+    baseline = load_json(BASELINE_FILE)
+
+    print(f"⏱️ Running benchmarks for board sizes: {', '.join(str(size) for size in sizes)}")
+    results = run(sizes, budgets, baseline)
+
+    if "--save-baseline" in sys.argv:
+        baseline.update(results)
+        with open(BASELINE_FILE, 'w') as f:
+            json.dump(baseline, f, indent=2, sort_keys=True)
+        print(f"💾 Baseline saved to {BASELINE_FILE}")
+
+    over_budget = [key for key, elapsed in results.items() if key in budgets and elapsed > budgets[key]]
+    if over_budget:
+        print(f"❌ {len(over_budget)} benchmark(s) over budget: {', '.join(over_budget)}")
+        sys.exit(1)
+
+    print("✅ All benchmarks within budget")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""
+Polling file watcher (stdlib only).
+
+A file counts as changed when its inode, size or mtime differs from the last
+successful check, which catches both in-place writes and the rename used by
+write_json_atomic() and `git pull`. The callback runs on the watcher thread;
+if it raises, the change is retried on the next poll instead of being lost.
+"""
+
+import os
+import threading
+from typing import Callable, List, Optional
+
+
+def file_id(path: str) -> Optional[List[int]]:
+    """[inode, size, mtime_ns] of `path`, or None if it does not exist."""
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return [st.st_ino, st.st_size, st.st_mtime_ns]
+
+
+class FileWatcher:
+    """Call `on_change()` whenever `path` changes, checking every `interval` seconds."""
+
+    def __init__(self, path: str, on_change: Callable[[], None], interval: float = 2.0, name: str = "file-watcher"):
+        self.path = path
+        self.on_change = on_change
+        self.interval = interval
+        self.name = name
+        self._last = file_id(path)
+        self._stop = threading.Event()
+        self._thread = None
+
+    def check(self) -> bool:
+        """Run the callback if the file changed since the last check; returns whether it ran."""
+        current = file_id(self.path)
+        if current is None or current == self._last:
+            return False
+        try:
+            self.on_change()
+        except Exception as e:
+            print(f"⚠️ {self.name} could not apply changes to {self.path}: {e}")
+            return False
+        self._last = current
+        return True
+
+    def start(self) -> "FileWatcher":
+        """Start polling on a daemon thread."""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._loop, name=self.name, daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _loop(self) -> None:
+        while not self._stop.wait(self.interval):
+            self.check()
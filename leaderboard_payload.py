@@ -0,0 +1,235 @@
+"""
+Compressed, sharded environment-variable payload for Vercel data sync.
+
+The leaderboard snapshot is split into a hot part (summary rows, sorted order,
+stats and volatile per-user fields) and a cold part (per-user detail fields
+such as submission calendars). Both are compressed and base64-encoded, one
+environment variable per shard:
+
+    LEADERBOARD_PAYLOAD          header, e.g. "LBP/2 hot=zlib:1:3f2a9c01 cold=lzma:2:9be04d7a,11c0e5f2"
+    LEADERBOARD_PAYLOAD_HOT_0    hot part, cut into chunks of max_shard_chars
+    LEADERBOARD_PAYLOAD_COLD_0   cold bucket 0, ...
+
+Cold data is bucketed by a stable hash of the username and every bucket is
+compressed on its own, so a change to one user only changes that user's
+bucket; sync code compares per-variable hashes and pushes just those.
+
+Each header entry is codec:shard count:checksum(s). The "LBP/<version>" prefix
+lets the format change later; version 1 (cold part chunked like the hot part)
+is still decoded.
+"""
+
+import base64
+import hashlib
+import json
+import lzma
+import re
+import zlib
+from datetime import datetime
+from typing import Dict, Mapping
+
+from leaderboard_snapshot import VOLATILE_FIELDS, build_snapshot, canonical_json, content_hashes, stable_bucket
+
+PAYLOAD_VERSION = 2
+SUPPORTED_VERSIONS = (1, 2)
+PAYLOAD_HEADER_VAR = "LEADERBOARD_PAYLOAD"
+SHARD_VAR_PATTERN = re.compile(r"^LEADERBOARD_PAYLOAD_(HOT|COLD)_\d+$")
+DEFAULT_MAX_SHARD_CHARS = 30000
+# Plain variable holding deploy_manifest() of what the project currently has
+DEPLOY_MANIFEST_VAR = "LEADERBOARD_DEPLOY_MANIFEST"
+# Plain variable holding the live-data publisher's debounce state (see background_publisher.py)
+PUBLISH_STATE_VAR = "LEADERBOARD_PUBLISH_STATE"
+MAX_COLD_BUCKETS = 256
+
+CODECS = {
+    "zlib": (lambda data: zlib.compress(data, 9), zlib.decompress),
+    "lzma": (lambda data: lzma.compress(data, preset=9), lzma.decompress),
+}
+
+
+def shard_var_name(kind: str, index: int) -> str:
+    return f"{PAYLOAD_HEADER_VAR}_{kind.upper()}_{index}"
+
+
+def _checksum(value: str) -> str:
+    return hashlib.sha256(value.encode('ascii')).hexdigest()[:8]
+
+
+def _compress(doc, codec: str) -> str:
+    compress, _ = CODECS[codec]
+    return base64.b64encode(compress(canonical_json(doc).encode('utf-8'))).decode('ascii')
+
+
+def _decompress(encoded: str, codec: str):
+    _, decompress = CODECS[codec]
+    return json.loads(decompress(base64.b64decode(encoded)).decode('utf-8'))
+
+
+def _encode_cold_buckets(cold: Dict[str, Dict], codec: str, max_shard_chars: int) -> list:
+    """Compress cold data per user bucket, doubling the bucket count until each fits."""
+    # Start from the power of two the whole part would need (sized with fast zlib,
+    # which never compresses better than lzma), then double if still too big
+    estimate = len(_compress(cold, "zlib"))
+    buckets = 1
+    while buckets < MAX_COLD_BUCKETS and buckets * max_shard_chars < estimate:
+        buckets *= 2
+    while True:
+        groups = [{} for _ in range(buckets)]
+        for key in cold:
+            groups[stable_bucket(key, buckets)][key] = cold[key]
+        encoded = [_compress(group, codec) for group in groups]
+        if max(len(value) for value in encoded) <= max_shard_chars or buckets >= MAX_COLD_BUCKETS:
+            return encoded
+        buckets *= 2
+
+
+def encode_payload(users: Dict[str, Dict], hot_codec: str = "zlib", cold_codec: str = "lzma",
+                   max_shard_chars: int = DEFAULT_MAX_SHARD_CHARS) -> Dict[str, str]:
+    """
+    Encode leaderboard data as header + shard environment variables.
+
+    The hot part defaults to zlib because it is decoded on every cold start;
+    the cold part defaults to lzma for the best ratio on calendar strings.
+
+    Args:
+        users: Leaderboard data (username -> user record)
+        hot_codec: Codec for summary rows, order and stats ("zlib" or "lzma")
+        cold_codec: Codec for per-user detail fields ("zlib" or "lzma")
+        max_shard_chars: Maximum length of a single shard value
+
+    Returns:
+        Dictionary of environment variable name -> value
+    """
+    snapshot = build_snapshot(users)
+    snapshot.pop("generated_at")  # Would make every hot shard differ on every run
+    cold = snapshot.pop("details")
+
+    # Volatile detail fields ride in the hot part so cold buckets only change with content
+    for key, details in cold.items():
+        for field in [field for field in details if field in VOLATILE_FIELDS]:
+            snapshot["rows"][key][field] = details.pop(field)
+
+    env_vars = {}
+    hot = _compress(snapshot, hot_codec)
+    chunks = [hot[i:i + max_shard_chars] for i in range(0, len(hot), max_shard_chars)] or [""]
+    for index, chunk in enumerate(chunks):
+        env_vars[shard_var_name("hot", index)] = chunk
+
+    buckets = _encode_cold_buckets(cold, cold_codec, max_shard_chars)
+    for index, bucket in enumerate(buckets):
+        env_vars[shard_var_name("cold", index)] = bucket
+
+    env_vars[PAYLOAD_HEADER_VAR] = (
+        f"LBP/{PAYLOAD_VERSION} "
+        f"hot={hot_codec}:{len(chunks)}:{_checksum(hot)} "
+        f"cold={cold_codec}:{len(buckets)}:{','.join(_checksum(bucket) for bucket in buckets)}"
+    )
+    return env_vars
+
+
+def parse_header(header: str) -> Dict:
+    """Parse a payload header into {"version", kind: {"codec", "shards", "checksums"}}."""
+    tokens = header.split()
+    version = tokens[0][len("LBP/"):] if tokens and tokens[0].startswith("LBP/") else None
+    if not version or not version.isdigit() or int(version) not in SUPPORTED_VERSIONS:
+        raise ValueError(f"Unsupported payload header: {tokens[0] if tokens else '(empty)'}")
+
+    parts = {"version": int(version)}
+    for token in tokens[1:]:
+        kind, _, spec = token.partition("=")
+        codec, shards, checksums = spec.split(":")
+        if codec not in CODECS:
+            raise ValueError(f"Unsupported payload codec: {codec}")
+        parts[kind] = {"codec": codec, "shards": int(shards), "checksums": checksums.split(",")}
+    return parts
+
+
+def _decode_chunked(env: Mapping[str, str], kind: str, spec: Dict):
+    encoded = "".join(env.get(shard_var_name(kind, i), "") for i in range(spec["shards"]))
+    if _checksum(encoded) != spec["checksums"][0]:
+        raise ValueError(f"Payload {kind} shards do not match the header (partial update?)")
+    return _decompress(encoded, spec["codec"])
+
+
+def _decode_buckets(env: Mapping[str, str], kind: str, spec: Dict) -> Dict:
+    merged = {}
+    for index, checksum in enumerate(spec["checksums"]):
+        encoded = env.get(shard_var_name(kind, index), "")
+        if _checksum(encoded) != checksum:
+            raise ValueError(f"Payload {kind} bucket {index} does not match the header (partial update?)")
+        merged.update(_decompress(encoded, spec["codec"]))
+    return merged
+
+
+def decode_payload(env: Mapping[str, str]) -> Dict:
+    """
+    Decode the payload found in `env` (usually os.environ) back into a snapshot.
+
+    Raises:
+        ValueError: If the header is missing, unsupported or the shards are inconsistent
+    """
+    header = env.get(PAYLOAD_HEADER_VAR)
+    if not header:
+        raise ValueError(f"{PAYLOAD_HEADER_VAR} is not set")
+
+    parts = parse_header(header)
+    snapshot = _decode_chunked(env, "hot", parts["hot"])
+    if "cold" not in parts:
+        snapshot["details"] = {}
+    elif parts["version"] == 1:
+        snapshot["details"] = _decode_chunked(env, "cold", parts["cold"])
+    else:
+        snapshot["details"] = _decode_buckets(env, "cold", parts["cold"])
+    return snapshot
+
+
+def is_payload_var(name: str) -> bool:
+    return name == PAYLOAD_HEADER_VAR or bool(SHARD_VAR_PATTERN.match(name))
+
+
+def payload_size(env_vars: Mapping[str, str]) -> int:
+    """Total characters used by payload variables (names and values)."""
+    return sum(len(name) + len(value) for name, value in env_vars.items() if is_payload_var(name))
+
+
+def payload_var_hashes(env_vars: Mapping[str, str]) -> Dict[str, str]:
+    """Hash each payload variable's value, for comparing deployed and new payloads."""
+    return {name: hashlib.sha256(value.encode('utf-8')).hexdigest()[:16]
+            for name, value in env_vars.items() if is_payload_var(name)}
+
+
+def diff_payload(old_hashes: Mapping[str, str], new_vars: Mapping[str, str]) -> (Dict[str, str], list):
+    """
+    Work out which payload variables need pushing.
+
+    Args:
+        old_hashes: payload_var_hashes() of what the deploy target currently has
+        new_vars: Freshly encoded payload variables
+
+    Returns:
+        (variables whose value changed or are new, names of variables to delete)
+    """
+    new_hashes = payload_var_hashes(new_vars)
+    changed = {name: new_vars[name] for name, value_hash in new_hashes.items()
+               if old_hashes.get(name) != value_hash}
+    removed = sorted(name for name in old_hashes if name not in new_hashes)
+    return changed, removed
+
+
+def users_checksum(user_hashes: Mapping[str, str]) -> str:
+    """Checksum of the per-user content hashes; equal checksums mean nothing to deploy."""
+    return hashlib.sha256(canonical_json(user_hashes).encode('utf-8')).hexdigest()[:16]
+
+
+def deploy_manifest(users: Mapping[str, Dict], payload_vars: Mapping[str, str]) -> Dict:
+    """
+    Record of a deploy, for the next one to diff against: the users checksum,
+    per-user content hashes and the value hash of every payload variable.
+    """
+    user_hashes = content_hashes(users)
+    return {
+        "checksum": users_checksum(user_hashes),
+        "users": user_hashes,
+        "vars": payload_var_hashes(payload_vars),
+        "deployed_at": datetime.now().isoformat()
+    }
@@ -0,0 +1,176 @@
+"""
+Ready-to-serve leaderboard snapshots.
+
+A snapshot is the user data re-arranged for serving: small summary rows,
+heavy per-user detail fields kept apart, the sorted order for every sort key
+and the summary stats, all precomputed. The serverless app loads one in a
+single json.loads and answers leaderboard requests without sorting.
+
+The module also defines the canonical form of a user record (sorted keys,
+volatile fields excluded) and the per-user content hash used to detect
+whether a refresh changed anything.
+
+Usage:
+    python leaderboard_snapshot.py [data_file] [output_file]
+"""
+
+import hashlib
+import json
+from datetime import datetime
+from typing import Dict, List
+
+SNAPSHOT_FORMAT = "leaderboard-snapshot"
+SNAPSHOT_VERSION = 1
+DEFAULT_SNAPSHOT_FILE = "web_leaderboard_snapshot.json"
+
+# Per-user fields only needed by detail pages; everything else is a summary field
+DETAIL_FIELDS = (
+    "languages", "topics", "recent_submissions", "submission_calendar",
+    "weekly_problems", "time_analytics"
+)
+
+# Fields excluded from the content hash, and so allowed to lag in the saved
+# files and deployments: a change to only these never saves or redeploys on
+# its own. They are the fetch time, activity windows relative to "now",
+# values derived for display (position from the last sort, difficulty
+# percentages), when the detail fields were fetched and the content hash
+# itself. LeetCode's global ranking is not among them: it is shown on the
+# board and is a sort key, so a rank-only change is saved like any other.
+VOLATILE_FIELDS = (
+    "last_updated", "time_analytics", "position", "content_hash",
+    "easy_percentage", "medium_percentage", "hard_percentage", "details_updated"
+)
+
+# Sort keys used by web_app.py, api/index.py and the CLI
+SORT_KEYS = (
+    "weekly_advanced_score", "advanced_score", "weekly_base_score", "weekly_total",
+    "base_score", "total_solved", "easy", "medium", "hard", "ranking"
+)
+
+
+def canonical_json(data) -> str:
+    """Deterministic JSON encoding (sorted keys, no whitespace) used for hashing."""
+    return json.dumps(data, sort_keys=True, separators=(',', ':'))
+
+
+def content_hash(user: Dict) -> str:
+    """Hash of everything in a user record except the volatile fields."""
+    content = {field: value for field, value in user.items() if field not in VOLATILE_FIELDS}
+    return hashlib.sha256(canonical_json(content).encode('utf-8')).hexdigest()[:16]
+
+
+def content_hashes(users: Dict[str, Dict]) -> Dict[str, str]:
+    """Map each username to the content hash of its record."""
+    return {key: content_hash(user) for key, user in users.items()}
+
+
+def stable_bucket(username: str, buckets: int) -> int:
+    """Bucket index for a username that is the same in every process (unlike hash())."""
+    return int(hashlib.sha1(username.encode('utf-8')).hexdigest()[:8], 16) % buckets
+
+
+def split_user(user: Dict) -> (Dict, Dict):
+    """Split a user record into (summary row, detail fields)."""
+    row, details = {}, {}
+    for field, value in user.items():
+        if field in DETAIL_FIELDS:
+            details[field] = value
+        else:
+            row[field] = value
+    return row, details
+
+
+def sort_order(users: Dict[str, Dict], sort_by: str) -> List[str]:
+    """Usernames ordered the same way get_leaderboard() orders users."""
+    return sorted(users, key=lambda key: users[key].get(sort_by, 0), reverse=sort_by != "ranking")
+
+
+def calculate_stats(users: Dict[str, Dict]) -> Dict:
+    """
+    Order-independent summary stats for the leaderboard page.
+
+    Champions are stored as usernames so the snapshot stays flat; the caller
+    resolves them back to user records.
+    """
+    if not users:
+        return {}
+
+    records = list(users.values())
+    total_weekly_score = sum(user.get('weekly_advanced_score', 0) for user in records)
+
+    def champion(field):
+        return max(users, key=lambda key: users[key].get(field, 0))
+
+    return {
+        'total_users': len(records),
+        'total_problems': sum(user.get('total_solved', 0) for user in records),
+        'weekly_problems': sum(user.get('weekly_total', 0) for user in records),
+        'weekly_score': total_weekly_score,
+        'avg_weekly_score': total_weekly_score / len(records),
+        'total_advanced_score': sum(user.get('advanced_score', 0) for user in records),
+        'avg_score': sum(user.get('advanced_score', 0) for user in records) / len(records),
+        'champions': {
+            'easy_champion': champion('easy'),
+            'medium_champion': champion('medium'),
+            'hard_champion': champion('hard'),
+            'weekly_easy_champion': champion('weekly_easy'),
+            'weekly_medium_champion': champion('weekly_medium'),
+            'weekly_hard_champion': champion('weekly_hard')
+        }
+    }
+
+
+def build_snapshot(users: Dict[str, Dict]) -> Dict:
+    """
+    Build a ready-to-serve snapshot from a username -> user record dict.
+
+    Args:
+        users: Leaderboard data as stored in web_leaderboard_data.json
+
+    Returns:
+        Snapshot dictionary (JSON serialisable)
+    """
+    rows, details = {}, {}
+    for key, user in users.items():
+        rows[key], details[key] = split_user(user)
+
+    return {
+        "format": SNAPSHOT_FORMAT,
+        "version": SNAPSHOT_VERSION,
+        "generated_at": datetime.now().isoformat(),
+        "rows": rows,
+        "details": details,
+        "order": {sort_by: sort_order(users, sort_by) for sort_by in SORT_KEYS},
+        "stats": calculate_stats(users)
+    }
+
+
+def is_snapshot(data) -> bool:
+    """True if decoded JSON is a snapshot rather than a plain users dict."""
+    return isinstance(data, dict) and data.get("format") == SNAPSHOT_FORMAT
+
+
+def snapshot_users(snapshot: Dict) -> Dict[str, Dict]:
+    """Rebuild full user records from a snapshot's rows and details."""
+    if snapshot.get("version") != SNAPSHOT_VERSION:
+        raise ValueError(f"Unsupported snapshot version: {snapshot.get('version')}")
+    details = snapshot.get("details", {})
+    return {key: {**row, **details.get(key, {})} for key, row in snapshot.get("rows", {}).items()}
+
+
+def main():
+    import sys
+
+    data_file = sys.argv[1] if len(sys.argv) > 1 else "web_leaderboard_data.json"
+    output_file = sys.argv[2] if len(sys.argv) > 2 else DEFAULT_SNAPSHOT_FILE
+
+    with open(data_file, 'r') as f:
+        users = json.load(f)
+
+    with open(output_file, 'w') as f:
+        json.dump(build_snapshot(users), f, separators=(',', ':'))
+    print(f"💾 Snapshot for {len(users)} users written to {output_file}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,23 +1,167 @@
 import requests
+import asyncio
+import csv
 import json
+import os
+import re
 import time
 from datetime import datetime, timedelta, timezone
-from typing import Dict, List, Optional
+from typing import Dict, Iterable, List, Mapping, Optional, Set
 import calendar
+import math
+import threading
+from contextlib import contextmanager
+from types import MappingProxyType
+from leetcode_transport import DEFAULT_CASSETTE_DIR, create_transport, get_transport, request_gate, set_transport
+from leaderboard_snapshot import SORT_KEYS, content_hash, sort_order, stable_bucket
+from profile_cache import active_profile_cache, cache_key
+from scoring import DECAY_WEEKS, ScoreTable, get_base_rules, get_scoring_rules, set_scoring_rules
+from solved_index import SolvedIndex
+from submission_log import get_submission_log
+from weekly_archive import WEEK_COUNT_FIELDS, get_weekly_archive, iso_week, record_week
 
-def get_user_stats(username: str) -> Optional[Dict]:
+DEFAULT_SHARD_DIR = "shards"
+# Accepted submissions of a freshly fetched record that are not in the
+# submission log yet; the leaderboard logs and drops them when it stores the record
+UNLOGGED_FIELD = "unlogged_submissions"
+
+def write_json_atomic(path: str, data, *more_paths: str, **kwargs) -> None:
     """
-    Fetch comprehensive LeetCode user statistics via GraphQL API.
+    Write JSON to a temp file next to `path`, then rename it into place.
     
-    Args:
-        username: LeetCode username
-        
-    Returns:
-        Dictionary with detailed user stats or None if user not found
+    With `more_paths`, the same data goes to each of them: every temp file is
+    written first and the renames follow back to back, so a failed write
+    leaves all targets untouched. Each file is replaced atomically, but the
+    set is not: a crash between two renames leaves one file newer than the
+    other.
     """
-    url = "https://leetcode.com/graphql"
-    query = """
-    query getUserProfile($username: String!) {
+    tmp_paths = []
+    for target in (path,) + more_paths:
+        tmp_path = f"{target}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(data, f, **kwargs)
+        tmp_paths.append((tmp_path, target))
+    for tmp_path, target in tmp_paths:
+        os.replace(tmp_path, target)
+
+
+def restamp(users: Mapping[str, Dict]) -> Mapping[str, Dict]:
+    """
+    Stamp records read from disk with their recomputed content hash, in place.
+    A stored hash is not trusted: after a hand edit it no longer matches.
+    """
+    for user in users.values():
+        user["content_hash"] = content_hash(user)
+    return users
+
+
+def parse_shard(spec: str) -> (int, int):
+    """Parse "i/N" (1-based) into (i, N)."""
+    index, _, count = spec.partition("/")
+    index, count = int(index), int(count)
+    if not 1 <= index <= count:
+        raise ValueError(f"Shard must be i/N with 1 <= i <= N, got {spec}")
+    return index, count
+
+
+def shard_file_path(shard_dir: str, index: int, count: int) -> str:
+    return os.path.join(shard_dir, f"leaderboard_shard_{index}_of_{count}.json")
+
+
+def default_run_id() -> Optional[str]:
+    """Id shared by the shard runners of one refresh: LEADERBOARD_RUN_ID, else GITHUB_RUN_ID."""
+    return os.environ.get("LEADERBOARD_RUN_ID") or os.environ.get("GITHUB_RUN_ID") or None
+
+
+def utc_now_iso() -> str:
+    """Current time as an offset-aware UTC ISO string, as stored in last_updated."""
+    return datetime.now(timezone.utc).isoformat()
+
+
+def parse_timestamp(value: str) -> datetime:
+    """
+    Parse a stored ISO timestamp into an aware UTC datetime. Older records hold
+    naive times written by the (UTC) refresh job; those are read as UTC.
+    
+    Raises:
+        TypeError, ValueError: If `value` is not an ISO timestamp
+    """
+    parsed = datetime.fromisoformat(value)
+    if parsed.tzinfo is None:
+        return parsed.replace(tzinfo=timezone.utc)
+    return parsed.astimezone(timezone.utc)
+
+
+def calendar_activity(calendar_data: Mapping[str, int], days: int, now: Optional[datetime] = None) -> int:
+    """Submissions on the last `days` UTC days up to `now`, from a parsed submission calendar."""
+    now = now or datetime.now(timezone.utc)
+    today = now.astimezone(timezone.utc).replace(hour=0, minute=0, second=0, microsecond=0)
+    since = today.timestamp() - (days - 1) * 24 * 3600
+    total = 0
+    for timestamp, count in calendar_data.items():
+        try:
+            if int(timestamp) >= since:
+                total += int(count)
+        except (TypeError, ValueError):
+            continue
+    return total
+
+
+def refresh_priority(user: Dict, now: Optional[datetime] = None) -> float:
+    """
+    How urgently a user needs refreshing: hours since `last_updated`, weighted
+    up to 2x for users who submitted in the last week, so busy accounts come
+    round sooner. Users that were never fetched always go first.
+    """
+    now = now or datetime.now(timezone.utc)
+    try:
+        age_hours = (now - parse_timestamp(user["last_updated"])).total_seconds() / 3600
+    except (KeyError, TypeError, ValueError):
+        return math.inf
+    activity = calendar_activity(parse_submission_calendar(user.get("submission_calendar", "")), 7, now)
+    return max(age_hours, 0) * (1 + min(activity, 50) / 50)
+
+
+# Letters, digits, underscores, hyphens and dots; anything else cannot be a LeetCode username
+USERNAME_PATTERN = re.compile(r"^[A-Za-z0-9_.-]{1,40}$")
+
+
+def parse_usernames(text: str) -> List[str]:
+    """
+    Parse usernames for a bulk import.
+    
+    Accepts a JSON list (of names or of objects with "username"), a JSON object
+    with a "usernames" list, or CSV / one-name-per-line text. A CSV header row
+    containing a "username" column selects that column; otherwise the first
+    column is used.
+    
+    Raises:
+        ValueError: If the text looks like JSON but does not parse
+    """
+    text = text.strip()
+    if text.startswith(("[", "{")):
+        data = json.loads(text)
+        items = data.get("usernames", []) if isinstance(data, dict) else data
+        names = [item.get("username", "") if isinstance(item, dict) else item for item in items]
+        return [str(name).strip() for name in names if str(name).strip()]
+    
+    rows = [row for row in csv.reader(text.splitlines()) if any(cell.strip() for cell in row)]
+    column = 0
+    if rows:
+        header = [cell.strip().lower() for cell in rows[0]]
+        if "username" in header:
+            column = header.index("username")
+            rows = rows[1:]
+    return [row[column].strip() for row in rows if len(row) > column and row[column].strip()]
+
+
+LEETCODE_GRAPHQL_URL = "https://leetcode.com/graphql"
+LEETCODE_HEADERS = {
+    'Content-Type': 'application/json',
+    'User-Agent': 'LeetCode-Leaderboard/1.0'
+}
+USER_SUMMARY_QUERY = """
+    query getUserSummary($username: String!) {
       matchedUser(username: $username) {
         username
         submitStatsGlobal {
@@ -29,10 +173,23 @@ def get_user_stats(username: str) -> Optional[Dict]:
         profile {
           realName
           ranking
-          userAvatar
-          aboutMe
         }
         submissionCalendar
+      }
+      recentSubmissionList(username: $username) {
+        title
+        titleSlug
+        timestamp
+        statusDisplay
+        lang
+      }
+    }
+"""
+
+# Only the detail page and detail API need these; fetched by get_user_details()
+USER_DETAIL_QUERY = """
+    query getUserDetail($username: String!) {
+      matchedUser(username: $username) {
         languageProblemCount {
           languageName
           problemsSolved
@@ -52,120 +209,140 @@ def get_user_stats(username: str) -> Optional[Dict]:
           }
         }
       }
-      recentSubmissionList(username: $username) {
-        title
-        titleSlug
-        timestamp
-        statusDisplay
-        lang
-        runtime
-        memory
-        url
-      }
     }
+"""
+
+# Record fields filled from USER_DETAIL_QUERY, and how long they stay fresh
+PROFILE_DETAIL_FIELDS = ("languages", "topics")
+DEFAULT_DETAIL_TTL = 6 * 3600
+
+
+def user_stats_request(username: str) -> Dict:
+    """JSON body of the GraphQL request for `username`'s leaderboard summary."""
+    return {"query": USER_SUMMARY_QUERY, "variables": {"username": username}}
+
+
+def user_details_request(username: str) -> Dict:
+    """JSON body of the GraphQL request for `username`'s detail-page fields."""
+    return {"query": USER_DETAIL_QUERY, "variables": {"username": username}}
+
+
+def parse_user_stats(username: str, data: Dict) -> Optional[Dict]:
     """
+    Build a leaderboard record from a getUserSummary GraphQL response.
     
-    try:
-        variables = {"username": username}
-        headers = {
-            'Content-Type': 'application/json',
-            'User-Agent': 'LeetCode-Leaderboard/1.0'
-        }
-        
-        response = requests.post(
-            url, 
-            json={"query": query, "variables": variables},
-            headers=headers,
-            timeout=10
-        )
-        response.raise_for_status()
-        
-        data = response.json()
-        
-        # Check if user exists
-        if not data.get("data") or not data["data"].get("matchedUser"):
-            print(f"❌ User '{username}' not found on LeetCode")
-            return None
-            
-        user = data["data"]["matchedUser"]
-        
-        # Parse submission stats
-        solved = {}
-        if user.get("submitStatsGlobal") and user["submitStatsGlobal"].get("acSubmissionNum"):
-            for item in user["submitStatsGlobal"]["acSubmissionNum"]:
-                solved[item["difficulty"]] = item["count"]
-        
-        # Get profile info
-        profile = user.get("profile", {})
-        
-        # Parse recent submissions for advanced scoring
-        recent_submissions = data["data"].get("recentSubmissionList", [])
-        if recent_submissions is None:
-            recent_submissions = []
+    Args:
+        username: LeetCode username that was requested
+        data: Decoded JSON response
         
-        # Parse language distribution
-        languages = {}
-        if user.get("languageProblemCount"):
-            for lang_data in user["languageProblemCount"]:
-                languages[lang_data["languageName"]] = lang_data["problemsSolved"]
+    Returns:
+        Dictionary with detailed user stats or None if user not found
         
-        # Parse topic/tag distribution
-        topics = {}
-        if user.get("tagProblemCounts"):
-            tag_counts = user["tagProblemCounts"]
-            for level in ["fundamental", "intermediate", "advanced"]:
-                if tag_counts.get(level):
-                    for tag_data in tag_counts[level]:
-                        topics[tag_data["tagName"]] = topics.get(tag_data["tagName"], 0) + tag_data["problemsSolved"]
+    Raises:
+        KeyError, TypeError: If the response does not have the expected shape
+    """
+    # Check if user exists
+    if not data.get("data") or not data["data"].get("matchedUser"):
+        print(f"❌ User '{username}' not found on LeetCode")
+        return None
         
-        # Calculate weekly problems from recent submissions (same method as total)
-        weekly_problems = calculate_weekly_problems_from_submissions(recent_submissions)
+    user = data["data"]["matchedUser"]
+    
+    # Parse submission stats
+    solved = {}
+    if user.get("submitStatsGlobal") and user["submitStatsGlobal"].get("acSubmissionNum"):
+        for item in user["submitStatsGlobal"]["acSubmissionNum"]:
+            solved[item["difficulty"]] = item["count"]
+    
+    # Get profile info
+    profile = user.get("profile", {})
+    
+    # Parse recent submissions for advanced scoring
+    recent_submissions = data["data"].get("recentSubmissionList", [])
+    if recent_submissions is None:
+        recent_submissions = []
+    
+    # Count the week from the recent submissions for now; storing the record
+    # logs them and recounts from the log, which covers the whole week
+    weekly_problems = calculate_weekly_problems_from_submissions(recent_submissions)
+    
+    # Get submission calendar for additional data
+    submission_calendar = user.get("submissionCalendar", "")
+    
+    # Calculate scores - both total and weekly (other configured score columns
+    # are filled in when the record is stored)
+    base_rules = get_base_rules()
+    total_base_score = base_rules.score_counts(solved)
+    weekly_base_score = base_rules.score_counts(weekly_problems)
+    
+    # Get current week info
+    week_start_ts, week_end_ts = get_current_week_bounds()
+    week_start_date = datetime.fromtimestamp(week_start_ts).strftime("%Y-%m-%d")
+    week_end_date = datetime.fromtimestamp(week_end_ts).strftime("%Y-%m-%d")
+    
+    return {
+        "username": user["username"],
+        "real_name": profile.get("realName", ""),
+        "ranking": profile.get("ranking", 0),
         
-        # Get submission calendar for additional data
-        submission_calendar = user.get("submissionCalendar", "")
+        # Total (all-time) stats
+        "total_solved": solved.get("All", 0),
+        "easy": solved.get("Easy", 0),
+        "medium": solved.get("Medium", 0),
+        "hard": solved.get("Hard", 0),
+        "base_score": total_base_score,
         
-        # Calculate scores - both total and weekly
-        total_base_score = (solved.get("Easy", 0) * 1 + 
-                           solved.get("Medium", 0) * 3 + 
-                           solved.get("Hard", 0) * 7)
+        # Weekly stats
+        "weekly_total": weekly_problems.get("All", 0),
+        "weekly_easy": weekly_problems.get("Easy", 0),
+        "weekly_medium": weekly_problems.get("Medium", 0),
+        "weekly_hard": weekly_problems.get("Hard", 0),
+        "weekly_base_score": weekly_base_score,
+        "current_week": f"{week_start_date} to {week_end_date}",
         
-        weekly_base_score = (weekly_problems.get("Easy", 0) * 1 + 
-                            weekly_problems.get("Medium", 0) * 3 + 
-                            weekly_problems.get("Hard", 0) * 7)
+        # Additional data (languages and topics come from get_user_details())
+        "recent_submissions": recent_submissions[:10],
+        "submission_calendar": submission_calendar,
+        "weekly_problems": weekly_problems,  # Add the weekly problems dict
+        "last_updated": utc_now_iso(),
+        UNLOGGED_FIELD: [submission for submission in recent_submissions
+                         if submission.get('statusDisplay') == 'Accepted']
+    }
+
+
+def get_user_stats(username: str, max_age: Optional[float] = None) -> Optional[Dict]:
+    """
+    Fetch comprehensive LeetCode user statistics via GraphQL API.
+    
+    Args:
+        username: LeetCode username
+        max_age: Accept a cached result up to this many seconds old (default:
+            the profile cache TTL; 0 always fetches)
         
-        # Get current week info
-        week_start_ts, week_end_ts = get_current_week_bounds()
-        week_start_date = datetime.fromtimestamp(week_start_ts).strftime("%Y-%m-%d")
-        week_end_date = datetime.fromtimestamp(week_end_ts).strftime("%Y-%m-%d")
+    Returns:
+        Dictionary with detailed user stats or None if user not found
+    """
+    cache = active_profile_cache()
+    key = cache_key("profile", username)
+    if cache:
+        cached = cache.get(key, max_age)
+        if cached is not None:
+            return cached
+    
+    try:
+        request_gate().wait(get_transport().request_delay)  # Be nice to LeetCode's servers
+        response = get_transport().post(
+            LEETCODE_GRAPHQL_URL,
+            json=user_stats_request(username),
+            headers=LEETCODE_HEADERS,
+            timeout=10
+        )
+        response.raise_for_status()
         
-        return {
-            "username": user["username"],
-            "real_name": profile.get("realName", ""),
-            "ranking": profile.get("ranking", 0),
-            
-            # Total (all-time) stats
-            "total_solved": solved.get("All", 0),
-            "easy": solved.get("Easy", 0),
-            "medium": solved.get("Medium", 0),
-            "hard": solved.get("Hard", 0),
-            "base_score": total_base_score,
-            
-            # Weekly stats
-            "weekly_total": weekly_problems.get("All", 0),
-            "weekly_easy": weekly_problems.get("Easy", 0),
-            "weekly_medium": weekly_problems.get("Medium", 0),
-            "weekly_hard": weekly_problems.get("Hard", 0),
-            "weekly_base_score": weekly_base_score,
-            "current_week": f"{week_start_date} to {week_end_date}",
-            
-            # Additional data
-            "languages": languages,
-            "topics": topics,
-            "recent_submissions": recent_submissions[:10],
-            "submission_calendar": submission_calendar,
-            "weekly_problems": weekly_problems,  # Add the weekly problems dict
-            "last_updated": datetime.now().isoformat()
-        }
+        user_stats = parse_user_stats(username, response.json())
+        if cache and user_stats:
+            cache.put(key, user_stats)
+        return user_stats
         
     except requests.exceptions.Timeout:
         print(f"⏰ Timeout while fetching data for {username}")
@@ -181,6 +358,85 @@ def get_user_stats(username: str) -> Optional[Dict]:
         return None
 
 
+def parse_user_details(data: Dict) -> Optional[Dict]:
+    """
+    Detail-page fields (see PROFILE_DETAIL_FIELDS) from a getUserDetail response.
+    
+    Raises:
+        KeyError, TypeError: If the response does not have the expected shape
+    """
+    if not data.get("data") or not data["data"].get("matchedUser"):
+        return None
+    user = data["data"]["matchedUser"]
+    
+    # Parse language distribution
+    languages = {}
+    if user.get("languageProblemCount"):
+        for lang_data in user["languageProblemCount"]:
+            languages[lang_data["languageName"]] = lang_data["problemsSolved"]
+    
+    # Parse topic/tag distribution
+    topics = {}
+    if user.get("tagProblemCounts"):
+        tag_counts = user["tagProblemCounts"]
+        for level in ["fundamental", "intermediate", "advanced"]:
+            if tag_counts.get(level):
+                for tag_data in tag_counts[level]:
+                    topics[tag_data["tagName"]] = topics.get(tag_data["tagName"], 0) + tag_data["problemsSolved"]
+    
+    return {"languages": languages, "topics": topics}
+
+
+def get_user_details(username: str, max_age: Optional[float] = None) -> Optional[Dict]:
+    """
+    Fetch the heavy detail-page fields for `username` (languages and topics).
+    
+    Args:
+        username: LeetCode username
+        max_age: Accept a cached result up to this many seconds old (default:
+            the profile cache TTL; 0 always fetches)
+        
+    Returns:
+        {"languages": ..., "topics": ...} or None if the fetch failed
+    """
+    cache = active_profile_cache()
+    key = cache_key("details", username)
+    if cache:
+        cached = cache.get(key, max_age)
+        if cached is not None:
+            return cached
+    
+    try:
+        request_gate().wait(get_transport().request_delay)
+        response = get_transport().post(
+            LEETCODE_GRAPHQL_URL,
+            json=user_details_request(username),
+            headers=LEETCODE_HEADERS,
+            timeout=10
+        )
+        response.raise_for_status()
+        
+        details = parse_user_details(response.json())
+        if cache and details:
+            cache.put(key, details)
+        return details
+    except requests.exceptions.RequestException as e:
+        print(f"🌐 Could not fetch details for {username}: {e}")
+        return None
+    except (KeyError, TypeError, ValueError) as e:
+        print(f"📊 Detail parsing error for {username}: {e}")
+        return None
+
+
+def details_age(user: Dict, now: Optional[datetime] = None) -> float:
+    """Seconds since `user`'s detail fields were fetched (inf if never)."""
+    now = now or datetime.now(timezone.utc)
+    try:
+        return (now - parse_timestamp(user["details_updated"])).total_seconds()
+    except (KeyError, TypeError, ValueError):
+        return math.inf
+
+
 def get_current_week_bounds():
     """
     Get the start and end timestamps for the current week (Monday to Sunday) in UTC.
@@ -203,6 +459,44 @@ def get_current_week_bounds():
     return int(week_start_utc.timestamp()), int(week_end_utc.timestamp())
 
 
+def get_current_month_bounds():
+    """
+    Get the start and end timestamps for the current calendar month in UTC.
+    
+    Returns:
+        tuple: (month_start_timestamp, month_end_timestamp)
+    """
+    now_utc = datetime.now(timezone.utc)
+    month_start_utc = now_utc.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+    days_in_month = calendar.monthrange(now_utc.year, now_utc.month)[1]
+    month_end_utc = month_start_utc + timedelta(days=days_in_month) - timedelta(seconds=1)
+    return int(month_start_utc.timestamp()), int(month_end_utc.timestamp())
+
+
+def solved_in_period(username: str, start_ts: Optional[int] = None, end_ts: Optional[int] = None) -> Dict[str, int]:
+    """
+    Unique problems `username` solved between two timestamps, by difficulty,
+    answered from the accepted-submission log (no LeetCode calls).
+    """
+    return get_submission_log().count(username, start_ts, end_ts)
+
+
+def calculate_weekly_problems_from_log(username: str, recent_submissions: List[Dict]) -> Optional[Dict[str, int]]:
+    """
+    Append `recent_submissions` to the user's accepted-submission log and count
+    this week's unique problems from the log. Returns None if the log cannot
+    be written.
+    """
+    try:
+        get_submission_log().record(username, recent_submissions, lookup_problem_difficulty)
+    except OSError as e:
+        print(f"⚠️ Could not update submission log for {username}: {e}")
+        return None
+    
+    week_start_ts, week_end_ts = get_current_week_bounds()
+    return solved_in_period(username, week_start_ts, week_end_ts)
+
+
 def parse_submission_calendar(submission_calendar_str: str) -> Dict[str, int]:
     """
     Parse LeetCode submission calendar JSON string.
@@ -404,33 +698,17 @@ def analyze_time_frames(submission_calendar: str, recent_submissions: List) -> D
     Returns:
         Dictionary with daily, weekly, yearly stats
     """
-    now = datetime.now()
-    
-    # Parse submission calendar (it's usually a JSON string)
-    calendar_data = {}
-    try:
-        if submission_calendar:
-            calendar_data = json.loads(submission_calendar)
-    except:
-        calendar_data = {}
+    # Calendar keys are UTC midnight timestamps, so count whole UTC days
+    calendar_data = parse_submission_calendar(submission_calendar)
     
     # Calculate daily activity (last 7 days)
-    daily_count = 0
-    for i in range(7):
-        date_key = str(int((now - timedelta(days=i)).timestamp()))
-        daily_count += calendar_data.get(date_key, 0)
+    daily_count = calendar_activity(calendar_data, 7)
     
     # Calculate weekly activity (last 30 days)
-    weekly_count = 0
-    for i in range(30):
-        date_key = str(int((now - timedelta(days=i)).timestamp()))
-        weekly_count += calendar_data.get(date_key, 0)
+    weekly_count = calendar_activity(calendar_data, 30)
     
     # Calculate yearly activity (last 365 days)
-    yearly_count = 0
-    for i in range(365):
-        date_key = str(int((now - timedelta(days=i)).timestamp()))
-        yearly_count += calendar_data.get(date_key, 0)
+    yearly_count = calendar_activity(calendar_data, 365)
     
     return {
         "daily_submissions": daily_count,
@@ -440,21 +718,412 @@ def analyze_time_frames(submission_calendar: str, recent_submissions: List) -> D
     }
 
 
+class BoardSnapshot:
+    """
+    One published state of the leaderboard: a read-only users mapping plus the
+    sorted views built from it on demand. Records in a published snapshot are
+    never modified; a change publishes a new snapshot instead.
+    """
+    
+    __slots__ = ("users", "views")
+    
+    def __init__(self, users: Dict[str, Dict]):
+        self.users = MappingProxyType(users)
+        self.views = {}  # sort_by -> (ordered keys, user records with positions)
+    
+    def carry_views(self, previous: "BoardSnapshot", puts: Mapping[str, Dict]) -> None:
+        """
+        Reuse `previous`'s sorted views that `puts` (replacements only) cannot
+        reorder, patching just the replaced rows. Views whose sort field
+        changed for any replaced user are dropped and rebuilt on demand.
+        """
+        for sort_by, (keys, rows) in previous.views.items():
+            if any(previous.users[key].get(sort_by, 0) != user.get(sort_by, 0) for key, user in puts.items()):
+                continue
+            rows = list(rows)
+            for i, key in enumerate(keys):
+                if key in puts:
+                    rows[i] = {**puts[key], 'position': i + 1}
+            self.views[sort_by] = (keys, rows)
+
+
+class PendingBatch:
+    """Changes staged by LeetCodeLeaderboard.batch(), relative to the snapshot it started from."""
+    
+    __slots__ = ("owner", "users", "puts", "deletes", "save", "force")
+    
+    def __init__(self, users: Mapping[str, Dict]):
+        self.owner = threading.get_ident()
+        self.users = dict(users)  # Working copy the batch's thread reads
+        self.puts = {}
+        self.deletes = set()
+        self.save = False  # save_data() was called inside the block
+        self.force = False
+    
+    def stage(self, puts: Mapping[str, Dict], deletes: Iterable[str]) -> None:
+        for key, user in puts.items():
+            self.users[key] = self.puts[key] = user
+            self.deletes.discard(key)
+        for key in deletes:
+            self.users.pop(key, None)
+            self.puts.pop(key, None)
+            self.deletes.add(key)
+
+
 class LeetCodeLeaderboard:
     """
     A LeetCode leaderboard to track and compare friend's progress.
+    
+    Readers use `users` and get_leaderboard() without locking: both come from
+    the current BoardSnapshot, which a single attribute assignment replaces.
+    Writers build the next snapshot under `_write_lock`, so a long refresh never
+    exposes a half-updated board and saves never race each other.
+    
+    Inside `with leaderboard.batch():` changes are staged instead: the batch's
+    own thread reads them through `users`, everyone else keeps the previous
+    snapshot, and they are published and saved once when the block ends.
     """
     
     def __init__(self, data_file: str = "leaderboard_data.json"):
         self.data_file = data_file
-        self.users = {}
+        self._write_lock = threading.RLock()
+        self._state = BoardSnapshot({})
+        self._saved_hashes = None  # Content hashes of what is on disk
+        self._batch = None  # Staged changes while a batch() block is open
+        self._solved_indexes = None  # (snapshot, {(start, end): SolvedIndex})
+        self._activity_matrices = None  # (snapshot, {(days, end date): ActivityMatrix})
+        self._details_lock = threading.Lock()
+        self._details_loading = set()  # Keys with a background detail fetch running
         self.load_data()
     
+    @property
+    def users(self) -> Mapping[str, Dict]:
+        """Current users (read-only; use the mutation methods to change them)."""
+        batch = self._batch
+        if batch is not None and batch.owner == threading.get_ident():
+            return MappingProxyType(batch.users)
+        return self._state.users
+    
+    @users.setter
+    def users(self, users: Mapping[str, Dict]) -> None:
+        with self._write_lock:
+            if self._batch is not None:
+                self._apply_changes(users, [key for key in self._batch.users if key not in users])
+            else:
+                self._publish(dict(users))
+    
+    def _publish(self, users: Dict[str, Dict]) -> None:
+        """Finish records that are new to the board and swap in the next snapshot."""
+        for user in users.values():
+            if "time_analytics" not in user:
+                user["time_analytics"] = analyze_time_frames(
+                    user.get("submission_calendar", ""),
+                    user.get("recent_submissions", [])
+                )
+            if "content_hash" not in user:
+                user["content_hash"] = content_hash(user)
+        self._state = BoardSnapshot(users)
+    
+    def _apply_changes(self, puts: Mapping[str, Dict], deletes: Iterable[str] = ()) -> None:
+        """Publish a copy of the board with `puts` replaced and `deletes` removed."""
+        with self._write_lock:
+            if self._batch is None:
+                # Inside a batch, records keep their unlogged submissions until it commits
+                puts = self._log_submissions(puts)
+            puts = self._with_scores({key: self._with_details(key, user) for key, user in puts.items()})
+            if self._batch is not None:
+                self._batch.stage(puts, deletes)
+                return
+            
+            previous = self._state
+            users = dict(previous.users)
+            users.update(puts)
+            removed = [key for key in deletes if users.pop(key, None) is not None]
+            self._publish(users)
+            if not removed and all(key in previous.users for key in puts):
+                self._state.carry_views(previous, puts)
+    
+    def _log_submissions(self, puts: Mapping[str, Dict]) -> Mapping[str, Dict]:
+        """
+        Append freshly fetched records' accepted submissions to the submission
+        log and recount their week from it. Replayed refreshes leave the log
+        alone, so their results do not depend on what earlier runs logged.
+        """
+        if not any(UNLOGGED_FIELD in user for user in puts.values()):
+            return puts
+        replay = get_transport().mode == "replay"
+        logged = {}
+        for key, user in puts.items():
+            if UNLOGGED_FIELD in user:
+                user = dict(user)
+                submissions = user.pop(UNLOGGED_FIELD)
+                weekly_problems = None if replay else calculate_weekly_problems_from_log(
+                    user.get("username", key), submissions
+                )
+                if weekly_problems is not None:
+                    # Scores are recomputed from these counts by _with_scores()
+                    user.update({
+                        "weekly_problems": weekly_problems,
+                        "weekly_total": weekly_problems.get("All", 0),
+                        "weekly_easy": weekly_problems.get("Easy", 0),
+                        "weekly_medium": weekly_problems.get("Medium", 0),
+                        "weekly_hard": weekly_problems.get("Hard", 0)
+                    })
+            logged[key] = user
+        return logged
+    
+    def _with_details(self, key: str, user: Dict) -> Dict:
+        """Carry the current detail fields over to a summary-only record for `key`."""
+        previous = self.users.get(key)
+        if not previous or "details_updated" in user:
+            return user
+        carried = {field: previous[field] for field in PROFILE_DETAIL_FIELDS + ("details_updated",)
+                   if field in previous and field not in user}
+        if not carried:
+            return user
+        carried = {**user, **carried}
+        carried.pop("content_hash", None)  # Restamped on publish
+        return carried
+    
+    def _with_scores(self, puts: Mapping[str, Dict]) -> Dict[str, Dict]:
+        """Fill every configured score column on `puts`, copying only records whose scores change."""
+        if not puts:
+            return dict(puts)
+        scores = ScoreTable(puts, get_scoring_rules(), get_submission_log()).score_all()
+        scored = {}
+        for key, user in puts.items():
+            changed = {field: value for field, value in scores[key].items() if user.get(field) != value}
+            if changed:
+                user = {**user, **changed}
+                user.pop("content_hash", None)  # Restamped on publish
+            scored[key] = user
+        return scored
+    
+    def rescore(self, rules: Optional[List] = None) -> int:
+        """
+        Recompute every score column for all users from their stored counts,
+        without fetching, and save if anything changed. Score columns of rule
+        sets that are no longer configured are dropped.
+        
+        Args:
+            rules: ScoringRules list to switch to (default: the configured rules)
+        
+        Returns:
+            Number of users whose scores changed
+        """
+        if rules is not None:
+            set_scoring_rules(rules)
+        started = time.perf_counter()
+        with self._write_lock:
+            before = self.users
+            keep = {field for rules in get_scoring_rules() for field in rules.fields} | set(SORT_KEYS)
+            puts = {}
+            for key, user in before.items():
+                stale = {field for field in user if field.endswith("_score") and field not in keep}
+                if stale:
+                    user = {field: value for field, value in user.items()
+                            if field not in stale and field != "content_hash"}  # Restamped on publish
+                puts[key] = user
+            self._apply_changes(puts)
+            changed = sum(1 for key, user in self.users.items() if user is not before[key])
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            print(f"🧮 Rescored {len(before)} users in {elapsed_ms:.1f} ms ({changed} changed)")
+            if changed:
+                self.save_data()
+        return changed
+    
+    def score_history(self, weeks: int = DECAY_WEEKS) -> Dict[str, Dict[str, List]]:
+        """
+        Weekly scores for the last `weeks` weeks under every configured rule
+        set, computed from the submission logs.
+        
+        Returns:
+            rules name -> username -> [this week's score, last week's, ...]
+        """
+        users = self.users
+        table = ScoreTable(users, get_scoring_rules(), get_submission_log(), history=True)
+        history = {}
+        for rules in table.rules:
+            by_week = table.history(rules)[:weeks]
+            history[rules.name] = {
+                users[key].get("username", key): [week[i] for week in by_week] for i, key in enumerate(table.keys)
+            }
+        return history
+    
+    def ensure_details(self, username: str, max_age: Optional[float] = None,
+                       background: bool = False) -> Optional[Dict]:
+        """
+        Return `username`'s record, loading its detail fields (languages,
+        topics) if they are older than `max_age` seconds.
+        
+        Leaderboard refreshes only fetch the summary; the detail fields are
+        loaded here, for detail pages, and kept for LEETCODE_DETAIL_TTL seconds
+        (default 6 hours). Loaded details are only published in memory; the
+        next save (after a refresh, say) writes them out, so reading a page
+        never rewrites the data files.
+        
+        Args:
+            username: LeetCode username
+            max_age: Oldest detail fields to accept, in seconds
+            background: Return the stored record at once and load stale details
+                on a background thread (for request handlers) instead of
+                waiting for the fetch
+        
+        Returns:
+            The user record (the stored one if loading is pending or failed),
+            or None if the user is not on the leaderboard
+        """
+        key = username.lower()
+        user = self.users.get(key)
+        if user is None:
+            return None
+        if max_age is None:
+            max_age = float(os.environ.get("LEETCODE_DETAIL_TTL", DEFAULT_DETAIL_TTL))
+        if details_age(user) <= max_age:
+            return user
+        
+        if background:
+            self._load_details_in_background(key, max_age)
+            return user
+        return self._load_details(key, max_age) or user
+    
+    def _load_details(self, key: str, max_age: float) -> Optional[Dict]:
+        """Fetch and publish `key`'s detail fields; the updated record, or None on failure."""
+        user = self.users.get(key)
+        if user is None:
+            return None
+        details = get_user_details(user.get("username", key), max_age)
+        if not details:
+            return None
+        with self._write_lock:
+            current = self.users.get(key)
+            if current is None:
+                return None
+            user = {**current, **details, "details_updated": utc_now_iso()}
+            user.pop("content_hash", None)  # Restamped on publish
+            self._apply_changes({key: user})
+            return self.users[key]
+    
+    def _load_details_in_background(self, key: str, max_age: float) -> None:
+        """Start _load_details() on a daemon thread unless one is already loading `key`."""
+        with self._details_lock:
+            if key in self._details_loading:
+                return
+            self._details_loading.add(key)
+        
+        def load():
+            try:
+                self._load_details(key, max_age)
+            finally:
+                with self._details_lock:
+                    self._details_loading.discard(key)
+        
+        threading.Thread(target=load, name=f"details-{key}", daemon=True).start()
+    
+    def solved_index(self, start_ts: Optional[int] = None, end_ts: Optional[int] = None) -> SolvedIndex:
+        """
+        Bitset index of the problems each user accepted (optionally within a
+        period), built from the submission logs and reused until the board changes.
+        """
+        state = self._state
+        cached = self._solved_indexes
+        if cached is None or cached[0] is not state:
+            cached = self._solved_indexes = (state, {})
+        index = cached[1].get((start_ts, end_ts))
+        if index is None:
+            index = cached[1][(start_ts, end_ts)] = SolvedIndex.from_log(
+                get_submission_log(), state.users.keys(), start_ts, end_ts
+            )
+        return index
+    
+    def activity_matrix(self, days: int = 365):
+        """
+        Users × days submission-count matrix ending today (UTC), built from the
+        submission calendars and reused until the board changes (see activity_matrix.py).
+        """
+        from activity_matrix import ActivityMatrix
+        
+        state = self._state
+        cached = self._activity_matrices
+        if cached is None or cached[0] is not state:
+            cached = self._activity_matrices = (state, {})
+        key = (days, datetime.now(timezone.utc).date())
+        matrix = cached[1].get(key)
+        if matrix is None:
+            matrix = cached[1][key] = ActivityMatrix.from_users(state.users, days, key[1])
+        return matrix
+    
+    def display_activity(self, days: int = 30) -> None:
+        """Display group activity: daily active members and each user's recent totals and streaks."""
+        if not self.users:
+            print("📊 No users in leaderboard yet!")
+            return
+        
+        matrix = self.activity_matrix()
+        summary = matrix.summary()
+        print("\n" + "="*70)
+        print(f"📅 GROUP ACTIVITY ({summary['start']} to {summary['end']}) 📅".center(70))
+        print("="*70)
+        recent = list(summary["daily_active"].items())[-days:]
+        active_days = sum(1 for _, active in recent if active)
+        print(f"Days with someone active (last {days}): {active_days}/{len(recent)}")
+        print("Daily active (last 7): " + "  ".join(f"{day[5:]}:{active}" for day, active in recent[-7:]))
+        print("-"*70)
+        print(f"{'Username':<16} {'Last 7d':<9} {'Last 30d':<10} {'Streak':<8} {'Longest'}")
+        print("-"*70)
+        users = sorted(summary["users"].items(), key=lambda item: item[1]["last_30_days"], reverse=True)
+        for username, stats in users:
+            print(f"{username:<16} {stats['last_7_days']:<9} {stats['last_30_days']:<10} "
+                  f"{stats['current_streak']:<8} {stats['longest_streak']}")
+        print("="*70)
+    
+    @contextmanager
+    def batch(self):
+        """
+        Group many mutations into one publish and one save.
+        
+        Inside the block add_user(), remove_user(), update_user() and friends
+        only stage their changes and save_data() only records that a save is
+        wanted. When the block ends the changes are published as one snapshot
+        (so cached views are rebuilt once) and the data files are written once,
+        which is also what sets off the deploy. If the block raises, everything
+        staged is discarded and the board is left as it was; submissions
+        fetched inside the block are only written to the submission log when
+        it commits, so a failed batch leaves the log untouched. Other writers wait
+        for the block to finish; readers keep seeing the previous snapshot.
+        Nested batch() blocks join the outer one.
+        """
+        with self._write_lock:
+            if self._batch is not None:
+                yield self
+                return
+            
+            batch = self._batch = PendingBatch(self._state.users)
+            try:
+                yield self
+            finally:
+                self._batch = None
+            
+            if batch.puts or batch.deletes:
+                self._apply_changes(batch.puts, [key for key in batch.deletes if key in self._state.users])
+            if batch.save:
+                self.save_data(force=batch.force)
+    
+    def _defer_save(self, force: bool) -> bool:
+        """Inside batch(), note the requested save and return True instead of saving."""
+        batch = self._batch
+        if batch is None or batch.owner != threading.get_ident():
+            return False
+        batch.save = True
+        batch.force = batch.force or force
+        return True
+    
     def load_data(self) -> None:
         """Load existing user data from JSON file."""
         try:
             with open(self.data_file, 'r') as f:
-                self.users = json.load(f)
+                self.users = restamp(json.load(f))
+            self._saved_hashes = {key: user["content_hash"] for key, user in self.users.items()}
             print(f"📁 Loaded data for {len(self.users)} users")
         except FileNotFoundError:
             print("📁 No existing data file found, starting fresh")
@@ -463,21 +1132,68 @@ class LeetCodeLeaderboard:
             print("❌ Error reading data file, starting fresh")
             self.users = {}
     
-    def save_data(self) -> None:
-        """Save current user data to JSON file and sync with web version."""
-        try:
-            # Save to main data file
-            with open(self.data_file, 'w') as f:
-                json.dump(self.users, f, indent=2)
-            
-            # Also save to web_leaderboard_data.json for Vercel deployment
-            web_data_file = "web_leaderboard_data.json"
-            with open(web_data_file, 'w') as f:
-                json.dump(self.users, f, indent=2)
+    def reload_data(self) -> Set[str]:
+        """
+        Re-read the data file and publish only the users whose content changed.
+        
+        Unchanged records keep their identity, and cached sorted views survive
+        unless a changed user moves in them.
+        
+        Returns:
+            Keys of users added, changed or removed
+        
+        Raises:
+            OSError, ValueError: If the file cannot be read or parsed
+        """
+        with open(self.data_file, 'r') as f:
+            on_disk = json.load(f)
+        
+        with self._write_lock:
+            current = self.users
+            puts = {}
+            for key, user in on_disk.items():
+                stamp = content_hash(user)
+                if key not in current or current[key]["content_hash"] != stamp:
+                    user["content_hash"] = stamp
+                    puts[key] = user
+            deletes = [key for key in current if key not in on_disk]
+            if puts or deletes:
+                self._apply_changes(puts, deletes)
+            self._saved_hashes = {key: user["content_hash"] for key, user in self.users.items()}
+        return set(puts) | set(deletes)
+    
+    def save_data(self, force: bool = False) -> None:
+        """
+        Save current user data to JSON file and sync with web version.
+        
+        Files are written in canonical form (sorted keys) and only when some
+        user's content hash changed, so a refresh where nobody solved anything
+        leaves both files untouched and nothing to commit or deploy. Both temp
+        files are written before either is renamed into place; each file is
+        replaced atomically, but the pair is not.
+        
+        Args:
+            force: Write even if no content changed
+        """
+        web_data_file = "web_leaderboard_data.json"
+        with self._write_lock:
+            if self._defer_save(force):
+                return
+            users = dict(self.users)  # Published records already carry their content hash
+            hashes = {key: user["content_hash"] for key, user in users.items()}
+            files_exist = os.path.exists(self.data_file) and os.path.exists(web_data_file)
+            if not force and files_exist and hashes == self._saved_hashes:
+                print("⏱️ No ranking-relevant changes, data files left untouched")
+                return
             
-            print(f"💾 Data saved to {self.data_file} and {web_data_file}")
-        except Exception as e:
-            print(f"❌ Error saving data: {e}")
+            try:
+                # Save the main data file and web_leaderboard_data.json for Vercel deployment
+                write_json_atomic(self.data_file, users, web_data_file, indent=2, sort_keys=True)
+                
+                self._saved_hashes = hashes
+                print(f"💾 Data saved to {self.data_file} and {web_data_file}")
+            except Exception as e:
+                print(f"❌ Error saving data: {e}")
     
     def add_user(self, username: str) -> bool:
         """
@@ -490,8 +1206,17 @@ class LeetCodeLeaderboard:
             True if user added successfully, False otherwise
         """
         print(f"🔍 Fetching data for {username}...")
-        user_stats = get_user_stats(username)
+        return self._store_added(username, get_user_stats(username))
+    
+    async def add_user_async(self, username: str) -> bool:
+        """add_user() that awaits the fetch instead of blocking on it."""
+        from async_fetch import fetch_users
         
+        print(f"🔍 Fetching data for {username}...")
+        fetched, _ = await fetch_users([username])
+        return self._store_added(username, fetched.get(username))
+    
+    def _store_added(self, username: str, user_stats: Optional[Dict]) -> bool:
         if user_stats:
             # Calculate time analytics
             user_stats["time_analytics"] = analyze_time_frames(
@@ -499,7 +1224,7 @@ class LeetCodeLeaderboard:
                 user_stats.get("recent_submissions", [])
             )
             
-            self.users[username.lower()] = user_stats
+            self._apply_changes({username.lower(): user_stats})
             self.save_data()
             print(f"✅ Added {username} to leaderboard!")
             print(f"📊 Weekly Score: {user_stats.get('weekly_base_score', 0)} pts")
@@ -510,11 +1235,63 @@ class LeetCodeLeaderboard:
             print(f"❌ Could not add {username}")
             return False
     
+    def import_users(self, usernames: List[str]) -> List[Dict]:
+        """Blocking wrapper around import_users_async() for the CLI."""
+        return asyncio.run(self.import_users_async(usernames))
+    
+    async def import_users_async(self, usernames: List[str]) -> List[Dict]:
+        """
+        Add many users at once: fetch the new ones concurrently (bounded by
+        LEETCODE_FETCH_CONCURRENCY) and save once at the end.
+        
+        Args:
+            usernames: Usernames to add; duplicates (ignoring case) are skipped
+            
+        Returns:
+            One result per distinct username, in input order, with "username" and
+            "status": "added", "exists" (already on the board), "invalid" (not a
+            possible LeetCode username) or "failed" (not found or not fetchable)
+        """
+        results = {}
+        to_fetch = []
+        for username in usernames:
+            key = username.lower()
+            if key in results:
+                continue
+            if not USERNAME_PATTERN.match(username):
+                results[key] = {"username": username, "status": "invalid"}
+            elif key in self.users:
+                results[key] = {"username": self.users[key]["username"], "status": "exists"}
+            else:
+                results[key] = {"username": username, "status": "failed"}
+                to_fetch.append(username)
+        
+        fetched, _ = await self.fetch_users_async(to_fetch, max_age=None) if to_fetch else ({}, [])
+        added = {}
+        for username, user_stats in fetched.items():
+            added[username.lower()] = user_stats
+            results[username.lower()] = {
+                "username": user_stats["username"],
+                "status": "added",
+                "weekly_base_score": user_stats.get("weekly_base_score", 0),
+                "base_score": user_stats.get("base_score", 0)
+            }
+        
+        if added:
+            self._apply_changes(added)
+            self.save_data()
+        
+        counts = {}
+        for result in results.values():
+            counts[result["status"]] = counts.get(result["status"], 0) + 1
+        print("📥 Import finished: " + ", ".join(f"{count} {status}" for status, count in sorted(counts.items())))
+        return list(results.values())
+    
     def remove_user(self, username: str) -> bool:
         """Remove a user from the leaderboard."""
         username_lower = username.lower()
         if username_lower in self.users:
-            del self.users[username_lower]
+            self._apply_changes({}, [username_lower])
             self.save_data()
             print(f"🗑️ Removed {username} from leaderboard")
             return True
@@ -522,14 +1299,24 @@ class LeetCodeLeaderboard:
             print(f"❌ User {username} not found in leaderboard")
             return False
     
-    def update_all_users(self) -> None:
-        """Update stats for all users in the leaderboard."""
-        print(f"🔄 Updating stats for {len(self.users)} users...")
-        updated = 0
+    def fetch_users(self, usernames: List[str], max_age: Optional[float] = 0) -> (Dict[str, Dict], List[str]):
+        """
+        Fetch fresh stats for `usernames` without changing the leaderboard.
+        
+        Args:
+            usernames: Users to fetch
+            max_age: Oldest cached profile to accept, in seconds (default 0
+                fetches fresh; None uses the cache TTL, see get_user_stats)
         
-        for username in list(self.users.keys()):
+        Returns:
+            (username -> fresh stats, usernames that could not be fetched)
+        """
+        fetched = {}
+        failed = []
+        
+        for username in usernames:
             print(f"🔍 Updating {username}...")
-            user_stats = get_user_stats(username)
+            user_stats = get_user_stats(username, max_age)
             
             if user_stats:
                 # Calculate time analytics
@@ -538,26 +1325,279 @@ class LeetCodeLeaderboard:
                     user_stats.get("recent_submissions", [])
                 )
                 
-                self.users[username] = user_stats
-                updated += 1
+                fetched[username] = user_stats
                 print(f"   📊 {username}: Weekly {user_stats.get('weekly_base_score', 0)} | Total {user_stats.get('base_score', 0)}")
-                time.sleep(1)  # Be nice to LeetCode's servers
             else:
+                failed.append(username)
                 print(f"⚠️ Could not update {username}")
         
+        return fetched, failed
+    
+    async def fetch_users_async(self, usernames: List[str],
+                                max_age: Optional[float] = 0) -> (Dict[str, Dict], List[str]):
+        """fetch_users() with up to LEETCODE_FETCH_CONCURRENCY requests in flight (see async_fetch.py)."""
+        from async_fetch import fetch_users
+        
+        print(f"🔍 Fetching {len(usernames)} users concurrently...")
+        fetched, failed = await fetch_users(usernames, max_age=max_age)
+        for username in failed:
+            print(f"⚠️ Could not update {username}")
+        return fetched, failed
+    
+    def finalize_weeks(self) -> List[str]:
+        """
+        Freeze every finished week still held in user records into the weekly
+        archive, so the refresh about to overwrite them does not lose it.
+        Called before each refresh; weeks already archived are left alone.
+        
+        Returns:
+            ISO weeks newly archived
+        """
+        current = iso_week(datetime.now(timezone.utc).date())
+        by_week = {}
+        for key, user in self.users.items():
+            week = record_week(user)
+            if week is not None and week < current:
+                by_week.setdefault(week, {})[key] = user
+        
+        archive = get_weekly_archive()
+        fields = WEEK_COUNT_FIELDS + tuple(rules.weekly_field for rules in get_scoring_rules())
+        finalized = []
+        for week, users in sorted(by_week.items()):
+            try:
+                start, end = next(iter(users.values()))["current_week"].split(" to ")
+                users = self._recount_week(week, users)
+                if archive.append_week(week, start, end, users.values(), fields):
+                    finalized.append(week)
+                    print(f"🗃️ Archived week {week} ({len(users)} users)")
+            except (OSError, ValueError) as e:
+                print(f"⚠️ Could not archive week {week}: {e}")
+        return finalized
+    
+    def _recount_week(self, week: str, users: Mapping[str, Dict]) -> Mapping[str, Dict]:
+        """
+        Copies of `users` with ISO `week` (Monday to Sunday, UTC) recounted from
+        the submission log and rescored, so solves logged after the records'
+        last refresh (late on Sunday) are archived. The log only adds to a
+        record's counts; replayed refreshes keep them as they are.
+        
+        Raises:
+            ValueError: If `week` is not an ISO week label
+        """
+        if get_transport().mode == "replay":
+            return users
+        monday = datetime.strptime(f"{week}-1", "%G-W%V-%u").replace(tzinfo=timezone.utc)
+        start_ts = int(monday.timestamp())
+        end_ts = int((monday + timedelta(days=7)).timestamp()) - 1
+        log = get_submission_log()
+        recounted = {}
+        for key, user in users.items():
+            logged = log.count(user.get("username", key), start_ts, end_ts)
+            counts = {field: max(user.get(field, 0) or 0, logged[difficulty])
+                      for field, difficulty in (("weekly_easy", "Easy"), ("weekly_medium", "Medium"),
+                                                ("weekly_hard", "Hard"))}
+            counts["weekly_total"] = sum(counts.values())
+            recounted[key] = {**user, **counts}
+        rule_sets = get_scoring_rules()
+        scores = ScoreTable(recounted, rule_sets).score_all()
+        weekly_fields = {rules.weekly_field for rules in rule_sets}
+        return {
+            key: {**user, **{field: value for field, value in scores[key].items() if field in weekly_fields}}
+            for key, user in recounted.items()
+        }
+    
+    def update_all_users(self, max_age: Optional[float] = 0) -> None:
+        """
+        Update stats for all users in the leaderboard. Profiles are fetched
+        fresh unless `max_age` allows cached ones (None: the cache TTL).
+        """
+        self.update_users(list(self.users.keys()), max_age)
+    
+    def update_users(self, usernames: List[str], max_age: Optional[float] = 0) -> None:
+        """Update stats for the listed users only, e.g. those a live-data dispatch reported as changed."""
+        keys = list(dict.fromkeys(username.lower() for username in usernames))
+        unknown = [key for key in keys if key not in self.users]
+        if unknown:
+            print(f"⚠️ Skipping users not in leaderboard: {', '.join(unknown)}")
+        keys = [key for key in keys if key in self.users]
+        
+        self.finalize_weeks()
+        print(f"🔄 Updating stats for {len(keys)} users...")
+        fetched, _ = self.fetch_users(keys, max_age)
+        self._store_updates(fetched)
+    
+    async def update_all_users_async(self, max_age: Optional[float] = 0) -> None:
+        """update_all_users() with the fetches overlapped instead of run one by one."""
+        self.finalize_weeks()
+        print(f"🔄 Updating stats for {len(self.users)} users...")
+        fetched, _ = await self.fetch_users_async(list(self.users.keys()), max_age)
+        self._store_updates(fetched)
+    
+    def _store_updates(self, fetched: Dict[str, Dict]) -> None:
+        # Users removed while the fetch was running stay removed
+        self._apply_changes({key: user for key, user in fetched.items() if key in self.users})
+        
         self.save_data()
-        print(f"✅ Updated {updated}/{len(self.users)} users")
+        print(f"✅ Updated {len(fetched)}/{len(self.users)} users")
     
-    def update_user(self, username: str) -> bool:
-        """Update stats for a specific user."""
-        username_lower = username.lower()
-        if username_lower not in self.users:
+    def update_stalest(self, fraction: int) -> None:
+        """
+        Rolling refresh: update the stalest 1/`fraction` of users (see
+        refresh_priority), so repeated runs cycle through the whole board.
+        
+        The save is forced because the refreshed `last_updated` times are what
+        the next run orders by, even when no scores changed.
+        """
+        if not self.users:
+            print("📭 No users to update")
+            return
+        
+        self.finalize_weeks()
+        now = datetime.now(timezone.utc)
+        batch_size = math.ceil(len(self.users) / fraction)
+        stalest = sorted(self.users, key=lambda key: refresh_priority(self.users[key], now), reverse=True)[:batch_size]
+        print(f"🔄 Rolling refresh: updating the {len(stalest)} stalest of {len(self.users)} users...")
+        
+        fetched, _ = self.fetch_users(stalest)
+        self._apply_changes(fetched)
+        
+        self.save_data(force=bool(fetched))
+        print(f"✅ Updated {len(fetched)}/{len(stalest)} users")
+    
+    def update_shard(self, index: int, count: int, shard_dir: str = DEFAULT_SHARD_DIR,
+                     run_id: Optional[str] = None) -> str:
+        """
+        Refresh the users that hash into shard `index` of `count` and write
+        them to a partial result file instead of the data files.
+        
+        Args:
+            index: 1-based shard number
+            count: Total number of shards
+            shard_dir: Directory for partial result files
+            run_id: Id of this refresh, stamped on the file so merge_shards()
+                can tell it from leftovers of earlier runs (default: default_run_id())
+            
+        Returns:
+            Path of the partial result file
+        """
+        usernames = [username for username in self.users if stable_bucket(username, count) == index - 1]
+        print(f"🧩 Shard {index}/{count}: updating {len(usernames)} of {len(self.users)} users...")
+        fetched, failed = self.fetch_users(usernames)
+        
+        os.makedirs(shard_dir, exist_ok=True)
+        path = shard_file_path(shard_dir, index, count)
+        write_json_atomic(path, {
+            "shard": index,
+            "shard_count": count,
+            "run_id": run_id or default_run_id(),
+            "generated_at": utc_now_iso(),
+            "users": fetched,
+            "failed": failed
+        }, indent=2, sort_keys=True)
+        print(f"💾 Shard {index}/{count}: {len(fetched)} updated, {len(failed)} failed -> {path}")
+        return path
+    
+    def merge_shards(self, shard_dir: str = DEFAULT_SHARD_DIR, run_id: Optional[str] = None) -> bool:
+        """
+        Merge partial result files from update_shard() into the data files.
+        
+        Only files stamped with `run_id` (default: default_run_id()) are
+        merged; without a run id, the files of the most recently generated run
+        are. Files left over from other runs are skipped. Users from missing
+        shards, failed fetches and users removed since the shards were started
+        keep their current data. Shard files that cannot be read or carry no
+        valid `generated_at` are skipped with a warning. save_data() replaces
+        each data file atomically; the pair is replaced back to back, not as
+        one atomic step.
+        
+        Returns:
+            True if every shard of the run was present
+        """
+        shard_files = sorted(
+            os.path.join(shard_dir, name) for name in os.listdir(shard_dir)
+            if name.startswith("leaderboard_shard_") and name.endswith(".json")
+        ) if os.path.isdir(shard_dir) else []
+        if not shard_files:
+            print(f"❌ No shard files found in {shard_dir}")
+            return False
+        
+        shards = []
+        for path in shard_files:
+            try:
+                with open(path, 'r') as f:
+                    shard = json.load(f)
+            except (OSError, ValueError) as e:
+                print(f"⚠️ Skipping {path}: unreadable shard file ({e})")
+                continue
+            try:
+                generated_at = parse_timestamp(shard.get("generated_at"))
+            except (AttributeError, TypeError, ValueError):
+                print(f"⚠️ Skipping {path}: missing or invalid generated_at")
+                continue
+            shards.append((path, shard, generated_at))
+        if not shards:
+            print(f"❌ No readable shard files in {shard_dir}")
+            return False
+        
+        run_id = run_id or default_run_id()
+        if run_id is None:
+            run_id = max(shards, key=lambda item: item[2])[1].get("run_id")
+        stale = [path for path, shard, _ in shards if shard.get("run_id") != run_id]
+        for path in stale:
+            print(f"⚠️ Skipping {path}: not from run {run_id}")
+        shards = [shard for _, shard, _ in shards if shard.get("run_id") == run_id]
+        if not shards:
+            print(f"❌ No shard files from run {run_id} in {shard_dir}")
+            return False
+        
+        counts = {shard["shard_count"] for shard in shards}
+        if len(counts) > 1:
+            print(f"❌ Shard files from different runs in {shard_dir} (shard counts {sorted(counts)})")
+            return False
+        count = counts.pop()
+        missing = sorted(set(range(1, count + 1)) - {shard["shard"] for shard in shards})
+        
+        merged = {}
+        for shard in shards:
+            for username, user_stats in shard["users"].items():
+                if username in self.users:
+                    merged[username] = user_stats
+            for username in shard.get("failed", []):
+                print(f"⚠️ Shard {shard['shard']}/{count} could not update {username}, keeping previous data")
+        
+        if missing:
+            print(f"⚠️ Missing shard(s) {', '.join(map(str, missing))} of {count}, their users keep previous data")
+        
+        self.finalize_weeks()
+        self._apply_changes(merged)
+        self.save_data()
+        print(f"✅ Merged {len(merged)}/{len(self.users)} users from {len(shards)}/{count} shards")
+        return not missing
+    
+    def update_user(self, username: str, max_age: Optional[float] = 0) -> bool:
+        """Update stats for a specific user (fetched fresh unless `max_age` allows a cached profile)."""
+        if username.lower() not in self.users:
             print(f"❌ User {username} not in leaderboard")
             return False
         
+        self.finalize_weeks()
         print(f"🔍 Updating {username}...")
-        user_stats = get_user_stats(username)
+        return self._store_updated(username, get_user_stats(username, max_age))
+    
+    async def update_user_async(self, username: str, max_age: Optional[float] = 0) -> bool:
+        """update_user() that awaits the fetch instead of blocking on it."""
+        from async_fetch import fetch_users
+        
+        if username.lower() not in self.users:
+            print(f"❌ User {username} not in leaderboard")
+            return False
         
+        self.finalize_weeks()
+        print(f"🔍 Updating {username}...")
+        fetched, _ = await fetch_users([username], max_age=max_age)
+        return self._store_updated(username, fetched.get(username))
+    
+    def _store_updated(self, username: str, user_stats: Optional[Dict]) -> bool:
         if user_stats:
             # Calculate time analytics
             user_stats["time_analytics"] = analyze_time_frames(
@@ -565,7 +1605,7 @@ class LeetCodeLeaderboard:
                 user_stats.get("recent_submissions", [])
             )
             
-            self.users[username_lower] = user_stats
+            self._apply_changes({username.lower(): user_stats})
             self.save_data()
             print(f"✅ Updated {username}")
             print(f"📊 Weekly Score: {user_stats.get('weekly_base_score', 0)} pts")
@@ -586,30 +1626,20 @@ class LeetCodeLeaderboard:
         Returns:
             List of user data sorted by specified field
         """
-        if not self.users:
+        state = self._state  # One consistent snapshot for the whole call
+        if not state.users:
             return []
         
-        # Ensure all users have time analytics calculated
-        for user_data in self.users.values():
-            if 'time_analytics' not in user_data:
-                user_data['time_analytics'] = analyze_time_frames(
-                    user_data.get("submission_calendar", ""),
-                    user_data.get("recent_submissions", [])
-                )
-        
-        # Sort users by specified field (descending for scores/problems, ascending for ranking)
-        reverse_sort = sort_by != "ranking"
-        sorted_users = sorted(
-            self.users.values(),
-            key=lambda x: x.get(sort_by, 0),
-            reverse=reverse_sort
-        )
-        
-        # Add position numbers
-        for i, user in enumerate(sorted_users, 1):
-            user['position'] = i
+        view = state.views.get(sort_by)
+        if view is None:
+            # Descending for scores/problems, ascending for ranking
+            keys = sort_order(state.users, sort_by)
             
-        return sorted_users
+            # Add position numbers on copies; published records are never modified
+            sorted_users = [{**state.users[key], 'position': i} for i, key in enumerate(keys, 1)]
+            view = state.views[sort_by] = (keys, sorted_users)
+        
+        return list(view[1])
     
     def display_leaderboard(self, sort_by: str = "weekly_base_score") -> None:
         """Display the weekly leaderboard with weekly scoring metrics."""
@@ -672,7 +1702,7 @@ class LeetCodeLeaderboard:
             
             # Format last updated
             try:
-                last_updated = datetime.fromisoformat(user['last_updated'])
+                last_updated = parse_timestamp(user['last_updated']).astimezone()
                 time_str = last_updated.strftime("%m/%d")
             except:
                 time_str = "Unknown"
@@ -731,6 +1761,34 @@ class LeetCodeLeaderboard:
             
         print("="*130)
     
+    def display_week(self, week: Optional[str] = None) -> None:
+        """Display a finalized week straight from the weekly archive (default: the latest)."""
+        archive = get_weekly_archive()
+        weeks = archive.weeks()
+        if not weeks:
+            print("🗃️ No finalized weeks archived yet")
+            return
+        week = week or weeks[-1]
+        archived = archive.read_week(week)
+        if archived is None:
+            print(f"❌ Week {week} is not archived. Archived weeks: {', '.join(weeks[-8:])}")
+            return
+        
+        rows = archived["rows"]
+        print("\n" + "="*70)
+        print(f"🗃️ WEEK {week} ({archived['start']} to {archived['end']}) 🗃️".center(70))
+        print("="*70)
+        print(f"{'Pos':<4} {'Username':<16} {'Week Score':<11} {'Week E/M/H':<12} {'Problems'}")
+        print("-"*70)
+        for row in rows:
+            pos_emoji = "🥇" if row['rank'] == 1 else "🥈" if row['rank'] == 2 else "🥉" if row['rank'] == 3 else f"{row['rank']:2d}."
+            emh_str = f"{row.get('weekly_easy') or 0}/{row.get('weekly_medium') or 0}/{row.get('weekly_hard') or 0}"
+            print(f"{pos_emoji:<4} {row['username']:<16} {(row.get('weekly_base_score') or 0):<11.0f} {emh_str:<12} "
+                  f"{row.get('weekly_total') or 0}")
+        print("="*70)
+        print(f"📊 {sum(row.get('weekly_total') or 0 for row in rows)} problems solved by {len(rows)} users "
+              f"| Finalized {archived['finalized_at'][:16].replace('T', ' ')}")
+    
     def display_user_details(self, username: str) -> None:
         """Display detailed stats for a specific user with advanced metrics."""
         username_lower = username.lower()
@@ -738,7 +1796,7 @@ class LeetCodeLeaderboard:
             print(f"❌ User {username} not found in leaderboard")
             return
         
-        user = self.users[username_lower]
+        user = self.ensure_details(username_lower) or self.users[username_lower]
         
         print("\n" + "="*80)
         print(f"👤 {user['username']} - Advanced Profile".center(80))
@@ -751,15 +1809,20 @@ class LeetCodeLeaderboard:
         print("\n🎯 Scoring Metrics:")
         base_score = user.get('base_score', 0)
         weekly_score = user.get('weekly_base_score', 0)
-        print(f"├─ Total Score: {base_score} pts (Easy×1 + Medium×3 + Hard×7)")
+        base_rules = get_base_rules()
+        print(f"├─ Total Score: {base_score} pts ({base_rules.describe()})")
         print(f"└─ Weekly Score: {weekly_score} pts")
+        for rules in get_scoring_rules():
+            if rules is not base_rules:
+                print(f"   {rules.name}: " + " | ".join(f"{field} {user.get(field, 0)}" for field in rules.fields))
         
         # Problem Breakdown  
+        weights = base_rules.weights
         print(f"\n📚 Problem Breakdown:")
         print(f"├─ Total Solved: {user['total_solved']}")
-        print(f"├─ Easy: {user['easy']} (×1 = {user['easy']} pts)")
-        print(f"├─ Medium: {user['medium']} (×3 = {user['medium'] * 3} pts)")
-        print(f"└─ Hard: {user['hard']} (×7 = {user['hard'] * 7} pts)")
+        print(f"├─ Easy: {user['easy']} (×{weights['Easy']} = {user['easy'] * weights['Easy']} pts)")
+        print(f"├─ Medium: {user['medium']} (×{weights['Medium']} = {user['medium'] * weights['Medium']} pts)")
+        print(f"└─ Hard: {user['hard']} (×{weights['Hard']} = {user['hard'] * weights['Hard']} pts)")
         
         if user['ranking'] > 0:
             print(f"\n🏅 LeetCode Ranking: #{user['ranking']:,}")
@@ -813,7 +1876,7 @@ class LeetCodeLeaderboard:
             print(f"Hard   [{self._create_progress_bar(hard_pct, 30)}] {hard_pct:.1f}%")
         
         try:
-            last_updated = datetime.fromisoformat(user['last_updated'])
+            last_updated = parse_timestamp(user['last_updated']).astimezone()
             print(f"\n🕒 Last Updated: {last_updated.strftime('%Y-%m-%d %H:%M:%S')}")
         except:
             print("\n🕒 Last Updated: Unknown")
@@ -831,11 +1894,56 @@ def main():
     """Main application with command-line interface."""
     import sys
     
+    # Optional transport mode: --record [dir] saves LeetCode responses as
+    # cassettes, --replay [dir] reprocesses them offline
+    for mode in ("record", "replay"):
+        flag = f"--{mode}"
+        if flag in sys.argv:
+            index = sys.argv.index(flag)
+            cassette_dir = DEFAULT_CASSETTE_DIR
+            if index + 1 < len(sys.argv) and not sys.argv[index + 1].startswith("--"):
+                cassette_dir = sys.argv[index + 1]
+            set_transport(create_transport(mode, cassette_dir))
+            print(f"📼 Transport mode: {mode} ({cassette_dir})")
+    
+    shard_dir = DEFAULT_SHARD_DIR
+    if "--shard-dir" in sys.argv:
+        shard_dir = sys.argv[sys.argv.index("--shard-dir") + 1]
+    # Id shared by the shard runners and the merge of one refresh (default: $GITHUB_RUN_ID)
+    run_id = None
+    if "--run-id" in sys.argv:
+        run_id = sys.argv[sys.argv.index("--run-id") + 1]
+    
+    # Merge partial results written by sharded batch runs
+    if '--merge' in sys.argv:
+        leaderboard = LeetCodeLeaderboard()
+        sys.exit(0 if leaderboard.merge_shards(shard_dir, run_id) else 1)
+    
+    # Oldest cached profile to reuse, in seconds (default 0: fetch fresh)
+    max_age = 0
+    if "--max-age" in sys.argv:
+        max_age = float(sys.argv[sys.argv.index("--max-age") + 1])
+    
     # Check for batch mode (for GitHub Actions)
     if len(sys.argv) > 1 and '--update-all' in sys.argv and '--batch' in sys.argv:
         print("🔄 Running in batch mode for automation...")
         leaderboard = LeetCodeLeaderboard()
-        leaderboard.update_all_users()
+        if '--shard' in sys.argv:
+            index, count = parse_shard(sys.argv[sys.argv.index('--shard') + 1])
+            leaderboard.update_shard(index, count, shard_dir, run_id)
+        elif '--rolling' in sys.argv:
+            leaderboard.update_stalest(int(sys.argv[sys.argv.index('--rolling') + 1]))
+        elif '--users' in sys.argv:
+            # Comma-separated usernames, e.g. the updated_users of a dispatch
+            usernames = [name for name in sys.argv[sys.argv.index('--users') + 1].split(',') if name.strip()]
+            leaderboard.update_users([name.strip() for name in usernames], max_age)
+        else:
+            leaderboard.update_all_users(max_age)
+        return
+    
+    # Recompute score columns after changing scoring_rules.json (no fetching)
+    if '--rescore' in sys.argv:
+        LeetCodeLeaderboard().rescore()
         return
     
     leaderboard = LeetCodeLeaderboard()
@@ -849,7 +1957,11 @@ def main():
         print("  add <username>     - Add a friend to weekly leaderboard")
         print("  remove <username>  - Remove a friend") 
         print("  update [username]  - Update weekly stats (all or specific user)")
+        print("  import <file>      - Add every user listed in a JSON or CSV file")
+        print("  rescore            - Recompute scores with the current scoring rules")
+        print("  activity           - Show group activity and streaks")
         print("  show [sort_by]     - Show weekly leaderboard")
+        print("  show --week [week] - Show a finalized week (default: the last one)")
         print("  details <username> - Show detailed user stats")
         print("  list               - List all users")
         print("  help               - Show detailed help")
@@ -857,13 +1969,14 @@ def main():
         print("="*65)
         
         try:
-            command = input("\n💻 Enter command: ").strip().lower()
+            raw_command = input("\n💻 Enter command: ").strip()
             
-            if not command:
+            if not raw_command:
                 continue
             
-            parts = command.split()
-            cmd = parts[0]
+            # Only the verb is case-insensitive: score fields keep their rule names' case
+            parts = raw_command.split()
+            cmd = parts[0].lower()
             
             if cmd == "exit" or cmd == "quit":
                 print("👋 Goodbye! Keep solving those problems!")
@@ -877,6 +1990,8 @@ def main():
                 print("  remove <username>  : Remove a user from leaderboard")  
                 print("  update             : Update all users' weekly stats")
                 print("  update <username>  : Update specific user's weekly stats")
+                print("  import <file>      : Add users from a JSON list or CSV file (fetched in parallel)")
+                print("  rescore            : Recompute all scores from stored counts (after editing scoring_rules.json)")
                 print("\n📊 Weekly Leaderboard Views:")
                 print("  show               : Display weekly leaderboard (sorted by weekly score)")
                 print("  show weekly        : Sort by weekly advanced score (default)")
@@ -888,13 +2003,15 @@ def main():
                 print("  show medium        : Sort by total medium problems") 
                 print("  show hard          : Sort by total hard problems")
                 print("  show ranking       : Sort by LeetCode ranking")
+                print("  show <score field> : Sort by a configured score column, e.g. weekly_<name>_score")
+                print("  show --week [week] : Show a finalized week from the archive, e.g. show --week 2025-W03")
                 print("\n🔍 Analysis:")
                 print("  details <username> : Show detailed stats for a user")
                 print("  list               : List all users in leaderboard")
+                print("  activity           : Daily active members, 7/30-day totals and streaks for the group")
                 print("\n🎯 Weekly Scoring System:")
-                print("  • Easy problems = 1 point each")
-                print("  • Medium problems = 3 points each")
-                print("  • Hard problems = 7 points each")
+                for difficulty, weight in get_base_rules().weights.items():
+                    print(f"  • {difficulty} problems = {weight} point{'s' if weight != 1 else ''} each")
                 print("  • Weekly score = Problems solved THIS WEEK only")
                 print("  • Pure difficulty-based scoring (no multipliers)")
                 print("  • Competition resets every Monday!")
@@ -914,6 +2031,26 @@ def main():
                     username = parts[1]
                     leaderboard.remove_user(username)
             
+            elif cmd == "import":
+                if len(parts) < 2:
+                    print("❌ Please specify a file: import <file>")
+                else:
+                    path = raw_command.split(maxsplit=1)[1]  # Keep the path's case
+                    try:
+                        with open(path, 'r', encoding='utf-8') as f:
+                            usernames = parse_usernames(f.read())
+                    except (OSError, ValueError) as e:
+                        print(f"❌ Could not read {path}: {e}")
+                        continue
+                    for result in leaderboard.import_users(usernames):
+                        print(f"  {result['status']:>8}  {result['username']}")
+            
+            elif cmd == "rescore":
+                leaderboard.rescore()
+            
+            elif cmd == "activity":
+                leaderboard.display_activity()
+            
             elif cmd == "update":
                 if len(parts) == 1:
                     leaderboard.update_all_users()
@@ -921,6 +2058,9 @@ def main():
                     username = parts[1]
                     leaderboard.update_user(username)
             
+            elif cmd == "show" and len(parts) > 1 and parts[1].lower() == "--week":
+                leaderboard.display_week(parts[2].upper() if len(parts) > 2 else None)
+            
             elif cmd == "show":
                 sort_by = "weekly_base_score"  # Default to weekly base score
                 if len(parts) > 1:
@@ -936,7 +2076,8 @@ def main():
                         "ranking": "ranking",
                         "total": "total_solved"
                     }
-                    sort_by = sort_options.get(parts[1], "weekly_base_score")
+                    score_fields = {field for rules in get_scoring_rules() for field in rules.fields}
+                    sort_by = sort_options.get(parts[1].lower(), parts[1] if parts[1] in score_fields else "weekly_base_score")
                 
                 leaderboard.display_leaderboard(sort_by)
             
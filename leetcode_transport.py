@@ -0,0 +1,225 @@
+"""
+Pluggable HTTP transport for LeetCode GraphQL requests.
+
+Every call to LeetCode goes through get_transport().post(...), which behaves
+like requests.post. Three modes are available:
+
+    live    - talk to LeetCode directly (default)
+    record  - talk to LeetCode and save every response as a cassette file
+    replay  - answer every request from cassette files, never touching the network
+
+The mode is chosen with set_transport() or the LEETCODE_TRANSPORT and
+LEETCODE_CASSETTE_DIR environment variables.
+
+Requests are spaced at least the transport's request_delay apart by the
+process-wide RequestGate (request_gate()), which the synchronous fetchers and
+the asyncio engine share.
+"""
+
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from datetime import datetime
+from typing import Dict, Optional
+
+import requests
+
+DEFAULT_CASSETTE_DIR = "cassettes"
+TRANSPORT_MODES = ("live", "record", "replay")
+
+
+class CassetteMissError(requests.exceptions.RequestException):
+    """Raised in replay mode when no cassette was recorded for a request."""
+
+
+class ReplayResponse:
+    """Minimal stand-in for requests.Response rebuilt from a cassette."""
+
+    def __init__(self, url: str, status_code: int, body):
+        self.url = url
+        self.status_code = status_code
+        self._body = body
+
+    @property
+    def text(self) -> str:
+        if isinstance(self._body, str):
+            return self._body
+        return json.dumps(self._body)
+
+    def json(self):
+        # Decode a fresh copy each time so callers can mutate the result
+        return json.loads(self.text)
+
+    def raise_for_status(self) -> None:
+        if self.status_code >= 400:
+            raise requests.exceptions.HTTPError(
+                f"{self.status_code} Error (replayed) for url: {self.url}",
+                response=self
+            )
+
+
+def cassette_name(url: str, payload: Optional[Dict]) -> str:
+    """
+    Build a stable cassette file name for a GraphQL request.
+
+    The name starts with the operation name and variables so cassette
+    directories stay readable, and ends with a hash of the whitespace-normalised
+    query so that changing the query invalidates old recordings.
+
+    Args:
+        url: Request URL
+        payload: JSON body with "query" and "variables"
+
+    Returns:
+        File name (without directory) for the cassette
+    """
+    payload = payload or {}
+    query = " ".join(str(payload.get("query", "")).split())
+    variables = payload.get("variables") or {}
+
+    match = re.search(r"query\s+(\w+)", query)
+    operation = match.group(1) if match else "request"
+
+    key = json.dumps({"url": url, "query": query, "variables": variables}, sort_keys=True)
+    digest = hashlib.sha256(key.encode("utf-8")).hexdigest()[:12]
+
+    label = "-".join(str(value) for _, value in sorted(variables.items()))
+    label = re.sub(r"[^A-Za-z0-9_.-]", "_", label.lower())
+    return f"{operation}-{label}-{digest}.json" if label else f"{operation}-{digest}.json"
+
+
+class LiveTransport:
+    """Send requests straight to LeetCode."""
+
+    mode = "live"
+    request_delay = 1.0  # Seconds to wait between users in bulk refreshes
+
+    def post(self, url: str, **kwargs):
+        return requests.post(url, **kwargs)
+
+
+class RecordTransport(LiveTransport):
+    """Send requests to LeetCode and save each response as a cassette."""
+
+    mode = "record"
+
+    def __init__(self, cassette_dir: str = DEFAULT_CASSETTE_DIR):
+        self.cassette_dir = cassette_dir
+        os.makedirs(cassette_dir, exist_ok=True)
+
+    def post(self, url: str, **kwargs):
+        response = super().post(url, **kwargs)
+
+        try:
+            body = response.json()
+        except ValueError:
+            body = response.text
+
+        payload = kwargs.get("json")
+        cassette = {
+            "request": {
+                "url": url,
+                "variables": (payload or {}).get("variables", {})
+            },
+            "status_code": response.status_code,
+            "body": body,
+            "recorded_at": datetime.now().isoformat()
+        }
+
+        path = os.path.join(self.cassette_dir, cassette_name(url, payload))
+        try:
+            with open(path, 'w', encoding='utf-8') as f:
+                json.dump(cassette, f, indent=2)
+        except OSError as e:
+            print(f"⚠️ Could not write cassette {path}: {e}")
+
+        return response
+
+
+class ReplayTransport:
+    """Answer requests from previously recorded cassettes only."""
+
+    mode = "replay"
+    request_delay = 0.0  # No upstream to be polite to
+
+    def __init__(self, cassette_dir: str = DEFAULT_CASSETTE_DIR):
+        self.cassette_dir = cassette_dir
+
+    def post(self, url: str, **kwargs):
+        path = os.path.join(self.cassette_dir, cassette_name(url, kwargs.get("json")))
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                cassette = json.load(f)
+        except FileNotFoundError:
+            raise CassetteMissError(f"No cassette recorded for this request ({path})")
+
+        return ReplayResponse(url, cassette.get("status_code", 200), cassette.get("body"))
+
+
+class RequestGate:
+    """
+    Minimum interval between upstream requests, shared by every caller in the
+    process. Each caller reserves the next free slot and then waits for it,
+    so threads and asyncio tasks queue up instead of bursting.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._next_slot = 0.0  # time.monotonic() of the next free slot
+
+    def reserve(self, interval: float) -> float:
+        """Reserve a slot `interval` seconds after the previous one; returns the seconds to wait for it."""
+        if interval <= 0:
+            return 0.0
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot)
+            self._next_slot = slot + interval
+        return slot - now
+
+    def wait(self, interval: float) -> None:
+        """Block the calling thread until a reserved slot comes."""
+        delay = self.reserve(interval)
+        if delay > 0:
+            time.sleep(delay)
+
+
+_gate = RequestGate()
+
+
+def request_gate() -> RequestGate:
+    """The process-wide gate; pass it get_transport().request_delay."""
+    return _gate
+
+
+def create_transport(mode: str, cassette_dir: str = DEFAULT_CASSETTE_DIR):
+    """Create a transport for the given mode (live, record or replay)."""
+    if mode == "record":
+        return RecordTransport(cassette_dir)
+    if mode == "replay":
+        return ReplayTransport(cassette_dir)
+    if mode == "live":
+        return LiveTransport()
+    raise ValueError(f"Unknown transport mode '{mode}' (expected one of {', '.join(TRANSPORT_MODES)})")
+
+
+_transport = None
+
+
+def get_transport():
+    """Return the active transport, creating it from the environment on first use."""
+    global _transport
+    if _transport is None:
+        mode = os.environ.get("LEETCODE_TRANSPORT", "live").strip().lower() or "live"
+        cassette_dir = os.environ.get("LEETCODE_CASSETTE_DIR", DEFAULT_CASSETTE_DIR)
+        _transport = create_transport(mode, cassette_dir)
+    return _transport
+
+
+def set_transport(transport) -> None:
+    """Replace the active transport (pass None to go back to the environment default)."""
+    global _transport
+    _transport = transport
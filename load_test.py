@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+"""
+HTTP load-test harness for the Flask apps.
+
+Drives concurrent traffic against /, /user/<username>, /api/leaderboard and
+/api/stats and reports throughput plus p50/p95/p99 latency per endpoint.
+Requests go through the Flask test client (in-process) or, with --url, to a
+running server.
+
+Usage:
+    python load_test.py --app web --users 1000 --requests 2000 --concurrency 16
+    python load_test.py --app api --data web_leaderboard_data.json
+    python load_test.py --url http://localhost:5000 --data web_leaderboard_data.json
+"""
+
+import importlib.util
+import json
+import math
+import os
+import random
+import sys
+import threading
+import time
+from collections import Counter, defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import redirect_stdout
+from typing import Dict, List
+
+from synthetic_data import generate_users
+
+ENDPOINTS = ["/", "/user/<username>", "/api/leaderboard", "/api/stats"]
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = math.ceil(pct / 100 * len(sorted_values))
+    return sorted_values[max(0, min(len(sorted_values), rank) - 1)]
+
+
+def load_app(app_name: str, users: Dict[str, Dict]):
+    """Import web_app.py or api/index.py and point its leaderboard at `users`."""
+    root = os.path.dirname(os.path.abspath(__file__))
+    with open(os.devnull, 'w') as devnull, redirect_stdout(devnull):
+        if app_name == "api":
+            spec = importlib.util.spec_from_file_location("api_index", os.path.join(root, "api", "index.py"))
+            module = importlib.util.module_from_spec(spec)
+            sys.modules["api_index"] = module  # Flask resolves template paths via sys.modules
+            spec.loader.exec_module(module)
+        else:
+            import web_app as module
+    module.leaderboard.users = users
+    module.app.logger.disabled = True  # Failures are counted by status code instead
+    return module.app
+
+
+class Client:
+    """Thread-local request sender for the test client or a live server."""
+
+    def __init__(self, app=None, base_url: str = None):
+        self.app = app
+        self.base_url = base_url.rstrip("/") if base_url else None
+        self._local = threading.local()
+
+    def get(self, path: str) -> int:
+        if self.base_url:
+            import requests
+            session = getattr(self._local, "session", None)
+            if session is None:
+                session = self._local.session = requests.Session()
+            return session.get(self.base_url + path, allow_redirects=False, timeout=30).status_code
+
+        client = getattr(self._local, "client", None)
+        if client is None:
+            client = self._local.client = self.app.test_client()
+        return client.get(path).status_code
+
+
+def run_load_test(client: Client, usernames: List[str], total_requests: int,
+                  concurrency: int, endpoints: List[str]) -> Dict:
+    """Send `total_requests` spread evenly over `endpoints` with `concurrency` workers."""
+    rng = random.Random(7)
+    plan = []
+    for i in range(total_requests):
+        endpoint = endpoints[i % len(endpoints)]
+        path = endpoint.replace("<username>", rng.choice(usernames)) if usernames else endpoint
+        plan.append((endpoint, path))
+
+    latencies = defaultdict(list)
+    statuses = defaultdict(Counter)
+    lock = threading.Lock()
+
+    def send(item):
+        endpoint, path = item
+        start = time.perf_counter()
+        try:
+            status = client.get(path)
+        except Exception as e:
+            status = type(e).__name__
+        elapsed = (time.perf_counter() - start) * 1000
+        with lock:
+            latencies[endpoint].append(elapsed)
+            statuses[endpoint][status] += 1
+
+    with open(os.devnull, 'w') as devnull, redirect_stdout(devnull):
+        wall_start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            list(pool.map(send, plan))
+        wall_time = time.perf_counter() - wall_start
+
+    return {"latencies": latencies, "statuses": statuses, "wall_time": wall_time}
+
+
+def print_report(result: Dict, concurrency: int) -> None:
+    wall_time = result["wall_time"]
+    all_latencies = sorted(l for values in result["latencies"].values() for l in values)
+
+    print(f"\n{'Endpoint':<20} {'Requests':>9} {'Req/s':>9} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}  Status codes")
+    print("-" * 100)
+    for endpoint, values in result["latencies"].items():
+        values = sorted(values)
+        codes = ", ".join(f"{code}×{count}" for code, count in result["statuses"][endpoint].items())
+        print(f"{endpoint:<20} {len(values):>9} {len(values) / wall_time:>9.1f} "
+              f"{percentile(values, 50):>9.2f} {percentile(values, 95):>9.2f} {percentile(values, 99):>9.2f}  {codes}")
+    print("-" * 100)
+    print(f"{'TOTAL':<20} {len(all_latencies):>9} {len(all_latencies) / wall_time:>9.1f} "
+          f"{percentile(all_latencies, 50):>9.2f} {percentile(all_latencies, 95):>9.2f} {percentile(all_latencies, 99):>9.2f}")
+    print(f"\n⏱️ {len(all_latencies)} requests in {wall_time:.2f}s with {concurrency} concurrent workers")
+
+
+def main():
+    def option(name, default):
+        if name in sys.argv:
+            return sys.argv[sys.argv.index(name) + 1]
+        return default
+
+    app_name = option("--app", "web")
+    data_file = option("--data", None)
+    base_url = option("--url", None)
+    total_requests = int(option("--requests", 1000))
+    concurrency = int(option("--concurrency", 8))
+    endpoints = option("--endpoints", ",".join(ENDPOINTS)).split(",")
+
+    if data_file:
+        with open(data_file, 'r') as f:
+            users = json.load(f)
+        print(f"📁 Loaded {len(users)} users from {data_file}")
+    else:
+        users = generate_users(int(option("--users", 1000)))
+        print(f"🧪 Generated {len(users)} synthetic users")
+
+    if base_url:
+        print(f"🌐 Target: {base_url}")
+        client = Client(base_url=base_url)
+    else:
+        print(f"🧰 Target: {app_name} app via Flask test client")
+        client = Client(app=load_app(app_name, users))
+
+    result = run_load_test(client, list(users.keys()), total_requests, concurrency, endpoints)
+    print_report(result, concurrency)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,165 @@
+"""
+On-disk cache of LeetCode profile fetches shared by the CLI, web_app.py and
+the serverless app.
+
+Entries are JSON values keyed by "<kind>:<username>", e.g. "profile:alice"
+for parsed get_user_stats() results. Each entry remembers when it was fetched
+(for the TTL) and when it was last read (for LRU eviction once the cache holds
+more than max_entries). Entries fetched before the current week started
+(Monday 00:00 UTC) are never returned, since their weekly fields belong to
+the previous week. The store is a small SQLite file, so several processes
+can read and write it at the same time.
+
+    LEETCODE_CACHE_FILE   cache location (default .leetcode_cache.sqlite3)
+    LEETCODE_CACHE_TTL    default max age in seconds (default 600, 0 disables reads)
+    LEETCODE_CACHE_SIZE   maximum number of entries (default 2000)
+
+A cache that cannot be opened or written is reported once and then skipped,
+so fetching never fails because of it.
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Optional
+
+from scoring import week_start
+
+DEFAULT_CACHE_FILE = ".leetcode_cache.sqlite3"
+DEFAULT_TTL = 600
+DEFAULT_MAX_ENTRIES = 2000
+
+
+class ProfileCache:
+    """TTL + LRU cache of JSON values in a SQLite file."""
+
+    def __init__(self, path: str = DEFAULT_CACHE_FILE, ttl: float = DEFAULT_TTL,
+                 max_entries: int = DEFAULT_MAX_ENTRIES):
+        self.path = path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._local = threading.local()  # One connection per thread
+        self._disabled = False
+
+    def _connect(self) -> Optional[sqlite3.Connection]:
+        if self._disabled:
+            return None
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            try:
+                conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+                conn.execute("PRAGMA journal_mode=WAL")
+                conn.execute(
+                    "CREATE TABLE IF NOT EXISTS entries ("
+                    " key TEXT PRIMARY KEY, value TEXT NOT NULL,"
+                    " fetched_at REAL NOT NULL, accessed_at REAL NOT NULL)"
+                )
+                conn.execute("CREATE INDEX IF NOT EXISTS entries_lru ON entries (accessed_at)")
+            except (sqlite3.Error, OSError) as e:
+                print(f"⚠️ Profile cache {self.path} unavailable, fetching without it: {e}")
+                self._disabled = True
+                return None
+            self._local.conn = conn
+        return conn
+
+    def get(self, key: str, max_age: Optional[float] = None) -> Optional[Any]:
+        """
+        Return the cached value for `key` if it is at most `max_age` seconds old.
+
+        Args:
+            key: Cache key
+            max_age: Freshness required by the caller; defaults to the cache TTL,
+                0 always misses
+        
+        Entries fetched before the start of the current week always miss.
+        """
+        max_age = self.ttl if max_age is None else max_age
+        conn = self._connect()
+        if conn is None or max_age <= 0:
+            return None
+
+        now = time.time()
+        try:
+            row = conn.execute(
+                "SELECT value FROM entries WHERE key = ? AND fetched_at >= ?",
+                (key, max(now - max_age, week_start()))
+            ).fetchone()
+            if row is None:
+                return None
+            conn.execute("UPDATE entries SET accessed_at = ? WHERE key = ?", (now, key))
+        except sqlite3.Error as e:
+            print(f"⚠️ Profile cache read failed for {key}: {e}")
+            return None
+        return json.loads(row[0])
+
+    def put(self, key: str, value: Any) -> None:
+        """Store `value` as fetched now, evicting the least recently used entries if full."""
+        conn = self._connect()
+        if conn is None:
+            return
+
+        now = time.time()
+        try:
+            conn.execute(
+                "INSERT OR REPLACE INTO entries (key, value, fetched_at, accessed_at) VALUES (?, ?, ?, ?)",
+                (key, json.dumps(value), now, now)
+            )
+            conn.execute(
+                "DELETE FROM entries WHERE key IN ("
+                " SELECT key FROM entries ORDER BY accessed_at DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,)
+            )
+        except sqlite3.Error as e:
+            print(f"⚠️ Profile cache write failed for {key}: {e}")
+
+    def invalidate(self, key: str) -> None:
+        conn = self._connect()
+        if conn is not None:
+            try:
+                conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+            except sqlite3.Error as e:
+                print(f"⚠️ Profile cache delete failed for {key}: {e}")
+
+    def size(self) -> int:
+        """Number of entries currently stored."""
+        conn = self._connect()
+        if conn is None:
+            return 0
+        return conn.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+
+
+def cache_key(kind: str, username: str) -> str:
+    """Key for one kind of cached data about `username` (usernames are case-insensitive)."""
+    return f"{kind}:{username.lower()}"
+
+
+_cache = None
+
+
+def get_profile_cache() -> ProfileCache:
+    """Return the shared cache, creating it from the environment on first use."""
+    global _cache
+    if _cache is None:
+        _cache = ProfileCache(
+            os.environ.get("LEETCODE_CACHE_FILE", DEFAULT_CACHE_FILE),
+            float(os.environ.get("LEETCODE_CACHE_TTL", DEFAULT_TTL)),
+            int(os.environ.get("LEETCODE_CACHE_SIZE", DEFAULT_MAX_ENTRIES))
+        )
+    return _cache
+
+
+def active_profile_cache() -> Optional[ProfileCache]:
+    """
+    The shared cache, or None while the transport records or replays cassettes
+    (those modes must see every request).
+    """
+    from leetcode_transport import get_transport
+    return get_profile_cache() if get_transport().mode == "live" else None
+
+
+def set_profile_cache(cache: Optional[ProfileCache]) -> None:
+    """Replace the shared cache (pass None to go back to the environment default)."""
+    global _cache
+    _cache = cache
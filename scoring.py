@@ -0,0 +1,261 @@
+"""
+Configurable scoring rules and a column-wise scoring engine.
+
+A ScoringRules object describes one named score:
+
+    weights         points per solved problem by difficulty (default Easy=1, Medium=3, Hard=7)
+    language_bonus  extra points per problem solved in a language, e.g. {"Rust": 1}
+    topic_bonus     extra points per problem solved in a topic, e.g. {"Dynamic Programming": 0.5}
+    decay           if set, also score the logged weekly history, weighting the
+                    week k weeks ago by decay**k (0 < decay < 1)
+
+Each rule set yields score columns on every user record: "<name>_score" (all
+time) and "weekly_<name>_score", plus "<name>_decayed_score" when decay is set.
+The "base" rules write the familiar base_score and weekly_base_score.
+
+Scores are computed from counts already stored in the records (and from the
+submission logs for decay), one column at a time over all users, so changing
+the scheme rescores everyone without fetching anything. NumPy is used when it
+is installed (pip install numpy); otherwise the same passes run on lists.
+
+Rules are read from the JSON list in LEETCODE_SCORING_RULES (default
+scoring_rules.json); without that file only the base rules apply.
+
+Language and topic bonuses need the detail fields (see ensure_details()), so
+users whose details were never loaded score no bonus.
+"""
+
+import json
+import os
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterable, List, Mapping, Optional, Sequence
+
+try:
+    import numpy as np
+except ImportError:  # Optional: plain lists do the same passes
+    np = None
+
+DIFFICULTIES = ("Easy", "Medium", "Hard")
+DEFAULT_WEIGHTS = {"Easy": 1, "Medium": 3, "Hard": 7}
+DEFAULT_RULES_FILE = "scoring_rules.json"
+BASE_RULES_NAME = "base"
+WEEK_SECONDS = 7 * 24 * 3600
+# Weeks of logged history scored for decay; older weeks barely count for any sensible decay
+DECAY_WEEKS = 12
+
+
+class ScoringRules:
+    """One named scoring scheme (see the module docstring)."""
+
+    def __init__(self, name: str = BASE_RULES_NAME, weights: Optional[Mapping[str, float]] = None,
+                 language_bonus: Optional[Mapping[str, float]] = None,
+                 topic_bonus: Optional[Mapping[str, float]] = None, decay: Optional[float] = None):
+        if not name or not name.replace("_", "").isalnum():
+            raise ValueError(f"Scoring rules name must be letters, digits and underscores, got {name!r}")
+        if decay is not None and not 0 < decay < 1:
+            raise ValueError(f"decay must be between 0 and 1, got {decay}")
+        unknown = set(weights or {}) - set(DIFFICULTIES)
+        if unknown:
+            raise ValueError(f"Unknown difficulties in weights: {', '.join(sorted(unknown))}")
+        self.name = name
+        self.weights = {**DEFAULT_WEIGHTS, **(weights or {})}
+        self.language_bonus = dict(language_bonus or {})
+        self.topic_bonus = dict(topic_bonus or {})
+        self.decay = decay
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "ScoringRules":
+        return cls(data.get("name", BASE_RULES_NAME), data.get("weights"), data.get("language_bonus"),
+                   data.get("topic_bonus"), data.get("decay"))
+
+    def to_dict(self) -> Dict:
+        return {"name": self.name, "weights": self.weights, "language_bonus": self.language_bonus,
+                "topic_bonus": self.topic_bonus, "decay": self.decay}
+
+    @property
+    def total_field(self) -> str:
+        return "base_score" if self.name == BASE_RULES_NAME else f"{self.name}_score"
+
+    @property
+    def weekly_field(self) -> str:
+        return f"weekly_{self.name}_score"
+
+    @property
+    def decayed_field(self) -> Optional[str]:
+        return f"{self.name}_decayed_score" if self.decay is not None else None
+
+    @property
+    def fields(self) -> List[str]:
+        return [field for field in (self.total_field, self.weekly_field, self.decayed_field) if field]
+
+    def score_counts(self, counts: Mapping[str, int]) -> float:
+        """Weighted score of one {"Easy": n, "Medium": n, "Hard": n} dict (no bonuses)."""
+        return as_score(sum(counts.get(difficulty, 0) * weight for difficulty, weight in self.weights.items()))
+
+    def describe(self) -> str:
+        """Short formula for display, e.g. "Easy×1 + Medium×3 + Hard×7"."""
+        formula = " + ".join(f"{difficulty}×{as_score(weight)}" for difficulty, weight in self.weights.items())
+        if self.language_bonus or self.topic_bonus:
+            formula += " + bonuses"
+        return formula
+
+
+def as_score(value: float):
+    """Keep whole-number scores as ints (as stored before rules were configurable)."""
+    value = float(value)
+    return int(value) if value.is_integer() else round(value, 2)
+
+
+def weighted_sum(columns: Mapping[str, Sequence[float]], weights: Mapping[str, float], length: int) -> List:
+    """Sum of weight * column over the weighted columns, one vector pass per column."""
+    if np is not None:
+        total = np.zeros(length)
+        for field, weight in weights.items():
+            if weight and field in columns:
+                total += weight * np.asarray(columns[field], dtype=float)
+        return [as_score(value) for value in total.tolist()]
+
+    total = [0.0] * length
+    for field, weight in weights.items():
+        if weight and field in columns:
+            total = [acc + weight * value for acc, value in zip(total, columns[field])]
+    return [as_score(value) for value in total]
+
+
+def week_start(now: Optional[datetime] = None) -> int:
+    """Timestamp of the Monday 00:00 UTC that starts the week containing `now`."""
+    now = now or datetime.now(timezone.utc)
+    monday = (now - timedelta(days=now.weekday())).replace(hour=0, minute=0, second=0, microsecond=0)
+    return int(monday.timestamp())
+
+
+def weekly_history(log, username: str, weeks: int = DECAY_WEEKS,
+                   now: Optional[datetime] = None) -> List[Dict[str, int]]:
+    """
+    Unique problems solved per week from `username`'s submission log, by
+    difficulty: element k is the week k weeks before the current one.
+    """
+    start = week_start(now)
+    history = [{difficulty: set() for difficulty in DIFFICULTIES} for _ in range(weeks)]
+    for entry in log.entries(username, start - (weeks - 1) * WEEK_SECONDS):
+        age = max(0, (start - entry["timestamp"] + WEEK_SECONDS - 1) // WEEK_SECONDS)
+        if age < weeks:
+            history[age].get(entry["difficulty"], history[age]["Easy"]).add(entry["slug"])
+    return [{difficulty: len(slugs) for difficulty, slugs in week.items()} for week in history]
+
+
+class ScoreTable:
+    """
+    Column view of many user records: one list per count (easy, weekly_hard,
+    language:Python3, history:3:Medium, ...), in the order of `keys`.
+    """
+
+    def __init__(self, users: Mapping[str, Dict], rules: Iterable[ScoringRules], log=None, history: bool = False):
+        self.rules = list(rules)
+        self.keys = list(users)
+        records = [users[key] for key in self.keys]
+        self.columns = {}
+        for difficulty in DIFFICULTIES:
+            field = difficulty.lower()
+            self.columns[field] = [user.get(field, 0) or 0 for user in records]
+            self.columns[f"weekly_{field}"] = [user.get(f"weekly_{field}", 0) or 0 for user in records]
+
+        for rules in self.rules:
+            for language in rules.language_bonus:
+                self.columns.setdefault(f"language:{language}",
+                                        [(user.get("languages") or {}).get(language, 0) for user in records])
+            for topic in rules.topic_bonus:
+                self.columns.setdefault(f"topic:{topic}",
+                                        [(user.get("topics") or {}).get(topic, 0) for user in records])
+
+        if log is not None and (history or any(rules.decay is not None for rules in self.rules)):
+            histories = [weekly_history(log, user.get("username", key)) for key, user in zip(self.keys, records)]
+            for age in range(DECAY_WEEKS):
+                for difficulty in DIFFICULTIES:
+                    self.columns[f"history:{age}:{difficulty}"] = [history[age][difficulty] for history in histories]
+
+    def score(self, rules: ScoringRules) -> Dict[str, List]:
+        """Score columns (field -> values in `keys` order) for one rule set."""
+        length = len(self.keys)
+        total_weights = {difficulty.lower(): weight for difficulty, weight in rules.weights.items()}
+        total_weights.update({f"language:{language}": bonus for language, bonus in rules.language_bonus.items()})
+        total_weights.update({f"topic:{topic}": bonus for topic, bonus in rules.topic_bonus.items()})
+        scores = {
+            rules.total_field: weighted_sum(self.columns, total_weights, length),
+            rules.weekly_field: weighted_sum(
+                self.columns, {f"weekly_{difficulty.lower()}": weight for difficulty, weight in rules.weights.items()},
+                length
+            )
+        }
+        if rules.decay is not None:
+            scores[rules.decayed_field] = weighted_sum(self.columns, {
+                f"history:{age}:{difficulty}": weight * rules.decay ** age
+                for age in range(DECAY_WEEKS) for difficulty, weight in rules.weights.items()
+            }, length)
+        return scores
+
+    def history(self, rules: ScoringRules) -> List[List]:
+        """Weekly scores from the logs: element k holds the scores (in `keys` order) of k weeks ago."""
+        return [
+            weighted_sum(self.columns, {f"history:{age}:{difficulty}": weight
+                                        for difficulty, weight in rules.weights.items()}, len(self.keys))
+            for age in range(DECAY_WEEKS)
+        ]
+
+    def score_all(self) -> Dict[str, Dict]:
+        """username -> {score field: value} for every rule set."""
+        result = {key: {} for key in self.keys}
+        for rules in self.rules:
+            for field, values in self.score(rules).items():
+                for key, value in zip(self.keys, values):
+                    result[key][field] = value
+        return result
+
+
+def load_scoring_rules(path: str) -> List[ScoringRules]:
+    """
+    Rule sets from a JSON list of rule objects. The base rules are added if the
+    file does not define them, so base_score always exists.
+
+    Raises:
+        OSError, ValueError: If the file cannot be read or is invalid
+    """
+    with open(path, 'r') as f:
+        data = json.load(f)
+    if not isinstance(data, list):
+        raise ValueError(f"{path} must contain a JSON list of scoring rules")
+    rules = [ScoringRules.from_dict(item) for item in data]
+    names = [item.name for item in rules]
+    if len(set(names)) != len(names):
+        raise ValueError(f"Duplicate scoring rules names in {path}")
+    if BASE_RULES_NAME not in names:
+        rules.insert(0, ScoringRules())
+    return rules
+
+
+_rules = None
+
+
+def get_scoring_rules() -> List[ScoringRules]:
+    """Return the configured rule sets, loaded from LEETCODE_SCORING_RULES on first use."""
+    global _rules
+    if _rules is None:
+        path = os.environ.get("LEETCODE_SCORING_RULES", DEFAULT_RULES_FILE)
+        try:
+            _rules = load_scoring_rules(path)
+        except FileNotFoundError:
+            _rules = [ScoringRules()]
+        except (OSError, ValueError) as e:
+            print(f"⚠️ Could not load scoring rules from {path}, using the base rules: {e}")
+            _rules = [ScoringRules()]
+    return _rules
+
+
+def get_base_rules() -> ScoringRules:
+    return next(rules for rules in get_scoring_rules() if rules.name == BASE_RULES_NAME)
+
+
+def set_scoring_rules(rules: Optional[List[ScoringRules]]) -> None:
+    """Replace the configured rule sets (pass None to reload from the environment)."""
+    global _rules
+    _rules = rules
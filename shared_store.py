@@ -0,0 +1,253 @@
+"""
+Cross-process shared leaderboard store for multi-worker deployments.
+
+Every worker (e.g. under gunicorn) keeps its own copy of the users, built from:
+
+    web_leaderboard_data.json           base snapshot, memory-mapped on load
+    web_leaderboard_data.json.journal   append-only JSON lines of put/delete ops
+    web_leaderboard_data.json.lock      lock file (shared for reads, exclusive for writes)
+
+Writers append only the records they changed. Readers notice changes with two
+os.stat() calls and replay just the new journal lines, so keeping a worker
+current costs next to nothing when nothing changed. Once the journal grows past
+compact_after entries it is folded into a new base file.
+
+The journal's first line names the base file it extends (inode, size, mtime).
+If something else rewrites the base, e.g. the CLI batch refresh, the old journal
+no longer matches and is ignored instead of being replayed over newer data.
+"""
+
+import json
+import mmap
+import os
+from contextlib import contextmanager
+from typing import Dict, Iterable, Set
+
+from file_watcher import file_id
+from leetcode_leaderboard import LeetCodeLeaderboard, restamp, write_json_atomic
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+COMPACT_AFTER = 500
+
+
+@contextmanager
+def file_lock(path: str, exclusive: bool = True):
+    """Hold an advisory lock on `path` (shared locks become exclusive on Windows)."""
+    with open(path, 'a+') as f:
+        if fcntl:
+            fcntl.flock(f, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+        else:
+            f.seek(0)
+            msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+        try:
+            yield
+        finally:
+            if fcntl:
+                fcntl.flock(f, fcntl.LOCK_UN)
+            else:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+class SharedStore:
+    """Base file + journal shared by all processes that open the same data file."""
+
+    def __init__(self, data_file: str, compact_after: int = COMPACT_AFTER):
+        self.data_file = data_file
+        self.journal_file = f"{data_file}.journal"
+        self.lock_file = f"{data_file}.lock"
+        self.compact_after = compact_after
+        self.users = {}
+        self.committed = {}  # key -> record as last loaded, written or applied by SharedLeaderboard
+        self._base_id = None
+        self._offset = 0  # Bytes of the journal already applied
+        self._journal_valid = False
+        self._entries = 0
+
+    def changed(self) -> bool:
+        """Cheap check (two stat calls) for writes by other processes."""
+        journal_id = file_id(self.journal_file)
+        journal_size = journal_id[1] if journal_id else 0
+        return file_id(self.data_file) != self._base_id or journal_size != self._offset
+
+    def refresh(self) -> Set[str]:
+        """Bring this process up to date; returns the keys that changed."""
+        if not self.changed():
+            return set()
+        with file_lock(self.lock_file, exclusive=False):
+            return self._catch_up()
+
+    def _catch_up(self) -> Set[str]:
+        journal_id = file_id(self.journal_file)
+        if file_id(self.data_file) != self._base_id or (journal_id and journal_id[1] < self._offset):
+            before = dict(self.committed)
+            self._load_base()
+            self._read_journal()
+            return {key for key in set(before) | set(self.committed) if before.get(key) != self.committed.get(key)}
+        return self._read_journal()
+
+    def _load_base(self) -> None:
+        users = {}
+        try:
+            with open(self.data_file, 'rb') as f:
+                if os.fstat(f.fileno()).st_size:
+                    with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                        users = json.loads(mapped[:])
+        except FileNotFoundError:
+            pass
+        self._base_id = file_id(self.data_file)
+        self._offset = 0
+        self._journal_valid = False
+        self._entries = 0
+        self.users.clear()
+        self.users.update(users)
+        self.committed = dict(users)
+
+    def _apply(self, entry: Dict) -> str:
+        key = entry["key"]
+        if entry["op"] == "put":
+            self.users[key] = self.committed[key] = entry["user"]
+        else:
+            self.users.pop(key, None)
+            self.committed.pop(key, None)
+        return key
+
+    def _read_journal(self) -> Set[str]:
+        changed = set()
+        try:
+            with open(self.journal_file, 'rb') as f:
+                f.seek(self._offset)
+                for line in f:
+                    if not line.endswith(b"\n"):
+                        break  # Incomplete write; picked up next time
+                    self._offset += len(line)
+                    entry = json.loads(line)
+                    if "base" in entry:
+                        self._journal_valid = entry["base"] == self._base_id
+                    elif self._journal_valid:
+                        changed.add(self._apply(entry))
+                        self._entries += 1
+        except FileNotFoundError:
+            self._offset = 0
+            self._journal_valid = False
+        return changed
+
+    def write(self, puts: Dict[str, Dict], deletes: Iterable[str] = ()) -> Set[str]:
+        """
+        Append changes to the journal under the exclusive lock.
+
+        Changes from other processes are applied first, so ours win on conflicts.
+
+        Returns:
+            Keys changed by other processes since the last refresh
+        """
+        deletes = list(deletes)
+        with file_lock(self.lock_file, exclusive=True):
+            remote = self._catch_up()
+            lines = []
+            if not self._journal_valid:
+                lines.append(json.dumps({"base": self._base_id}))
+                mode = 'w'
+            else:
+                mode = 'a'
+            lines += [json.dumps({"op": "put", "key": key, "user": user}) for key, user in puts.items()]
+            lines += [json.dumps({"op": "delete", "key": key}) for key in deletes]
+
+            with open(self.journal_file, mode, encoding='utf-8') as f:
+                f.write("".join(f"{line}\n" for line in lines))
+                f.flush()
+                os.fsync(f.fileno())
+            self._offset = file_id(self.journal_file)[1]
+            self._journal_valid = True
+            for key, user in puts.items():
+                self._apply({"op": "put", "key": key, "user": user})
+            for key in deletes:
+                self._apply({"op": "delete", "key": key})
+            self._entries += len(puts) + len(deletes)
+
+            if self._entries >= self.compact_after:
+                self._compact()
+        return remote
+
+    def compact(self) -> None:
+        """Fold the journal into a new base file."""
+        with file_lock(self.lock_file, exclusive=True):
+            self._catch_up()
+            self._compact()
+
+    def _compact(self) -> None:
+        write_json_atomic(self.data_file, self.committed, indent=2, sort_keys=True)
+        self._base_id = file_id(self.data_file)
+        with open(self.journal_file, 'w', encoding='utf-8') as f:
+            f.write(json.dumps({"base": self._base_id}) + "\n")
+        self._offset = file_id(self.journal_file)[1]
+        self._journal_valid = True
+        self._entries = 0
+
+
+class SharedLeaderboard(LeetCodeLeaderboard):
+    """
+    LeetCodeLeaderboard whose users live in a SharedStore.
+
+    save_data() journals only records whose content hash differs from the
+    store's, plus removals, since the last sync; call sync() (e.g. before each request) to pick up writes
+    made by other processes.
+    """
+
+    def __init__(self, data_file: str = "web_leaderboard_data.json", compact_after: int = COMPACT_AFTER):
+        self.store = SharedStore(data_file, compact_after)
+        super().__init__(data_file)
+
+    def load_data(self) -> None:
+        """Load the shared base file and journal."""
+        self.store.refresh()
+        self.users = restamp(self.store.users)
+        print(f"📁 Loaded data for {len(self.users)} users (shared store)")
+
+    def _apply_remote(self, keys: Set[str]) -> None:
+        store_users = self.store.users
+        self._apply_changes(
+            restamp({key: store_users[key] for key in keys if key in store_users}),
+            [key for key in keys if key not in store_users]
+        )
+        # The board may hold copies (details carried over, rescored); they stand
+        # for the records just read, so save_data() must not journal them back
+        users = self.users
+        for key in keys:
+            if key in store_users and key in users:
+                self.store.committed[key] = users[key]
+
+    def sync(self) -> Set[str]:
+        """Apply changes written by other processes; returns the changed keys."""
+        with self._write_lock:
+            changed = self.store.refresh()
+            if changed:
+                self._apply_remote(changed)
+        return changed
+
+    def save_data(self, force: bool = False) -> None:
+        """Journal the users added, replaced or removed since the last sync."""
+        with self._write_lock:
+            if self._defer_save(force):
+                return
+            users = self.users
+            committed = self.store.committed
+            puts = {key: user for key, user in users.items()
+                    if force or (committed.get(key) or {}).get("content_hash") != user["content_hash"]}
+            deletes = [key for key in committed if key not in users]
+            if not puts and not deletes:
+                return
+
+            try:
+                remote = self.store.write(puts, deletes)
+                print(f"💾 Journaled {len(puts)} update(s) and {len(deletes)} removal(s) to {self.store.journal_file}")
+            except OSError as e:
+                print(f"❌ Error saving data: {e}")
+                return
+            if remote:
+                self._apply_remote(remote - set(puts) - set(deletes))
@@ -0,0 +1,149 @@
+"""
+Solved-problem bitset index.
+
+Every problem slug in the catalog gets a bit position, and each user's solved
+problems are one integer with those bits set. Set questions become single
+bitwise operations on Python ints instead of scans over submission lists:
+
+    who solved X                  users whose bitset has X's bit
+    solved by A but not by B      A & ~B
+    group coverage (Blind 75)     (A | B | ...) & group
+    unique problems this week     OR of this week's bitsets, then a popcount
+
+The index is filled from the accepted-submission logs (submission_log.py), so
+"solved" means accepted since a user's log started, optionally limited to a
+period. The catalog is every slug seen in those logs, sorted, plus any named
+problem set passed in, so bit positions are stable for a given set of logs.
+"""
+
+from typing import Dict, Iterable, List, Optional
+
+from submission_log import SubmissionLog
+
+# The Blind 75 interview list
+BLIND_75 = (
+    "two-sum", "best-time-to-buy-and-sell-stock", "contains-duplicate", "product-of-array-except-self",
+    "maximum-subarray", "maximum-product-subarray", "find-minimum-in-rotated-sorted-array",
+    "search-in-rotated-sorted-array", "3sum", "container-with-most-water",
+    "sum-of-two-integers", "number-of-1-bits", "counting-bits", "missing-number", "reverse-bits",
+    "climbing-stairs", "coin-change", "longest-increasing-subsequence", "longest-common-subsequence",
+    "word-break", "combination-sum-iv", "house-robber", "house-robber-ii", "decode-ways",
+    "unique-paths", "jump-game",
+    "clone-graph", "course-schedule", "pacific-atlantic-water-flow", "number-of-islands",
+    "longest-consecutive-sequence", "alien-dictionary", "graph-valid-tree",
+    "number-of-connected-components-in-an-undirected-graph",
+    "insert-interval", "merge-intervals", "non-overlapping-intervals", "meeting-rooms", "meeting-rooms-ii",
+    "reverse-linked-list", "linked-list-cycle", "merge-two-sorted-lists", "merge-k-sorted-lists",
+    "remove-nth-node-from-end-of-list", "reorder-list",
+    "set-matrix-zeroes", "spiral-matrix", "rotate-image", "word-search",
+    "longest-substring-without-repeating-characters", "longest-repeating-character-replacement",
+    "minimum-window-substring", "valid-anagram", "group-anagrams", "valid-parentheses", "valid-palindrome",
+    "longest-palindromic-substring", "palindromic-substrings", "encode-and-decode-strings",
+    "maximum-depth-of-binary-tree", "same-tree", "invert-binary-tree", "binary-tree-maximum-path-sum",
+    "binary-tree-level-order-traversal", "serialize-and-deserialize-binary-tree", "subtree-of-another-tree",
+    "construct-binary-tree-from-preorder-and-inorder-traversal", "validate-binary-search-tree",
+    "kth-smallest-element-in-a-bst", "lowest-common-ancestor-of-a-binary-search-tree",
+    "implement-trie-prefix-tree", "design-add-and-search-words-data-structure", "word-search-ii",
+    "top-k-frequent-elements", "find-median-from-data-stream"
+)
+
+PROBLEM_SETS = {"blind75": BLIND_75}
+
+
+def popcount(mask: int) -> int:
+    return bin(mask).count("1")
+
+
+class SolvedIndex:
+    """
+    Catalog of problem slugs (slug -> bit) plus one solved bitset per user.
+
+    Indexes are built once (from_log) and then shared by request threads, so
+    the query methods never change the catalog.
+    """
+
+    def __init__(self, catalog: Iterable[str] = ()):
+        self.slugs = []  # bit position -> slug
+        self.positions = {}  # slug -> bit position
+        self.solved = {}  # username -> bitset
+        for slug in catalog:
+            self.position(slug)
+
+    def position(self, slug: str) -> int:
+        """Bit position of `slug`, adding it to the catalog if new."""
+        position = self.positions.get(slug)
+        if position is None:
+            position = self.positions[slug] = len(self.slugs)
+            self.slugs.append(slug)
+        return position
+
+    def mask(self, slugs: Iterable[str]) -> int:
+        """Bitset with the bits of `slugs` set."""
+        mask = 0
+        for slug in slugs:
+            mask |= 1 << self.position(slug)
+        return mask
+
+    def slugs_of(self, mask: int) -> List[str]:
+        """Slugs whose bits are set in `mask`, in catalog order."""
+        slugs = []
+        while mask:
+            lowest = mask & -mask  # Visit set bits only
+            slugs.append(self.slugs[lowest.bit_length() - 1])
+            mask ^= lowest
+        return slugs
+
+    def add(self, username: str, slugs: Iterable[str]) -> None:
+        self.solved[username] = self.solved.get(username, 0) | self.mask(slugs)
+
+    @classmethod
+    def from_log(cls, log: SubmissionLog, usernames: Iterable[str], start_ts: Optional[int] = None,
+                 end_ts: Optional[int] = None, catalog: Iterable[str] = ()) -> "SolvedIndex":
+        """Index the problems each user has accepted in the log (optionally within a period)."""
+        solved = {username: {entry["slug"] for entry in log.entries(username, start_ts, end_ts)}
+                  for username in usernames}
+        index = cls(sorted(set().union(*solved.values(), catalog)))
+        for username, slugs in solved.items():
+            index.add(username, slugs)
+        return index
+
+    def union(self, usernames: Optional[Iterable[str]] = None) -> int:
+        """Bitset of problems solved by any of `usernames` (default: everyone)."""
+        mask = 0
+        for username in self.solved if usernames is None else usernames:
+            mask |= self.solved.get(username, 0)
+        return mask
+
+    def who_solved(self, slug: str) -> List[str]:
+        """Users who solved `slug`."""
+        position = self.positions.get(slug)
+        if position is None:
+            return []
+        bit = 1 << position
+        return [username for username, mask in self.solved.items() if mask & bit]
+
+    def difference(self, username: str, other: str) -> List[str]:
+        """Problems `username` solved that `other` did not."""
+        return self.slugs_of(self.solved.get(username, 0) & ~self.solved.get(other, 0))
+
+    def coverage(self, group: Iterable[str], usernames: Optional[Iterable[str]] = None) -> Dict:
+        """How much of a problem group `usernames` (default: everyone) have covered between them."""
+        # Slugs outside the catalog were never solved by anyone; count them as
+        # missing instead of adding bits for them
+        group_mask, unknown = 0, []
+        for slug in dict.fromkeys(group):
+            position = self.positions.get(slug)
+            if position is None:
+                unknown.append(slug)
+            else:
+                group_mask |= 1 << position
+        covered = self.union(usernames) & group_mask
+        return {
+            "covered": popcount(covered),
+            "total": popcount(group_mask) + len(unknown),
+            "missing": self.slugs_of(group_mask & ~covered) + unknown
+        }
+
+    def unique_solved(self, usernames: Optional[Iterable[str]] = None) -> int:
+        """Number of distinct problems solved by `usernames` (default: everyone)."""
+        return popcount(self.union(usernames))
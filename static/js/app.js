@@ -18,9 +18,54 @@ document.addEventListener('DOMContentLoaded', function() {
     
     // Setup dynamic interactions
     setupDynamicInteractions();
+    
+    // Sort from the pre-rendered JSON views on the static site
+    setupStaticSorting();
 });
 
+function setupStaticSorting() {
+    // The static build has no server to sort ?sort_by= requests, but it ships
+    // api/leaderboard/<sort_by>.json for every sort key
+    if (!window.STATIC_SITE || !document.querySelector('#leaderboard-table')) {
+        return;
+    }
+    
+    document.querySelectorAll('.dropdown-item[href*="sort_by"]').forEach(link => {
+        link.addEventListener('click', function(e) {
+            e.preventDefault();
+            const sortBy = new URLSearchParams(this.getAttribute('href').split('?')[1]).get('sort_by');
+            history.replaceState(null, '', `?sort_by=${encodeURIComponent(sortBy)}`);
+            loadStaticSort(sortBy);
+        });
+    });
+    
+    const sortBy = new URLSearchParams(window.location.search).get('sort_by');
+    if (sortBy) {
+        loadStaticSort(sortBy);
+    }
+}
+
+function loadStaticSort(sortBy) {
+    fetch(`/api/leaderboard/${encodeURIComponent(sortBy)}.json`)
+        .then(response => {
+            if (!response.ok) {
+                throw new Error(`No pre-rendered view for ${sortBy}`);
+            }
+            return response.json();
+        })
+        .then(leaderboard => updateLeaderboardDisplay(leaderboard))
+        .catch(error => {
+            showToast('Could not sort the leaderboard.', 'error');
+            console.error('Error loading sorted view:', error);
+        });
+}
+
 function setupLiveDataFetching() {
+    // The static site has no server to refresh from
+    if (window.STATIC_SITE) {
+        return;
+    }
+    
     // Add refresh buttons to the navbar
     const navbar = document.querySelector('.navbar-nav');
     if (navbar) {
@@ -231,13 +276,7 @@ function createLeaderboardRow(user, position) {
     const rankingStr = user.ranking > 0 ? `#${user.ranking.toLocaleString()}` : 'N/A';
     
     // Format last updated
-    let timeStr = 'Just now';
-    try {
-        const lastUpdated = new Date(user.last_updated);
-        timeStr = lastUpdated.toLocaleDateString('en-US', { month: 'numeric', day: 'numeric' });
-    } catch (e) {
-        timeStr = 'Unknown';
-    }
+    const timeStr = freshnessBadge(user.last_updated);
     
     row.innerHTML = `
         <td><strong>${positionEmoji}</strong></td>
@@ -315,9 +354,51 @@ function updateLastUpdatedTime(timestamp) {
     }
 }
 
+// How old a user's data is, e.g. "3h ago"; data older than a day is flagged as stale
+const STALE_AFTER_HOURS = 24;
+
+// Timestamps are stored in UTC; older ones carry no offset, and Date would read
+// those as the viewer's local time
+function parseUtcTimestamp(timestamp) {
+    if (!timestamp) {
+        return new Date(NaN);
+    }
+    const hasOffset = /(Z|[+-]\d{2}:?\d{2})$/.test(timestamp);
+    return new Date(hasOffset || !timestamp.includes('T') ? timestamp : `${timestamp}Z`);
+}
+
+function formatFreshness(timestamp) {
+    const updated = parseUtcTimestamp(timestamp);
+    if (!timestamp || isNaN(updated)) {
+        return { label: 'Unknown', stale: true };
+    }
+    const minutes = Math.max(0, Math.round((Date.now() - updated.getTime()) / 60000));
+    const label = minutes < 60 ? `${minutes}m ago` :
+                  minutes < 48 * 60 ? `${Math.round(minutes / 60)}h ago` :
+                  `${Math.round(minutes / 1440)}d ago`;
+    return { label, stale: minutes > STALE_AFTER_HOURS * 60 };
+}
+
+function freshnessBadge(timestamp) {
+    const freshness = formatFreshness(timestamp);
+    const title = timestamp ? parseUtcTimestamp(timestamp).toLocaleString() : '';
+    return `<span class="data-freshness ${freshness.stale ? 'text-warning' : 'text-muted'}" title="${title}">${freshness.label}</span>`;
+}
+
+function updateFreshnessLabels() {
+    document.querySelectorAll('.data-freshness[data-updated]').forEach(element => {
+        const freshness = formatFreshness(element.dataset.updated);
+        element.textContent = freshness.label;
+        element.classList.toggle('text-warning', freshness.stale);
+    });
+}
+
 function initializeApp() {
     console.log('🚀 Advanced LeetCode Leaderboard initialized');
     
+    // Show how fresh each user's data is
+    updateFreshnessLabels();
+    
     // Add loading animations to buttons
     setupButtonAnimations();
     
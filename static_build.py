@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+Static-site build of the leaderboard.
+
+Renders every read-only page and JSON view of web_app.py into an output
+directory so a CDN can serve them without running Python:
+
+    index.html                      /
+    user/<username>/index.html      /user/<username> (as displayed, and lowercase)
+    api/leaderboard.json            /api/leaderboard (default sort)
+    api/leaderboard/<sort_by>.json  /api/leaderboard?sort_by=<sort_by>
+    api/stats.json                  /api/stats
+    api/activity.json               /api/activity
+    api/weeks.json                  /api/weeks
+    api/weeks/<iso_week>.json       /api/weeks/<iso_week> (every archived week)
+    static/...                      CSS and JS assets
+
+Pages are rendered through the Flask test client, so the output is exactly
+what the app would serve. The Flask app is still needed for mutations
+(adding users, refreshes). Run it after the batch refresh:
+
+    python leetcode_leaderboard.py --update-all --batch
+    python static_build.py [--data web_leaderboard_data.json] [--output public]
+"""
+
+import json
+import os
+import shutil
+import sys
+from contextlib import redirect_stdout
+from datetime import datetime
+from typing import Dict, List, Tuple
+
+from leaderboard_snapshot import SORT_KEYS
+
+DEFAULT_OUTPUT_DIR = "public"
+BUILD_MANIFEST = "build-manifest.json"
+
+
+def page_paths(usernames: List[str], weeks: List[str] = ()) -> List[Tuple[str, str]]:
+    """
+    (URL path, output file) pairs for every page and JSON view to render.
+
+    User pages are written under the username as displayed, which is what the
+    pages link to, and also under the lowercase name when that differs, since
+    static hosts match paths case-sensitively.
+    """
+    paths = [("/", "index.html")]
+    for username in usernames:
+        for name in dict.fromkeys((username, username.lower())):
+            paths.append((f"/user/{name}", f"user/{name}/index.html"))
+    paths.append(("/api/leaderboard", "api/leaderboard.json"))
+    paths += [(f"/api/leaderboard?sort_by={sort_by}", f"api/leaderboard/{sort_by}.json") for sort_by in SORT_KEYS]
+    paths.append(("/api/stats", "api/stats.json"))
+    paths.append(("/api/activity", "api/activity.json"))
+    paths.append(("/api/weeks", "api/weeks.json"))
+    paths += [(f"/api/weeks/{week}", f"api/weeks/{week}.json") for week in weeks]
+    return paths
+
+
+def build_site(output_dir: str = DEFAULT_OUTPUT_DIR, users: Dict[str, Dict] = None) -> Dict:
+    """
+    Render the site into `output_dir`, replacing it only once the build succeeded.
+
+    Args:
+        output_dir: Destination directory
+        users: Leaderboard data to render; defaults to what web_app.py loads
+
+    Returns:
+        Build manifest (also written to <output_dir>/build-manifest.json)
+
+    Raises:
+        RuntimeError: If any page does not render with status 200
+    """
+    with open(os.devnull, 'w') as devnull, redirect_stdout(devnull):
+        import web_app
+    if users is not None:
+        web_app.leaderboard.users = users
+    web_app.app.config['FETCH_DETAILS'] = False  # Render what is stored, never call LeetCode
+    web_app.app.config['STATIC_BUILD'] = True  # Pages sort from the JSON views instead of the server
+
+    root = os.path.dirname(os.path.abspath(__file__))
+    build_dir = f"{output_dir.rstrip(os.sep)}.building"
+    shutil.rmtree(build_dir, ignore_errors=True)
+    shutil.copytree(os.path.join(root, "static"), os.path.join(build_dir, "static"))
+
+    client = web_app.app.test_client()
+    files = {}
+    usernames = [user.get('username', key) for key, user in web_app.leaderboard.users.items()]
+    for path, filename in page_paths(usernames, web_app.get_weekly_archive().weeks()):
+        response = client.get(path)
+        if response.status_code != 200:
+            shutil.rmtree(build_dir, ignore_errors=True)
+            raise RuntimeError(f"{path} returned {response.status_code}")
+
+        target = os.path.join(build_dir, filename)
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        with open(target, 'wb') as f:
+            f.write(response.data)
+        files[filename] = path
+
+    manifest = {
+        "generated_at": datetime.now().isoformat(),
+        "users": len(web_app.leaderboard.users),
+        "files": files
+    }
+    with open(os.path.join(build_dir, BUILD_MANIFEST), 'w') as f:
+        json.dump(manifest, f, indent=2)
+
+    # Swap the finished build into place so a half-written site is never served
+    old_dir = f"{output_dir.rstrip(os.sep)}.old"
+    shutil.rmtree(old_dir, ignore_errors=True)
+    if os.path.exists(output_dir):
+        os.rename(output_dir, old_dir)
+    os.rename(build_dir, output_dir)
+    shutil.rmtree(old_dir, ignore_errors=True)
+    return manifest
+
+
+def main():
+    output_dir = DEFAULT_OUTPUT_DIR
+    users = None
+    if "--output" in sys.argv:
+        output_dir = sys.argv[sys.argv.index("--output") + 1]
+    if "--data" in sys.argv:
+        data_file = sys.argv[sys.argv.index("--data") + 1]
+        with open(data_file, 'r') as f:
+            users = json.load(f)
+
+    try:
+        manifest = build_site(output_dir, users)
+    except RuntimeError as e:
+        print(f"❌ Static build failed: {e}")
+        sys.exit(1)
+    print(f"🏗️ Rendered {len(manifest['files'])} files for {manifest['users']} users into {output_dir}/")
+
+
+if __name__ == "__main__":
+    main()
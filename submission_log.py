@@ -0,0 +1,148 @@
+"""
+Per-user append-only logs of accepted submissions.
+
+LeetCode's recentSubmissionList only returns the last 20 submissions, so a
+user who submits more than that in a week would lose credit if the weekly
+score were computed from it alone. Every refresh instead appends the accepted
+submissions it sees to the user's log when the refreshed record is stored:
+
+    submission_logs/<username>.jsonl    one {"slug", "title", "timestamp", "difficulty"} per line
+
+Entries are deduplicated on (slug, timestamp). Anything older than the user's
+high-water mark (the newest timestamp already logged) is skipped, so each
+refresh only appends what is new. Weekly, monthly and custom-period counts are
+then answered from the log without calling LeetCode.
+
+Several processes may append to the same log; readers pick up lines written
+by others (by file offset, like shared_store.py) and drop duplicates.
+"""
+
+import json
+import os
+import threading
+from typing import Callable, Dict, Iterable, List, Optional
+
+DEFAULT_LOG_DIR = "submission_logs"
+DIFFICULTIES = ("Easy", "Medium", "Hard")
+
+
+class _UserLog:
+    __slots__ = ("offset", "entries", "high_water_mark")
+
+    def __init__(self):
+        self.offset = 0  # Bytes of the file already read
+        self.entries = {}  # (slug, timestamp) -> entry
+        self.high_water_mark = 0
+
+
+class SubmissionLog:
+    """Accepted-submission logs for all users, stored as JSON lines under `log_dir`."""
+
+    def __init__(self, log_dir: str = DEFAULT_LOG_DIR):
+        self.log_dir = log_dir
+        self._lock = threading.Lock()
+        self._users = {}
+
+    def path(self, username: str) -> str:
+        return os.path.join(self.log_dir, f"{username.lower()}.jsonl")
+
+    def _load(self, username: str) -> _UserLog:
+        state = self._users.setdefault(username.lower(), _UserLog())
+        try:
+            with open(self.path(username), 'rb') as f:
+                f.seek(state.offset)
+                for line in f:
+                    if not line.endswith(b"\n"):
+                        break  # Incomplete append; picked up next time
+                    state.offset += len(line)
+                    entry = json.loads(line)
+                    state.entries[(entry["slug"], entry["timestamp"])] = entry
+                    state.high_water_mark = max(state.high_water_mark, entry["timestamp"])
+        except FileNotFoundError:
+            pass
+        return state
+
+    def record(self, username: str, submissions: Iterable[Dict],
+               difficulty_of: Callable[[str], str]) -> int:
+        """
+        Append the accepted submissions not logged yet.
+
+        Args:
+            username: LeetCode username
+            submissions: recentSubmissionList entries (any status)
+            difficulty_of: Maps a problem title to Easy/Medium/Hard
+
+        Returns:
+            Number of entries appended
+
+        Raises:
+            OSError: If the log cannot be written
+        """
+        with self._lock:
+            state = self._load(username)
+            new = []
+            for submission in submissions or []:
+                if submission.get('statusDisplay') != 'Accepted':
+                    continue
+                try:
+                    timestamp = int(submission.get('timestamp'))
+                except (TypeError, ValueError):
+                    continue
+                title = submission.get('title', '')
+                slug = submission.get('titleSlug') or title
+                if not slug or timestamp < state.high_water_mark or (slug, timestamp) in state.entries:
+                    continue
+                entry = {"slug": slug, "title": title, "timestamp": timestamp, "difficulty": difficulty_of(title)}
+                state.entries[(slug, timestamp)] = entry
+                new.append(entry)
+
+            if new:
+                new.sort(key=lambda entry: entry["timestamp"])
+                os.makedirs(self.log_dir, exist_ok=True)
+                # One write in append mode, so concurrent appenders do not interleave lines
+                with open(self.path(username), 'a', encoding='utf-8') as f:
+                    f.write("".join(json.dumps(entry, sort_keys=True) + "\n" for entry in new))
+                state.high_water_mark = max(state.high_water_mark, new[-1]["timestamp"])
+            return len(new)
+
+    def high_water_mark(self, username: str) -> int:
+        """Timestamp of the newest logged submission (0 if none)."""
+        with self._lock:
+            return self._load(username).high_water_mark
+
+    def entries(self, username: str, start_ts: Optional[int] = None, end_ts: Optional[int] = None) -> List[Dict]:
+        """Logged accepted submissions with start_ts <= timestamp <= end_ts, oldest first."""
+        with self._lock:
+            entries = list(self._load(username).entries.values())
+        return sorted(
+            (entry for entry in entries
+             if (start_ts is None or entry["timestamp"] >= start_ts)
+             and (end_ts is None or entry["timestamp"] <= end_ts)),
+            key=lambda entry: entry["timestamp"]
+        )
+
+    def count(self, username: str, start_ts: Optional[int] = None, end_ts: Optional[int] = None) -> Dict[str, int]:
+        """Unique problems solved in the period by difficulty, plus "All" (the weekly_problems shape)."""
+        solved = {difficulty: set() for difficulty in DIFFICULTIES}
+        for entry in self.entries(username, start_ts, end_ts):
+            solved.get(entry["difficulty"], solved["Easy"]).add(entry["slug"])
+        counts = {difficulty: len(slugs) for difficulty, slugs in solved.items()}
+        counts["All"] = sum(counts.values())
+        return counts
+
+
+_log = None
+
+
+def get_submission_log() -> SubmissionLog:
+    """Return the shared log, created from LEETCODE_SUBMISSION_LOG_DIR on first use."""
+    global _log
+    if _log is None:
+        _log = SubmissionLog(os.environ.get("LEETCODE_SUBMISSION_LOG_DIR", DEFAULT_LOG_DIR))
+    return _log
+
+
+def set_submission_log(log: Optional[SubmissionLog]) -> None:
+    """Replace the shared log (pass None to go back to the environment default)."""
+    global _log
+    _log = log
@@ -0,0 +1,173 @@
+"""
+Synthetic leaderboard data for benchmarks and load tests.
+
+Generates user records shaped exactly like the output of get_user_stats()
+(plus time_analytics), so the CPU-side code can be exercised on boards far
+larger than the real group without touching LeetCode.
+
+Usage:
+    python synthetic_data.py --users 5000 --output web_leaderboard_data.json [--seed 42]
+"""
+
+import json
+import random
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional
+
+from leetcode_leaderboard import get_current_week_bounds
+
+# Titles known to lookup_problem_difficulty plus a few it has to default
+PROBLEM_TITLES = [
+    ("Two Sum", "Easy"), ("Valid Parentheses", "Easy"), ("Merge Two Sorted Lists", "Easy"),
+    ("Climbing Stairs", "Easy"), ("Best Time to Buy and Sell Stock", "Easy"),
+    ("Maximum Depth of Binary Tree", "Easy"), ("Linked List Cycle", "Easy"),
+    ("Number of Islands", "Medium"), ("Add Two Numbers", "Medium"), ("3Sum", "Medium"),
+    ("Longest Substring Without Repeating Characters", "Medium"), ("Group Anagrams", "Medium"),
+    ("Merge Intervals", "Medium"), ("Word Search", "Medium"), ("Jump Game", "Medium"),
+    ("Median of Two Sorted Arrays", "Hard"), ("Trapping Rain Water", "Hard"),
+    ("Merge k Sorted Lists", "Hard"), ("Edit Distance", "Hard"), ("N-Queens", "Hard"),
+    ("Design Twitter", "Medium"), ("LRU Cache", "Medium"), ("Sliding Window Maximum", "Hard"),
+]
+
+LANGUAGES = ["Python3", "Python", "C++", "Java", "JavaScript", "Go", "Rust", "C", "MySQL"]
+
+TOPICS = [
+    "Array", "String", "Hash Table", "Dynamic Programming", "Math", "Sorting", "Greedy",
+    "Depth-First Search", "Breadth-First Search", "Binary Search", "Tree", "Binary Tree",
+    "Two Pointers", "Stack", "Linked List", "Graph", "Backtracking", "Sliding Window",
+    "Heap (Priority Queue)", "Bit Manipulation", "Union Find", "Trie", "Monotonic Stack",
+]
+
+STATUSES = ["Accepted"] * 6 + ["Wrong Answer", "Time Limit Exceeded", "Runtime Error"]
+
+
+def _slugify(title: str) -> str:
+    return "".join(c if c.isalnum() else "-" for c in title.lower()).strip("-")
+
+
+def generate_submission_calendar(rng: random.Random, activity: float, days: int = 365,
+                                 now: Optional[datetime] = None) -> str:
+    """Build a submissionCalendar JSON string with one key per active UTC day."""
+    now = now or datetime.now(timezone.utc)
+    today = now.replace(hour=0, minute=0, second=0, microsecond=0)
+    calendar_data = {}
+    for i in range(days):
+        if rng.random() < activity:
+            day = today - timedelta(days=i)
+            calendar_data[str(int(day.timestamp()))] = rng.randint(1, 12)
+    return json.dumps(calendar_data)
+
+
+def generate_recent_submissions(rng: random.Random, count: int = 20,
+                                now: Optional[datetime] = None) -> List[Dict]:
+    """Build a recentSubmissionList, newest first, spread over the last two weeks."""
+    now_ts = int((now or datetime.now(timezone.utc)).timestamp())
+    timestamps = sorted((now_ts - rng.randint(0, 14 * 86400) for _ in range(count)), reverse=True)
+    submissions = []
+    for timestamp in timestamps:
+        title, _ = rng.choice(PROBLEM_TITLES)
+        slug = _slugify(title)
+        submissions.append({
+            "title": title,
+            "titleSlug": slug,
+            "timestamp": str(timestamp),
+            "statusDisplay": rng.choice(STATUSES),
+            "lang": rng.choice(LANGUAGES).lower(),
+            "runtime": f"{rng.randint(0, 500)} ms",
+            "memory": f"{rng.uniform(10, 60):.1f} MB",
+            "url": f"/submissions/detail/{rng.randint(10**8, 10**9)}/"
+        })
+    return submissions
+
+
+def generate_user(rng: random.Random, index: int, now: Optional[datetime] = None) -> Dict:
+    """
+    Generate one synthetic user record.
+
+    Args:
+        rng: Random generator (seeded by the caller for reproducibility)
+        index: Sequence number used to build a unique username
+        now: Reference time for calendars and submissions (defaults to now)
+
+    Returns:
+        Dictionary shaped like a stored leaderboard entry
+    """
+    now = now or datetime.now(timezone.utc)
+    easy = rng.randint(0, 600)
+    medium = rng.randint(0, 900)
+    hard = rng.randint(0, 250)
+    weekly_easy, weekly_medium, weekly_hard = rng.randint(0, 8), rng.randint(0, 6), rng.randint(0, 3)
+
+    week_start_ts, week_end_ts = get_current_week_bounds()
+    week_start_date = datetime.fromtimestamp(week_start_ts).strftime("%Y-%m-%d")
+    week_end_date = datetime.fromtimestamp(week_end_ts).strftime("%Y-%m-%d")
+
+    recent_submissions = generate_recent_submissions(rng, 20, now)
+    username = f"user_{index:06d}"
+
+    return {
+        "username": username,
+        "real_name": f"Synthetic User {index}",
+        "ranking": rng.randint(1, 5_000_000),
+        "total_solved": easy + medium + hard,
+        "easy": easy,
+        "medium": medium,
+        "hard": hard,
+        "base_score": easy * 1 + medium * 3 + hard * 7,
+        "weekly_total": weekly_easy + weekly_medium + weekly_hard,
+        "weekly_easy": weekly_easy,
+        "weekly_medium": weekly_medium,
+        "weekly_hard": weekly_hard,
+        "weekly_base_score": weekly_easy * 1 + weekly_medium * 3 + weekly_hard * 7,
+        "current_week": f"{week_start_date} to {week_end_date}",
+        "languages": {lang: rng.randint(1, 300) for lang in rng.sample(LANGUAGES, rng.randint(1, 4))},
+        "topics": {topic: rng.randint(1, 200) for topic in rng.sample(TOPICS, rng.randint(5, len(TOPICS)))},
+        "recent_submissions": recent_submissions,
+        "submission_calendar": generate_submission_calendar(rng, rng.uniform(0.05, 0.8), 365, now),
+        "weekly_problems": {
+            "Easy": weekly_easy, "Medium": weekly_medium, "Hard": weekly_hard,
+            "All": weekly_easy + weekly_medium + weekly_hard
+        },
+        "last_updated": (now - timedelta(minutes=rng.randint(0, 240))).isoformat(),
+        "time_analytics": {
+            "daily_submissions": rng.randint(0, 40),
+            "weekly_submissions": rng.randint(0, 150),
+            "yearly_submissions": rng.randint(0, 2000),
+            "recent_activity_count": len(recent_submissions)
+        }
+    }
+
+
+def generate_users(count: int, seed: int = 42) -> Dict[str, Dict]:
+    """Generate a board of `count` users keyed by lowercase username."""
+    rng = random.Random(seed)
+    now = datetime.now(timezone.utc)
+    users = {}
+    for index in range(count):
+        user = generate_user(rng, index, now)
+        users[user["username"].lower()] = user
+    return users
+
+
+def main():
+    """Write a synthetic web_leaderboard_data.json-style file."""
+    import sys
+
+    count = 100
+    output = "synthetic_leaderboard_data.json"
+    seed = 42
+    if "--users" in sys.argv:
+        count = int(sys.argv[sys.argv.index("--users") + 1])
+    if "--output" in sys.argv:
+        output = sys.argv[sys.argv.index("--output") + 1]
+    if "--seed" in sys.argv:
+        seed = int(sys.argv[sys.argv.index("--seed") + 1])
+
+    users = generate_users(count, seed)
+    with open(output, 'w') as f:
+        json.dump(users, f, indent=2)
+    print(f"💾 Wrote {len(users)} synthetic users to {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,37 @@
+"""
+Shared fixtures. Every test runs in its own temporary directory with the
+submission log, weekly archive and scoring rules pointed inside it, so the
+repository's data files are never read or written.
+"""
+
+import pytest
+
+from scoring import set_scoring_rules
+from submission_log import set_submission_log
+from synthetic_data import generate_users
+from weekly_archive import set_weekly_archive
+
+
+def reset_singletons():
+    set_scoring_rules(None)
+    set_submission_log(None)
+    set_weekly_archive(None)
+
+
+@pytest.fixture(autouse=True)
+def isolated(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv("LEETCODE_SUBMISSION_LOG_DIR", str(tmp_path / "submission_logs"))
+    monkeypatch.setenv("LEETCODE_WEEKLY_ARCHIVE", str(tmp_path / "weekly_archive.json"))
+    monkeypatch.setenv("LEETCODE_SCORING_RULES", str(tmp_path / "scoring_rules.json"))
+    for name in ("LEADERBOARD_RUN_ID", "GITHUB_RUN_ID"):
+        monkeypatch.delenv(name, raising=False)
+    reset_singletons()
+    yield tmp_path
+    reset_singletons()
+
+
+@pytest.fixture
+def users():
+    """Twelve synthetic user records keyed by lowercase username."""
+    return generate_users(12, seed=7)
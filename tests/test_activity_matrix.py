@@ -0,0 +1,56 @@
+import json
+from datetime import date, datetime, timezone
+
+import pytest
+
+import activity_matrix
+from activity_matrix import ActivityMatrix
+
+END = date(2026, 3, 10)
+
+
+def calendar(counts):
+    """Submission calendar JSON from {day of March 2026: count}."""
+    return json.dumps({str(int(datetime(2026, 3, day, tzinfo=timezone.utc).timestamp())): count
+                       for day, count in counts.items()})
+
+
+USERS = {
+    "ada": {"username": "Ada", "submission_calendar": calendar({1: 9, 6: 2, 7: 1, 9: 4})},  # The 1st is outside
+    "bob": {"username": "bob", "submission_calendar": calendar({10: 1})},
+    "cy": {"username": "cy"},
+}
+
+
+@pytest.fixture(params=["numpy", "lists"])
+def matrix(request, monkeypatch):
+    if request.param == "lists":
+        monkeypatch.setattr(activity_matrix, "np", None)
+    elif activity_matrix.np is None:
+        pytest.skip("numpy is not installed")
+    return ActivityMatrix.from_users(USERS, days=5, end=END)
+
+
+def test_columns_are_days_ending_today(matrix):
+    assert matrix.usernames == ["Ada", "bob", "cy"]
+    assert matrix.dates() == ["2026-03-06", "2026-03-07", "2026-03-08", "2026-03-09", "2026-03-10"]
+
+
+def test_group_totals(matrix):
+    assert matrix.daily_totals() == [2, 1, 0, 4, 1]
+    assert matrix.daily_active() == [1, 1, 0, 1, 1]
+    assert matrix.heatmap()["2026-03-09"] == 4
+
+
+def test_rolling_and_window_totals(matrix):
+    assert matrix.rolling(2) == [[2, 3, 1, 4, 4], [0, 0, 0, 0, 1], [0, 0, 0, 0, 0]]
+    assert matrix.window_totals(2) == {"Ada": 4, "bob": 1, "cy": 0}
+    assert matrix.window_totals(30) == {"Ada": 7, "bob": 1, "cy": 0}
+
+
+def test_streaks_may_end_yesterday(matrix):
+    assert matrix.streaks() == {
+        "Ada": {"current": 1, "longest": 2},
+        "bob": {"current": 1, "longest": 1},
+        "cy": {"current": 0, "longest": 0},
+    }
@@ -0,0 +1,96 @@
+import json
+import os
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from leetcode_leaderboard import UNLOGGED_FIELD, LeetCodeLeaderboard, analyze_time_frames, lookup_problem_difficulty
+from scoring import week_start
+from submission_log import get_submission_log
+from weekly_archive import get_weekly_archive, iso_week
+
+
+@pytest.fixture
+def board(users):
+    with open("leaderboard_data.json", 'w') as f:
+        json.dump(users, f)
+    return LeetCodeLeaderboard()
+
+
+def read_data_file():
+    with open("leaderboard_data.json") as f:
+        return f.read()
+
+
+def test_changes_publish_a_new_snapshot(board):
+    before = board.users
+    record = before["user_000001"]
+
+    board.users = {**before, "user_000001": {**record, "total_solved": 10 ** 6}}
+
+    assert before["user_000001"] is record and record["total_solved"] != 10 ** 6
+    assert board.users["user_000001"]["total_solved"] == 10 ** 6
+    assert board.get_leaderboard("total_solved")[0]["username"] == "user_000001"
+    with pytest.raises(TypeError):
+        board.users["user_000001"] = {}  # Published snapshots are read-only
+
+
+def test_failed_batch_leaves_board_files_and_log_untouched(board):
+    before, on_disk = board.users, read_data_file()
+    record = {**before["user_000002"], UNLOGGED_FIELD: [
+        {"statusDisplay": "Accepted", "titleSlug": "two-sum", "title": "Two Sum", "timestamp": week_start() + 60}
+    ]}
+
+    with pytest.raises(RuntimeError):
+        with board.batch():
+            board.remove_user("user_000001")
+            board.users = {**board.users, "user_000002": record}
+            assert "user_000001" not in board.users  # The batch's own thread sees its changes
+            raise RuntimeError("refresh failed")
+
+    assert board.users is before
+    assert read_data_file() == on_disk
+    assert not os.path.exists(os.environ["LEETCODE_SUBMISSION_LOG_DIR"])
+
+
+def test_batch_publishes_logs_and_saves_once_on_success(board, capsys):
+    record = {**board.users["user_000002"], UNLOGGED_FIELD: [
+        {"statusDisplay": "Accepted", "titleSlug": "two-sum", "title": "Two Sum", "timestamp": week_start() + 60}
+    ]}
+
+    with board.batch():
+        board.remove_user("user_000001")
+        board.users = {**board.users, "user_000002": record}
+
+    assert capsys.readouterr().out.count("💾 Data saved") == 1
+    saved = json.loads(read_data_file())
+    assert "user_000001" not in saved
+    assert UNLOGGED_FIELD not in saved["user_000002"]
+    assert os.listdir(os.environ["LEETCODE_SUBMISSION_LOG_DIR"]) == ["user_000002.jsonl"]
+
+
+def test_finished_week_is_recounted_from_the_log_before_archiving(board):
+    monday = datetime.fromtimestamp(week_start(), timezone.utc) - timedelta(days=7)
+    last_week = f"{monday.date()} to {(monday + timedelta(days=6)).date()}"
+    board.users = {"user_000003": {**board.users["user_000003"], "current_week": last_week, "weekly_easy": 0,
+                                   "weekly_medium": 0, "weekly_hard": 0, "weekly_total": 0, "weekly_base_score": 0}}
+    # Solved late on Sunday, after the week's last refresh
+    get_submission_log().record("user_000003", [
+        {"statusDisplay": "Accepted", "titleSlug": "two-sum", "title": "Two Sum", "timestamp": week_start() - 600}
+    ], lookup_problem_difficulty)
+
+    assert board.finalize_weeks() == [iso_week(monday.date())]
+
+    archived = get_weekly_archive().read_week(iso_week(monday.date()))
+    assert archived["rows"][0]["weekly_easy"] == 1
+    assert archived["rows"][0]["weekly_base_score"] == 1
+    assert archived["finalized_at"].endswith("+00:00")
+
+
+def test_time_frames_count_whole_utc_days():
+    today = datetime.now(timezone.utc).replace(hour=0, minute=0, second=0, microsecond=0)
+    calendar = json.dumps({str(int((today - timedelta(days=age)).timestamp())): 1 for age in (0, 6, 7, 29, 30, 400)})
+
+    analytics = analyze_time_frames(calendar, [])
+
+    assert (analytics["daily_submissions"], analytics["weekly_submissions"], analytics["yearly_submissions"]) == (2, 4, 5)
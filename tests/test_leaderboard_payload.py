@@ -0,0 +1,82 @@
+import json
+
+import pytest
+
+from leaderboard_payload import (
+    PAYLOAD_HEADER_VAR, decode_payload, diff_payload, encode_payload, parse_header, payload_var_hashes,
+    shard_var_name
+)
+from leaderboard_snapshot import snapshot_users, stable_bucket
+
+# Small enough to split both parts into several shards, large enough that no
+# single user's details need more than a few buckets
+MAX_SHARD_CHARS = 1500
+
+
+@pytest.fixture
+def users(users):
+    """The synthetic users with calendars and recent submissions cut short, to keep encoding fast."""
+    for user in users.values():
+        calendar = json.loads(user["submission_calendar"])
+        user["submission_calendar"] = json.dumps(dict(list(calendar.items())[:5]))
+        user["recent_submissions"] = user["recent_submissions"][:3]
+    return users
+
+
+@pytest.mark.parametrize("hot_codec,cold_codec", [("zlib", "lzma"), ("lzma", "zlib")])
+def test_round_trip_restores_every_record(users, hot_codec, cold_codec):
+    env = encode_payload(users, hot_codec=hot_codec, cold_codec=cold_codec, max_shard_chars=MAX_SHARD_CHARS)
+
+    header = parse_header(env[PAYLOAD_HEADER_VAR])
+    assert header["version"] == 2
+    assert header["hot"]["codec"] == hot_codec
+    assert header["hot"]["shards"] > 1  # Small shards force chunking
+    assert header["cold"]["shards"] == len(header["cold"]["checksums"]) > 1
+
+    snapshot = decode_payload(env)
+    assert snapshot_users(snapshot) == users
+    assert snapshot["order"]["weekly_base_score"] == sorted(
+        users, key=lambda key: users[key]["weekly_base_score"], reverse=True
+    )
+
+
+def test_decode_rejects_partial_update(users):
+    env = encode_payload(users, max_shard_chars=MAX_SHARD_CHARS)
+    stale = encode_payload({**users, "user_000001": {**users["user_000001"], "languages": {}}},
+                           max_shard_chars=MAX_SHARD_CHARS)
+    # New header with one old bucket, as if a push stopped half way
+    buckets = parse_header(env[PAYLOAD_HEADER_VAR])["cold"]["shards"]
+    bucket = shard_var_name("cold", stable_bucket("user_000001", buckets))
+    mixed = {**stale, bucket: env[bucket]}
+
+    with pytest.raises(ValueError, match="does not match the header"):
+        decode_payload(mixed)
+
+
+def test_decode_rejects_unknown_version():
+    with pytest.raises(ValueError, match="Unsupported payload header"):
+        decode_payload({PAYLOAD_HEADER_VAR: "LBP/9 hot=zlib:1:00000000"})
+
+
+def test_diff_pushes_only_the_changed_users_bucket(users):
+    old = encode_payload(users, max_shard_chars=MAX_SHARD_CHARS)
+    languages = {language: count + 1 for language, count in users["user_000003"]["languages"].items()}
+    changed_user = {**users["user_000003"], "languages": languages}
+    new = encode_payload({**users, "user_000003": changed_user}, max_shard_chars=MAX_SHARD_CHARS)
+
+    changed, removed = diff_payload(payload_var_hashes(old), new)
+
+    buckets = parse_header(new[PAYLOAD_HEADER_VAR])["cold"]["shards"]
+    assert set(changed) == {PAYLOAD_HEADER_VAR, shard_var_name("cold", stable_bucket("user_000003", buckets))}
+    assert removed == []
+
+
+def test_diff_removes_shards_the_new_payload_no_longer_has(users):
+    old = encode_payload(users, max_shard_chars=MAX_SHARD_CHARS)
+    new = encode_payload(dict(list(users.items())[:2]), max_shard_chars=MAX_SHARD_CHARS)
+
+    changed, removed = diff_payload(payload_var_hashes(old), new)
+
+    assert removed and all(name not in new for name in removed)
+    assert set(changed) <= set(new)
+    assert diff_payload(payload_var_hashes(new), new) == ({}, [])
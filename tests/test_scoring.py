@@ -0,0 +1,72 @@
+import pytest
+
+import scoring
+from scoring import WEEK_SECONDS, ScoreTable, ScoringRules, week_start, weekly_history
+from submission_log import SubmissionLog
+
+USERS = {
+    "ada": {"username": "ada", "easy": 2, "medium": 1, "hard": 1, "weekly_easy": 1, "weekly_hard": 1,
+            "languages": {"Rust": 3, "Python3": 5}, "topics": {"Graph": 3}},
+    "bob": {"username": "bob", "easy": 10, "medium": 0, "hard": 0},
+}
+CUSTOM = ScoringRules("custom", {"Easy": 2, "Medium": 4, "Hard": 10}, language_bonus={"Rust": 1},
+                      topic_bonus={"Graph": 0.5})
+
+
+def test_scores_match_hand_computed_values():
+    scores = ScoreTable(USERS, [ScoringRules(), CUSTOM]).score_all()
+
+    assert scores["ada"] == {
+        "base_score": 2 * 1 + 1 * 3 + 1 * 7,
+        "weekly_base_score": 1 * 1 + 1 * 7,
+        "custom_score": 2 * 2 + 1 * 4 + 1 * 10 + 3 * 1 + 3 * 0.5,  # Bonuses count towards the total only
+        "weekly_custom_score": 1 * 2 + 1 * 10,
+    }
+    assert scores["bob"] == {"base_score": 10, "weekly_base_score": 0, "custom_score": 20, "weekly_custom_score": 0}
+    assert isinstance(scores["ada"]["base_score"], int)  # Whole numbers stay ints
+    assert scores["ada"]["custom_score"] == 22.5
+
+
+def test_list_fallback_matches_numpy(monkeypatch):
+    expected = ScoreTable(USERS, [ScoringRules(), CUSTOM]).score_all()
+    monkeypatch.setattr(scoring, "np", None)
+    assert ScoreTable(USERS, [ScoringRules(), CUSTOM]).score_all() == expected
+
+
+def log_with_history(tmp_path):
+    """One Hard this week, one Medium last week (logged twice) and one Easy two weeks ago."""
+    start = week_start()
+    log = SubmissionLog(str(tmp_path / "logs"))
+    difficulties = {"h": "Hard", "m": "Medium", "e": "Easy"}
+    log.record("ada", [
+        {"statusDisplay": "Accepted", "titleSlug": "e", "title": "e", "timestamp": start - WEEK_SECONDS - 60},
+        {"statusDisplay": "Accepted", "titleSlug": "m", "title": "m", "timestamp": start - 7200},
+        {"statusDisplay": "Accepted", "titleSlug": "m", "title": "m", "timestamp": start - 3600},
+        {"statusDisplay": "Wrong Answer", "titleSlug": "x", "title": "x", "timestamp": start - 1800},
+        {"statusDisplay": "Accepted", "titleSlug": "h", "title": "h", "timestamp": start},
+    ], difficulties.get)
+    return log
+
+
+def test_weekly_history_buckets_by_week(tmp_path):
+    history = weekly_history(log_with_history(tmp_path), "ada", weeks=4)
+
+    assert history == [
+        {"Easy": 0, "Medium": 0, "Hard": 1},
+        {"Easy": 0, "Medium": 1, "Hard": 0},  # The same problem twice in a week counts once
+        {"Easy": 1, "Medium": 0, "Hard": 0},
+        {"Easy": 0, "Medium": 0, "Hard": 0},
+    ]
+
+
+def test_decayed_score_weights_week_k_by_decay_to_the_k(tmp_path):
+    rules = ScoringRules("recent", decay=0.5)
+    scores = ScoreTable({"ada": {"username": "ada"}}, [rules], log_with_history(tmp_path)).score_all()
+
+    assert scores["ada"]["recent_decayed_score"] == 7 + 3 * 0.5 + 1 * 0.25
+
+
+@pytest.mark.parametrize("kwargs", [{"name": "no spaces"}, {"decay": 1.5}, {"weights": {"Insane": 9}}])
+def test_invalid_rules_are_rejected(kwargs):
+    with pytest.raises(ValueError):
+        ScoringRules(**kwargs)
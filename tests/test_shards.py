@@ -0,0 +1,72 @@
+import json
+
+import pytest
+
+from leetcode_leaderboard import LeetCodeLeaderboard, shard_file_path
+
+
+@pytest.fixture
+def board(users):
+    with open("leaderboard_data.json", 'w') as f:
+        json.dump(users, f)
+    return LeetCodeLeaderboard()
+
+
+def run_shards(board, monkeypatch, run_id, count, ranking, indexes=None, generated_at=None):
+    """Write the shard files of one run, every fetched user's ranking set to `ranking`."""
+    def fetch_users(usernames, max_age=0):
+        return {key: {**board.users[key], "ranking": ranking} for key in usernames}, []
+
+    monkeypatch.setattr(board, "fetch_users", fetch_users)
+    for index in indexes or range(1, count + 1):
+        path = board.update_shard(index, count, "shards", run_id=run_id)
+        if generated_at:
+            with open(path) as f:
+                shard = json.load(f)
+            shard["generated_at"] = generated_at
+            with open(path, 'w') as f:
+                json.dump(shard, f)
+
+
+def saved_rankings():
+    with open("leaderboard_data.json") as f:
+        return {key: user["ranking"] for key, user in json.load(f).items()}
+
+
+def test_merge_takes_only_the_requested_run(board, monkeypatch):
+    run_shards(board, monkeypatch, "old", 3, ranking=1)
+    run_shards(board, monkeypatch, "new", 2, ranking=2)
+
+    assert board.merge_shards("shards", run_id="new")
+    assert set(saved_rankings().values()) == {2}
+
+
+def test_merge_without_run_id_takes_the_newest_run(board, monkeypatch):
+    run_shards(board, monkeypatch, "new", 2, ranking=2, generated_at="2026-03-02T10:00:00+00:00")
+    run_shards(board, monkeypatch, "old", 3, ranking=1, generated_at="2026-03-01T10:00:00")  # Naive = UTC
+
+    assert board.merge_shards("shards")
+    assert set(saved_rankings().values()) == {2}
+
+
+def test_missing_shard_keeps_previous_data(board, monkeypatch, users):
+    run_shards(board, monkeypatch, "new", 2, ranking=2, indexes=[1])
+
+    assert not board.merge_shards("shards", run_id="new")
+    merged = {key for key, ranking in saved_rankings().items() if ranking == 2}
+    assert merged and merged != set(users)
+    assert all(board.users[key]["ranking"] == users[key]["ranking"] for key in set(users) - merged)
+
+
+def test_malformed_shard_files_are_skipped(board, monkeypatch, capsys):
+    run_shards(board, monkeypatch, "new", 1, ranking=2)
+    with open(shard_file_path("shards", 1, 4), 'w') as f:
+        json.dump({"shard": 1, "shard_count": 4, "run_id": "new", "users": {}}, f)  # No generated_at
+    with open(shard_file_path("shards", 2, 4), 'w') as f:
+        f.write("{truncated")
+
+    assert board.merge_shards("shards")
+    assert set(saved_rankings().values()) == {2}
+    output = capsys.readouterr().out
+    assert "missing or invalid generated_at" in output
+    assert "unreadable shard file" in output
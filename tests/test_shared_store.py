@@ -0,0 +1,80 @@
+import json
+
+from leetcode_leaderboard import write_json_atomic
+from shared_store import SharedLeaderboard, SharedStore
+
+DATA_FILE = "web_leaderboard_data.json"
+
+
+def journal_lines():
+    with open(f"{DATA_FILE}.journal") as f:
+        return [json.loads(line) for line in f]
+
+
+def test_journal_replay_brings_other_processes_up_to_date():
+    write_json_atomic(DATA_FILE, {"a": {"n": 1}, "b": {"n": 1}})
+    writer, reader = SharedStore(DATA_FILE), SharedStore(DATA_FILE)
+    writer.refresh()
+    reader.refresh()
+
+    writer.write({"a": {"n": 2}, "c": {"n": 1}}, ["b"])
+
+    assert reader.changed()
+    assert reader.refresh() == {"a", "b", "c"}
+    assert reader.users == {"a": {"n": 2}, "c": {"n": 1}}
+    assert not reader.changed()
+
+
+def test_rebase_after_external_base_rewrite():
+    write_json_atomic(DATA_FILE, {"a": {"n": 1}, "b": {"n": 1}})
+    store = SharedStore(DATA_FILE)
+    store.refresh()
+    store.write({"a": {"n": 2}})
+
+    # Something else (e.g. the CLI refresh) replaces the base outright
+    write_json_atomic(DATA_FILE, {"a": {"n": 5}, "c": {"n": 5}})
+
+    assert store.refresh() == {"a", "b", "c"}
+    assert store.users == {"a": {"n": 5}, "c": {"n": 5}}  # The old journal is not replayed on top
+
+    store.write({"c": {"n": 6}})
+    fresh = SharedStore(DATA_FILE)
+    fresh.refresh()
+    assert fresh.users == {"a": {"n": 5}, "c": {"n": 6}}
+    assert "base" in journal_lines()[0] and len(journal_lines()) == 2
+
+
+def test_compaction_folds_the_journal_into_the_base():
+    write_json_atomic(DATA_FILE, {})
+    store = SharedStore(DATA_FILE, compact_after=3)
+    store.refresh()
+    for n in range(4):
+        store.write({f"user{n}": {"n": n}})
+
+    with open(DATA_FILE) as f:
+        base = json.load(f)
+    assert set(base) >= {"user0", "user1", "user2"}
+    assert len(journal_lines()) <= 2
+
+    fresh = SharedStore(DATA_FILE)
+    fresh.refresh()
+    assert fresh.users == {f"user{n}": {"n": n} for n in range(4)}
+
+
+def test_synced_records_are_not_journaled_again(users):
+    write_json_atomic(DATA_FILE, users)
+    first, second = SharedLeaderboard(DATA_FILE), SharedLeaderboard(DATA_FILE)
+
+    # A summary-only refresh: the second board carries its detail fields over
+    key = next(iter(users))
+    record = {field: value for field, value in first.users[key].items()
+              if field not in ("content_hash", "languages", "topics")}
+    first.users = {**first.users, key: {**record, "ranking": 1}}
+    first.save_data()
+    assert second.sync() == {key}
+    assert second.users[key]["ranking"] == 1
+    assert second.users[key]["languages"] == users[key]["languages"]
+
+    lines = len(journal_lines())
+    second.save_data()
+    assert len(journal_lines()) == lines
@@ -0,0 +1,54 @@
+from solved_index import SolvedIndex, popcount
+from submission_log import SubmissionLog
+
+
+def make_index():
+    index = SolvedIndex(["two-sum", "add-two-numbers", "lru-cache"])
+    index.add("ada", ["two-sum", "lru-cache"])
+    index.add("bob", ["two-sum", "word-ladder"])  # New slug joins the catalog
+    return index
+
+
+def test_masks_round_trip_through_slugs():
+    index = make_index()
+
+    assert index.positions["word-ladder"] == 3
+    assert index.mask(["lru-cache", "two-sum"]) == 0b101
+    assert index.slugs_of(0b1101) == ["two-sum", "lru-cache", "word-ladder"]
+    assert popcount(index.solved["ada"]) == 2
+
+
+def test_set_operations():
+    index = make_index()
+
+    assert index.slugs_of(index.union()) == ["two-sum", "lru-cache", "word-ladder"]
+    assert index.unique_solved(["ada"]) == 2
+    assert index.unique_solved() == 3
+    assert index.who_solved("two-sum") == ["ada", "bob"]
+    assert index.who_solved("unknown") == []
+    assert index.difference("ada", "bob") == ["lru-cache"]
+    assert index.difference("ada", "nobody") == ["two-sum", "lru-cache"]
+
+
+def test_coverage_counts_unknown_slugs_as_missing():
+    index = make_index()
+    catalog_size = len(index.slugs)
+
+    coverage = index.coverage(["two-sum", "add-two-numbers", "never-seen", "two-sum"], ["ada"])
+
+    assert coverage == {"covered": 1, "total": 3, "missing": ["add-two-numbers", "never-seen"]}
+    assert len(index.slugs) == catalog_size  # Queries never grow the catalog
+
+
+def test_from_log_limits_to_the_period(tmp_path):
+    log = SubmissionLog(str(tmp_path / "logs"))
+    log.record("ada", [
+        {"statusDisplay": "Accepted", "titleSlug": "two-sum", "title": "Two Sum", "timestamp": 100},
+        {"statusDisplay": "Accepted", "titleSlug": "lru-cache", "title": "LRU Cache", "timestamp": 200},
+    ], lambda title: "Easy")
+
+    index = SolvedIndex.from_log(log, ["ada", "bob"], start_ts=150, catalog=["jump-game"])
+
+    assert index.slugs_of(index.solved["ada"]) == ["lru-cache"]
+    assert index.solved["bob"] == 0
+    assert set(index.slugs) == {"lru-cache", "jump-game"}
@@ -0,0 +1,134 @@
+"""
+Batched Vercel environment-variable sync over a pooled HTTP session.
+
+Used by auto_deploy.py and the serverless app (api/index.py). The project's
+variables are listed once per client, changes are sent as batched upserts on
+a single keep-alive session, and stale variables are deleted by the ids from
+that listing instead of re-listing for every delete.
+
+Point VERCEL_API_URL at vercel_stub.py to run everything offline.
+"""
+
+import os
+from typing import Callable, Dict, Iterable, List, Optional
+
+import requests
+
+DEFAULT_API_URL = "https://api.vercel.com"
+ALL_TARGETS = ["production", "preview", "development"]
+
+
+class VercelEnvClient:
+    """Client for one Vercel project's environment variables and deployments."""
+
+    def __init__(self, token: str, project_id: str, base_url: Optional[str] = None, timeout: float = 10):
+        self.project_id = project_id
+        self.base_url = (base_url or os.getenv('VERCEL_API_URL') or DEFAULT_API_URL).rstrip("/")
+        self.timeout = timeout
+        self.session = requests.Session()
+        self.session.headers.update({
+            "Authorization": f"Bearer {token}",
+            "Content-Type": "application/json"
+        })
+        self._env_vars = None  # key -> env record from the last listing
+
+    def _url(self, path: str) -> str:
+        return f"{self.base_url}{path}"
+
+    def list_env_vars(self, refresh: bool = False) -> Dict[str, Dict]:
+        """Return key -> env record, listing the project at most once unless refreshed."""
+        if self._env_vars is None or refresh:
+            response = self.session.get(self._url(f"/v9/projects/{self.project_id}/env"), timeout=self.timeout)
+            response.raise_for_status()
+            self._env_vars = {env['key']: env for env in response.json().get('envs', [])}
+        return self._env_vars
+
+    def get_plain(self, key: str) -> Optional[str]:
+        """Value of a plain variable from the cached listing (None if missing or encrypted)."""
+        env = self.list_env_vars().get(key)
+        return env.get('value') if env and env.get('type') == 'plain' else None
+
+    def find_keys(self, predicate: Callable[[str], bool]) -> List[str]:
+        """Keys of existing variables matching `predicate` (uses the cached listing)."""
+        return sorted(key for key in self.list_env_vars() if predicate(key))
+
+    def upsert(self, env_vars: Dict[str, str], var_type: str = "encrypted") -> List[str]:
+        """
+        Create or overwrite variables in a single batched request.
+
+        Returns:
+            Keys that were written
+
+        Raises:
+            requests.RequestException: If the request fails or Vercel rejects any variable
+        """
+        if not env_vars:
+            return []
+
+        body = [
+            {"key": key, "value": value, "type": var_type, "target": ALL_TARGETS}
+            for key, value in env_vars.items()
+        ]
+        response = self.session.post(
+            self._url(f"/v10/projects/{self.project_id}/env"),
+            params={"upsert": "true"}, json=body, timeout=self.timeout
+        )
+        response.raise_for_status()
+        result = response.json()
+        if result.get('failed'):
+            failed = ", ".join(str(item.get('error', item)) for item in result['failed'])
+            raise requests.RequestException(f"Vercel rejected environment variables: {failed}")
+
+        created = result.get('created', [])
+        for env in created if isinstance(created, list) else [created]:
+            if self._env_vars is not None and env.get('key'):
+                self._env_vars[env['key']] = env
+        return list(env_vars)
+
+    def delete(self, keys: Iterable[str]) -> List[str]:
+        """Delete variables by key; keys that do not exist are skipped."""
+        deleted = []
+        existing = self.list_env_vars()
+        for key in keys:
+            env = existing.get(key)
+            if not env:
+                continue
+            response = self.session.delete(
+                self._url(f"/v9/projects/{self.project_id}/env/{env['id']}"), timeout=self.timeout
+            )
+            response.raise_for_status()
+            existing.pop(key, None)
+            deleted.append(key)
+        return deleted
+
+    def sync(self, changed: Dict[str, str], delete: Iterable[str] = (),
+             commit_key: Optional[str] = None, var_type: str = "encrypted") -> Dict[str, List[str]]:
+        """
+        Apply a precomputed diff: upsert `changed`, then delete `delete`.
+
+        Args:
+            changed: Variables whose value is new or different
+            delete: Keys to remove
+            commit_key: Variable written in a second batch after all others, for
+                headers that must never point at data that is not there yet
+            var_type: Vercel variable type ("encrypted" or "plain")
+
+        Returns:
+            {"upserted": [...], "deleted": [...]}
+        """
+        first = {key: value for key, value in changed.items() if key != commit_key}
+        upserted = self.upsert(first, var_type)
+        if commit_key in changed:
+            upserted += self.upsert({commit_key: changed[commit_key]}, var_type)
+        deleted = self.delete(delete) if delete else []
+        return {"upserted": upserted, "deleted": deleted}
+
+    def trigger_deployment(self, name: str = "leetcode-leaderboard", ref: str = "main") -> str:
+        """Start a deployment from the Git source and return its URL."""
+        response = self.session.post(
+            self._url("/v13/deployments"),
+            json={"name": name, "gitSource": {"type": "github", "ref": ref}},
+            timeout=self.timeout
+        )
+        response.raise_for_status()
+        return response.json().get('url', 'unknown')
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Local stand-in for the parts of the Vercel REST API used by vercel_env.py.
+
+Keeps project environment variables and deployments in memory so the sync
+code can be exercised offline:
+
+    python vercel_stub.py --port 3999
+    VERCEL_API_URL=http://localhost:3999 VERCEL_TOKEN=stub VERCEL_PROJECT_ID=stub python auto_deploy.py
+
+GET /_stub/state shows the stored values (which the real API never returns
+for encrypted variables), the number of deployments and a count of requests
+per route.
+"""
+
+import itertools
+import sys
+from collections import Counter
+
+from flask import Flask, jsonify, request
+
+
+def create_app() -> Flask:
+    """Build a stub app with empty state."""
+    app = Flask(__name__)
+    envs = {}  # env id -> record including value
+    deployments = []
+    calls = Counter()
+    ids = itertools.count(1)
+
+    def public(env):
+        record = dict(env)
+        if record.get('type') != 'plain':
+            record.pop('value', None)
+        return record
+
+    @app.before_request
+    def check_auth():
+        if request.path.startswith('/_stub'):
+            return None
+        calls[f"{request.method} {request.url_rule.rule if request.url_rule else request.path}"] += 1
+        if not request.headers.get('Authorization', '').startswith('Bearer '):
+            return jsonify({'error': {'code': 'forbidden', 'message': 'Missing token'}}), 403
+        return None
+
+    @app.route('/v9/projects/<project_id>/env', methods=['GET'])
+    def list_env(project_id):
+        return jsonify({'envs': [public(env) for env in envs.values()]})
+
+    @app.route('/v9/projects/<project_id>/env', methods=['POST'])
+    @app.route('/v10/projects/<project_id>/env', methods=['POST'])
+    def create_env(project_id):
+        body = request.get_json()
+        items = body if isinstance(body, list) else [body]
+        upsert = request.args.get('upsert') == 'true'
+        created, failed = [], []
+
+        for item in items:
+            existing = next((env for env in envs.values() if env['key'] == item.get('key')), None)
+            if existing and not upsert:
+                failed.append({'error': {'code': 'ENV_ALREADY_EXISTS', 'key': item.get('key')}})
+                continue
+            env_id = existing['id'] if existing else f"env_{next(ids)}"
+            envs[env_id] = {
+                'id': env_id,
+                'key': item.get('key'),
+                'value': item.get('value'),
+                'type': item.get('type', 'encrypted'),
+                'target': item.get('target', [])
+            }
+            created.append(public(envs[env_id]))
+
+        return jsonify({'created': created if isinstance(body, list) else (created[0] if created else {}),
+                        'failed': failed})
+
+    @app.route('/v9/projects/<project_id>/env/<env_id>', methods=['DELETE'])
+    def delete_env(project_id, env_id):
+        if env_id not in envs:
+            return jsonify({'error': {'code': 'not_found', 'message': 'Env not found'}}), 404
+        return jsonify(public(envs.pop(env_id)))
+
+    @app.route('/v13/deployments', methods=['POST'])
+    def create_deployment():
+        deployments.append(request.get_json())
+        return jsonify({'id': f"dpl_{len(deployments)}", 'url': f"stub-{len(deployments)}.vercel.app"})
+
+    @app.route('/_stub/state')
+    def state():
+        return jsonify({
+            'env': {env['key']: env['value'] for env in envs.values()},
+            'deployments': len(deployments),
+            'calls': dict(calls)
+        })
+
+    @app.route('/_stub/reset', methods=['POST'])
+    def reset():
+        envs.clear()
+        deployments.clear()
+        calls.clear()
+        return jsonify({'success': True})
+
+    return app
+
+
+def main():
+    port = 3999
+    if "--port" in sys.argv:
+        port = int(sys.argv[sys.argv.index("--port") + 1])
+    print(f"🧪 Vercel API stub listening on http://localhost:{port}")
+    create_app().run(host="127.0.0.1", port=port, threaded=True)
+
+
+if __name__ == "__main__":
+    main()
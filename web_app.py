@@ -1,21 +1,62 @@
 from flask import Flask, render_template, request, jsonify, redirect, url_for, flash
 import json
-from datetime import datetime
-from leetcode_leaderboard import LeetCodeLeaderboard, get_user_stats
+import os
+from datetime import datetime, timezone
+from leetcode_leaderboard import (
+    LeetCodeLeaderboard, get_current_month_bounds, get_current_week_bounds, get_user_stats,
+    parse_usernames, solved_in_period
+)
+from scoring import DECAY_WEEKS, get_base_rules, get_scoring_rules
+from solved_index import PROBLEM_SETS
+from weekly_archive import get_weekly_archive
+from submission_log import get_submission_log
+from shared_store import SharedLeaderboard
+from file_watcher import FileWatcher
 
 app = Flask(__name__)
 app.secret_key = 'leetcode_leaderboard_secret_key_2025'
 
-# Global leaderboard instance
-leaderboard = LeetCodeLeaderboard("web_leaderboard_data.json")
+# Global leaderboard instance. With several worker processes (e.g. gunicorn -w 4)
+# set LEADERBOARD_SHARED_STORE=1 so workers share writes through a journal.
+if os.environ.get('LEADERBOARD_SHARED_STORE') == '1':
+    leaderboard = SharedLeaderboard("web_leaderboard_data.json")
+else:
+    leaderboard = LeetCodeLeaderboard("web_leaderboard_data.json")
 
-@app.route('/')
-def index():
-    """Main weekly leaderboard page."""
-    sort_by = request.args.get('sort_by', 'weekly_base_score')
-    leaderboard_data = leaderboard.get_leaderboard(sort_by)
-    
-    # Calculate summary stats including weekly metrics
+def reload_leaderboard_data():
+    changed = leaderboard.reload_data()
+    if changed:
+        print(f"🔄 Reloaded {leaderboard.data_file}: {len(changed)} user(s) changed")
+
+# Pick up data files committed by the batch refresh without a restart. The shared
+# store already follows the file through sync(). LEADERBOARD_WATCH_INTERVAL=0 disables.
+watch_interval = float(os.environ.get('LEADERBOARD_WATCH_INTERVAL', '2'))
+if watch_interval > 0 and not isinstance(leaderboard, SharedLeaderboard):
+    data_watcher = FileWatcher(leaderboard.data_file, reload_leaderboard_data, watch_interval, "data-watcher").start()
+
+@app.context_processor
+def inject_scoring():
+    """Current base scoring weights for the templates' scoring explanations."""
+    base_rules = get_base_rules()
+    return {'scoring_formula': base_rules.describe(), 'scoring_weights': base_rules.weights}
+
+@app.before_request
+def sync_shared_store():
+    """Pick up changes other workers made since this worker's last request."""
+    if isinstance(leaderboard, SharedLeaderboard):
+        leaderboard.sync()
+
+def user_record(username_lower):
+    """
+    A user's record for detail views. Missing or stale detail fields are loaded
+    in the background, so the page shows them from a later request on.
+    """
+    if app.config.get('FETCH_DETAILS', True):
+        return leaderboard.ensure_details(username_lower, background=True) or leaderboard.users[username_lower]
+    return leaderboard.users[username_lower]
+
+def calculate_summary_stats(leaderboard_data):
+    """Calculate the summary stats block shown on the main leaderboard page."""
     stats = {}
     if leaderboard_data:
         # Weekly stats
@@ -42,6 +83,16 @@ def index():
             'weekly_hard_champion': max(leaderboard_data, key=lambda x: x.get('weekly_hard', 0))
         }
     
+    return stats
+
+@app.route('/')
+def index():
+    """Main weekly leaderboard page."""
+    sort_by = request.args.get('sort_by', 'weekly_base_score')
+    leaderboard_data = leaderboard.get_leaderboard(sort_by)
+    
+    stats = calculate_summary_stats(leaderboard_data)
+    
     return render_template('index.html', 
                          leaderboard=leaderboard_data, 
                          stats=stats, 
@@ -55,7 +106,7 @@ def user_details(username):
         flash(f"User {username} not found in leaderboard", "error")
         return redirect(url_for('index'))
     
-    user_data = leaderboard.users[username_lower]
+    user_data = dict(user_record(username_lower))  # Copy: published records are shared
     
     # Calculate additional metrics for display
     total_solved = user_data.get('total_solved', 0)
@@ -69,7 +120,7 @@ def user_details(username):
     return render_template('user_details.html', user=user_data)
 
 @app.route('/add_user', methods=['GET', 'POST'])
-def add_user():
+async def add_user():
     """Add user page."""
     if request.method == 'POST':
         username = request.form.get('username', '').strip()
@@ -77,8 +128,8 @@ def add_user():
             flash("Please enter a username", "error")
             return render_template('add_user.html')
         
-        # Add user (this might take a while)
-        success = leaderboard.add_user(username)
+        # Add user (awaits LeetCode without holding a thread)
+        success = await leaderboard.add_user_async(username)
         
         if success:
             flash(f"Successfully added {username} to leaderboard!", "success")
@@ -101,9 +152,9 @@ def remove_user(username):
     return redirect(url_for('index'))
 
 @app.route('/update_user/<username>')
-def update_user_route(username):
+async def update_user_route(username):
     """Update specific user's data."""
-    success = leaderboard.update_user(username)
+    success = await leaderboard.update_user_async(username, request.args.get('max_age', 0, type=float))
     
     if success:
         flash(f"Updated {username}'s data", "success")
@@ -113,13 +164,32 @@ def update_user_route(username):
     return redirect(url_for('user_details', username=username))
 
 @app.route('/update_all')
-def update_all():
+async def update_all():
     """Update all users' data."""
     flash("Updating all users... This may take a while.", "info")
-    leaderboard.update_all_users()
+    await leaderboard.update_all_users_async(request.args.get('max_age', 0, type=float))
     flash("Finished updating all users", "success")
     return redirect(url_for('index'))
 
+@app.route('/api/users/bulk', methods=['POST'])
+async def api_bulk_add_users():
+    """Add many users from a JSON list, a CSV / one-per-line body, or an uploaded 'file'."""
+    upload = request.files.get('file')
+    body = upload.read().decode('utf-8') if upload else request.get_data(as_text=True)
+    try:
+        usernames = parse_usernames(body)
+    except ValueError as e:
+        return jsonify({'success': False, 'error': f'Could not parse usernames: {e}'}), 400
+    if not usernames:
+        return jsonify({'success': False, 'error': 'No usernames given'}), 400
+    
+    results = await leaderboard.import_users_async(usernames)
+    return jsonify({
+        'success': True,
+        'added': sum(1 for result in results if result['status'] == 'added'),
+        'results': results
+    })
+
 @app.route('/api/leaderboard')
 def api_leaderboard():
     """API endpoint for leaderboard data."""
@@ -134,7 +204,112 @@ def api_user(username):
     if username_lower not in leaderboard.users:
         return jsonify({'error': 'User not found'}), 404
     
-    return jsonify(leaderboard.users[username_lower])
+    return jsonify(user_record(username_lower))
+
+@app.route('/api/user/<username>/solved')
+def api_user_solved(username):
+    """
+    Unique problems solved in a period, from the accepted-submission log.
+    
+    Query: period=week (default) or month, or start/end as YYYY-MM-DD (UTC, inclusive).
+    """
+    username_lower = username.lower()
+    if username_lower not in leaderboard.users:
+        return jsonify({'error': 'User not found'}), 404
+    
+    start, end = request.args.get('start'), request.args.get('end')
+    if start or end:
+        try:
+            start_ts = int(datetime.strptime(start, '%Y-%m-%d').replace(tzinfo=timezone.utc).timestamp()) if start else None
+            end_ts = int(datetime.strptime(end, '%Y-%m-%d').replace(tzinfo=timezone.utc).timestamp()) + 86399 if end else None
+        except ValueError:
+            return jsonify({'error': 'start and end must be YYYY-MM-DD'}), 400
+    elif request.args.get('period', 'week') == 'month':
+        start_ts, end_ts = get_current_month_bounds()
+    else:
+        start_ts, end_ts = get_current_week_bounds()
+    
+    return jsonify({
+        'username': leaderboard.users[username_lower]['username'],
+        'start': start_ts,
+        'end': end_ts,
+        'solved': solved_in_period(username_lower, start_ts, end_ts),
+        'submissions': get_submission_log().entries(username_lower, start_ts, end_ts)
+    })
+
+def solved_index_for(period):
+    """The leaderboard's solved-problem index for period=all (default), week or month."""
+    if period == 'week':
+        return leaderboard.solved_index(*get_current_week_bounds())
+    if period == 'month':
+        return leaderboard.solved_index(*get_current_month_bounds())
+    return leaderboard.solved_index()
+
+@app.route('/api/problems/<slug>/solvers')
+def api_problem_solvers(slug):
+    """Users who solved a problem (by title slug), optionally within ?period=week|month."""
+    index = solved_index_for(request.args.get('period', 'all'))
+    return jsonify({'slug': slug, 'solvers': index.who_solved(slug)})
+
+@app.route('/api/compare/<username>/<other>')
+def api_compare_solved(username, other):
+    """Problems each of two users solved that the other did not."""
+    username, other = username.lower(), other.lower()
+    for name in (username, other):
+        if name not in leaderboard.users:
+            return jsonify({'error': f'User {name} not found'}), 404
+    
+    index = solved_index_for(request.args.get('period', 'all'))
+    return jsonify({
+        f'only_{username}': index.difference(username, other),
+        f'only_{other}': index.difference(other, username)
+    })
+
+@app.route('/api/coverage/<problem_set>')
+def api_problem_set_coverage(problem_set):
+    """Group coverage of a problem set (e.g. blind75) for ?users=a,b (default: everyone)."""
+    group = PROBLEM_SETS.get(problem_set.lower())
+    if group is None:
+        return jsonify({'error': f'Unknown problem set {problem_set}', 'known': sorted(PROBLEM_SETS)}), 404
+    
+    users = request.args.get('users')
+    usernames = [name.strip().lower() for name in users.split(',') if name.strip()] if users else None
+    index = solved_index_for(request.args.get('period', 'all'))
+    return jsonify({'problem_set': problem_set.lower(), **index.coverage(group, usernames)})
+
+@app.route('/api/scoring')
+def api_scoring():
+    """Configured scoring rules and the score columns each one adds to user records."""
+    return jsonify([{**rules.to_dict(), 'fields': rules.fields} for rules in get_scoring_rules()])
+
+@app.route('/api/scores/history')
+def api_score_history():
+    """Per-user weekly scores for the last ?weeks= weeks (from the submission logs) under every rule set."""
+    weeks = request.args.get('weeks', DECAY_WEEKS, type=int)
+    if not 1 <= weeks <= DECAY_WEEKS:
+        return jsonify({'error': f'weeks must be between 1 and {DECAY_WEEKS}'}), 400
+    return jsonify(leaderboard.score_history(weeks))
+
+@app.route('/api/weeks')
+def api_weeks():
+    """ISO weeks available in the weekly archive, oldest first."""
+    return jsonify({'weeks': get_weekly_archive().weeks()})
+
+@app.route('/api/weeks/<iso_week>')
+def api_week(iso_week):
+    """A finalized week's per-user results, read from the weekly archive."""
+    archived = get_weekly_archive().read_week(iso_week.upper())
+    if archived is None:
+        return jsonify({'error': f'Week {iso_week} is not archived'}), 404
+    return jsonify(archived)
+
+@app.route('/api/activity')
+def api_activity():
+    """Group activity over the last ?days= days (default 365): daily active members, heatmap, totals and streaks."""
+    days = request.args.get('days', 365, type=int)
+    if not 1 <= days <= 3660:
+        return jsonify({'error': 'days must be between 1 and 3660'}), 400
+    return jsonify(leaderboard.activity_matrix(days).summary())
 
 @app.route('/api/stats')
 def api_stats():
@@ -149,17 +324,18 @@ def api_stats():
         'total_problems': sum(user['total_solved'] for user in leaderboard_data),
         'total_base_score': sum(user.get('base_score', 0) for user in leaderboard_data),
         'avg_score': sum(user.get('base_score', 0) for user in leaderboard_data) / len(leaderboard_data),
-        'leader': leaderboard_data[0]['username'] if leaderboard_data else None
+        'leader': leaderboard_data[0]['username'] if leaderboard_data else None,
+        'unique_problems_this_week': solved_index_for('week').unique_solved()
     }
     
     return jsonify(stats)
 
 
 @app.route('/api/live-data')
-def api_live_data():
+async def api_live_data():
     """Refresh all users and return the latest leaderboard data."""
     try:
-        leaderboard.update_all_users()
+        await leaderboard.update_all_users_async(request.args.get('max_age', 0, type=float))
         sort_by = request.args.get('sort_by', 'weekly_base_score')
         leaderboard_data = leaderboard.get_leaderboard(sort_by)
 
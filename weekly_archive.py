@@ -0,0 +1,161 @@
+"""
+Columnar archive of finalized weeks.
+
+Each user record only holds the current week (`current_week` and the
+weekly_* fields), and the first refresh after Monday overwrites it. Before
+that happens the leaderboard freezes the finished week here:
+
+    weekly_archive.json
+        {"format": "weekly-archive", "version": 1,
+         "weeks": {"2025-W03": {"start": "2025-01-13", "end": "2025-01-19",
+                                "rows": [0, 12], "finalized_at": "..."}},
+         "columns": {"username": [...], "rank": [...], "weekly_total": [...],
+                     "weekly_easy": [...], ..., "weekly_base_score": [...]}}
+
+There is one row per user-week and one array per metric; a week's rows are
+contiguous (rows is [first, end)), ranked by weekly_base_score. Metrics added
+later (e.g. a new score column) are null for older rows. Finalized weeks are
+never rewritten.
+
+Reading a week slices the columns, with no recomputation or fetching.
+"""
+
+import json
+import os
+import threading
+from datetime import date, datetime, timezone
+from typing import Dict, Iterable, List, Optional
+
+from file_watcher import file_id
+
+ARCHIVE_FORMAT = "weekly-archive"
+ARCHIVE_VERSION = 1
+DEFAULT_ARCHIVE_FILE = "weekly_archive.json"
+
+# Per-user fields frozen for every week, besides the score columns
+WEEK_COUNT_FIELDS = ("weekly_total", "weekly_easy", "weekly_medium", "weekly_hard")
+RANK_FIELD = "weekly_base_score"
+
+
+def iso_week(day: date) -> str:
+    """ISO week label of `day`, e.g. "2025-W03"."""
+    year, week, _ = day.isocalendar()
+    return f"{year}-W{week:02d}"
+
+
+def record_week(user: Dict) -> Optional[str]:
+    """ISO week a user record's weekly fields belong to (from `current_week`), or None."""
+    try:
+        return iso_week(date.fromisoformat(user["current_week"].split(" to ")[0]))
+    except (KeyError, AttributeError, ValueError):
+        return None
+
+
+class WeeklyArchive:
+    """Finalized weeks stored column-wise in one JSON file (see the module docstring)."""
+
+    def __init__(self, path: str = DEFAULT_ARCHIVE_FILE):
+        self.path = path
+        self._lock = threading.Lock()
+        self._data = None
+        self._file_id = None
+
+    def _load(self) -> Dict:
+        """Current archive contents, re-read only when the file changed."""
+        current = file_id(self.path)
+        if self._data is None or current != self._file_id:
+            try:
+                with open(self.path, 'r') as f:
+                    data = json.load(f)
+                if data.get("format") != ARCHIVE_FORMAT or data.get("version") != ARCHIVE_VERSION:
+                    raise ValueError(f"{self.path} is not a version {ARCHIVE_VERSION} weekly archive")
+            except FileNotFoundError:
+                data = {"format": ARCHIVE_FORMAT, "version": ARCHIVE_VERSION, "weeks": {}, "columns": {"username": []}}
+            self._data, self._file_id = data, current
+        return self._data
+
+    def weeks(self) -> List[str]:
+        """Archived ISO weeks, oldest first."""
+        with self._lock:
+            return sorted(self._load()["weeks"])
+
+    def has_week(self, week: str) -> bool:
+        with self._lock:
+            return week in self._load()["weeks"]
+
+    def read_week(self, week: str) -> Optional[Dict]:
+        """
+        One archived week as {"week", "start", "end", "finalized_at", "rows"},
+        rows being per-user dicts in rank order, or None if it is not archived.
+        """
+        with self._lock:
+            data = self._load()
+            meta = data["weeks"].get(week)
+            if meta is None:
+                return None
+            first, end = meta["rows"]
+            columns = {field: values[first:end] for field, values in data["columns"].items()}
+        rows = [{field: values[i] for field, values in columns.items()} for i in range(end - first)]
+        return {"week": week, "start": meta["start"], "end": meta["end"],
+                "finalized_at": meta["finalized_at"], "rows": rows}
+
+    def append_week(self, week: str, start: str, end: str, users: Iterable[Dict],
+                    fields: Iterable[str]) -> bool:
+        """
+        Freeze `week` from user records whose weekly fields belong to it.
+
+        Args:
+            week: ISO week label
+            start, end: First and last day of the week (YYYY-MM-DD)
+            users: User records for that week
+            fields: Per-user metrics to store besides username and rank
+
+        Returns:
+            False if the week was already archived (it is left unchanged)
+
+        Raises:
+            OSError: If the archive cannot be written
+        """
+        users = sorted(users, key=lambda user: user.get(RANK_FIELD, 0), reverse=True)
+        fields = ["username", "rank"] + [field for field in fields if field not in ("username", "rank")]
+        with self._lock:
+            data = self._load()
+            if week in data["weeks"]:
+                return False
+            # Build the next version aside so a failed write leaves the loaded one intact
+            columns = {field: list(values) for field, values in data["columns"].items()}
+            first = len(columns["username"])
+            for field in fields:
+                columns.setdefault(field, [None] * first)
+            for field, values in columns.items():
+                if field == "rank":
+                    values.extend(range(1, len(users) + 1))
+                else:
+                    values.extend(user.get(field) for user in users)
+            weeks = {**data["weeks"], week: {"start": start, "end": end, "rows": [first, first + len(users)],
+                                             "finalized_at": datetime.now(timezone.utc).isoformat()}}
+            updated = {**data, "weeks": weeks, "columns": columns}
+
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, 'w') as f:
+                json.dump(updated, f, separators=(',', ':'))
+            os.replace(tmp_path, self.path)
+            self._data, self._file_id = updated, file_id(self.path)
+            return True
+
+
+_archive = None
+
+
+def get_weekly_archive() -> WeeklyArchive:
+    """Return the shared archive, created from LEETCODE_WEEKLY_ARCHIVE on first use."""
+    global _archive
+    if _archive is None:
+        _archive = WeeklyArchive(os.environ.get("LEETCODE_WEEKLY_ARCHIVE", DEFAULT_ARCHIVE_FILE))
+    return _archive
+
+
+def set_weekly_archive(archive: Optional[WeeklyArchive]) -> None:
+    """Replace the shared archive (pass None to go back to the environment default)."""
+    global _archive
+    _archive = archive